@@ -0,0 +1,72 @@
+"""Benchmark single-pass timestamp parsing against the previous parse-twice path."""
+
+import os
+import sys
+import time
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+logging.basicConfig(level=logging.WARNING)
+
+from feat_eng import parse_timestamps, preprocess_datetime, preprocess_trip_times
+
+
+def make_trip_times(n_rows: int, n_unique: int, seed: int = 42) -> pd.DataFrame:
+    """Trip start/end time strings in the nb.csv format with n_unique distinct start times."""
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp('2021-07-01') + pd.to_timedelta(rng.integers(0, 180 * 24 * 3600, n_unique), unit='s')
+    starts = starts[rng.integers(0, n_unique, n_rows)]
+    ends = starts + pd.to_timedelta(rng.integers(300, 3600, n_rows), unit='s')
+    return pd.DataFrame({
+        'Trip Start Time': starts.strftime('%Y-%m-%d %H:%M:%S'),
+        'Trip End Time': ends.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+def previous_path(df: pd.DataFrame) -> pd.DataFrame:
+    """What preprocess_datetime followed by preprocess_trip_times used to do."""
+    df['Trip Start Time'] = pd.to_datetime(df['Trip Start Time'])
+    df['Trip Start Time'] = pd.to_datetime(df['Trip Start Time'])
+    df['Trip End Time'] = pd.to_datetime(df['Trip End Time'])
+    return df
+
+
+def single_pass(df: pd.DataFrame) -> pd.DataFrame:
+    df = parse_timestamps(df)
+    df = preprocess_datetime(df)
+    df = preprocess_trip_times(df)
+    return df
+
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--unique-fraction', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'previous (s)':>14} {'single pass (s)':>16} {'speedup':>8}")
+    for n_rows in args.rows:
+        df = make_trip_times(n_rows, max(1, int(n_rows * args.unique_fraction)))
+        previous = best_of(previous_path, df, args.repeat)
+        current = best_of(single_pass, df, args.repeat)
+        pd.testing.assert_series_equal(previous_path(df.copy())['Trip End Time'], single_pass(df.copy())['Trip End Time'],
+                                       check_dtype=False)
+        print(f"{n_rows:>10} {previous:>14.3f} {current:>16.3f} {previous / current:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
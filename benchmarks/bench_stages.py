@@ -0,0 +1,130 @@
+"""Time each pipeline stage on synthetic data at several scales and store the results per commit."""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import logging
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+# sql_intergration imports itself through the scripts package
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+logging.basicConfig(level=logging.WARNING)
+
+from config.config import Config
+from profiling import current_trace, stage_timer, start_trace
+from synthetic_data import write_dataset
+from memory import read_csv_planned
+from data_preprocessing import drop_ping_columns, impute_trip_values
+from feat_eng import engineer_trip_features, merge_and_calculate_distances, assign_grid_cells, scale_features
+from analysis import perform_analysis
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+STAGES = ['load', 'trip_features', 'merge', 'grid_cells', 'scale', 'analysis', 'db_load']
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_stages(pings_path: str, trips_path: str, stages: list) -> None:
+    """Run the selected stages in pipeline order, each inside a stage_timer."""
+    with stage_timer('load'):
+        pings = drop_ping_columns(read_csv_planned(pings_path))
+        trips = impute_trip_values(read_csv_planned(trips_path))
+    with stage_timer('trip_features', len(trips)) as record:
+        trips = engineer_trip_features(trips)
+        record['rows_out'] = len(trips)
+    with stage_timer('merge', len(pings) + len(trips)) as record:
+        merged = merge_and_calculate_distances(pings, trips)
+        record['rows_out'] = len(merged)
+    del pings
+    if 'grid_cells' in stages:
+        with stage_timer('grid_cells', len(merged)):
+            merged = assign_grid_cells(merged)
+    if 'scale' in stages:
+        with stage_timer('scale', len(merged)):
+            scale_features(merged.copy())
+    if 'analysis' in stages:
+        with stage_timer('analysis', len(merged)):
+            perform_analysis(merged)
+    if 'db_load' in stages:
+        from scripts.sql_intergration.config import TABLE_1, TABLE_2
+        from scripts.sql_intergration.load_data import load_csv_to_db
+        with stage_timer('db_load'):
+            load_csv_to_db(pings_path, TABLE_1)
+            load_csv_to_db(trips_path, TABLE_2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Driver location rows per scale; trips are a fifth of that.')
+    parser.add_argument('--stages', nargs='+', default=[stage for stage in STAGES if stage != 'db_load'], choices=STAGES,
+                        help="Stages to time. 'db_load' needs the Postgres database from sql_intergration/config.py.")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='Results file. Defaults to benchmarks/results/<commit>.json.')
+    parser.add_argument('--compare', help='Results file of another commit to compare against.')
+    args = parser.parse_args()
+
+    Config.CACHE_ENABLED = False
+    Config.PROFILE_TRACEMALLOC = False
+    results = []
+    data_dir = tempfile.mkdtemp(prefix='bench_data_')
+    try:
+        for n_rows in args.rows:
+            pings_path, trips_path = write_dataset(data_dir, n_rows)
+            best = {}
+            for _ in range(args.repeat):
+                start_trace()
+                run_stages(pings_path, trips_path, args.stages)
+                for record in current_trace()['stages']:
+                    if record['stage'] in STAGES and record['stage'] in args.stages and record['depth'] == 0:
+                        if record['stage'] not in best or record['wall_s'] < best[record['stage']]['wall_s']:
+                            best[record['stage']] = record
+            for stage in args.stages:
+                record = best[stage]
+                results.append({
+                    'rows': n_rows, 'stage': stage, 'wall_s': record['wall_s'], 'cpu_s': record['cpu_s'],
+                    'rows_per_s': round(n_rows / record['wall_s']) if record['wall_s'] else None,
+                    'rss_growth_mb': record['rss_growth_mb'],
+                })
+                print(f"{n_rows:>10} {stage:>14} {record['wall_s']:>9.3f}s {results[-1]['rows_per_s'] or 0:>12,} rows/s")
+    finally:
+        shutil.rmtree(data_dir)
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'machine': {'python': platform.python_version(), 'pandas': pd.__version__, 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(row['rows'], row['stage']): row for row in json.load(f)['results']}
+        print(f"\n{'rows':>10} {'stage':>14} {'baseline (s)':>13} {'current (s)':>12} {'speedup':>8}")
+        for row in results:
+            other = baseline.get((row['rows'], row['stage']))
+            if other:
+                print(f"{row['rows']:>10} {row['stage']:>14} {other['wall_s']:>13.3f} {row['wall_s']:>12.3f} "
+                      f"{other['wall_s'] / row['wall_s']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Load-test the prediction service with concurrent single-record requests and report latency and throughput."""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.request
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scripts.models.preprocessing import FEATURE_COLUMNS
+
+
+def synthetic_model(n_rows: int = 5000, n_estimators: int = 100, seed: int = 0):
+    """A forest trained on random features, for load tests without a trained model."""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = (X['Time_Since_Last_Trip'] + rng.normal(size=n_rows) > 0).astype(int)
+    return RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=1).fit(X, y)
+
+
+def post(url: str, body: dict) -> dict:
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def run_clients(url: str, clients: int, requests_per_client: int, seed: int = 0) -> dict:
+    """Send single-record requests from concurrent clients and measure end-to-end latency."""
+    rng = np.random.default_rng(seed)
+    records = [dict(zip(FEATURE_COLUMNS, row)) for row in rng.normal(size=(256, len(FEATURE_COLUMNS))).tolist()]
+    latencies, errors, lock = [], [], threading.Lock()
+
+    def client(index: int) -> None:
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                post(f"{url}/predict", records[(index * requests_per_client + i) % len(records)])
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies), 'errors': len(errors), 'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': {f"p{q}": round(float(np.percentile(latencies, q)), 3) for q in (50, 90, 95, 99)} if len(latencies) else {},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='Running service to test. Defaults to starting one locally.')
+    parser.add_argument('--model', help='Model directory for the local service. Defaults to a forest trained on random features.')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client.')
+    parser.add_argument('--max-batch-size', type=int, nargs='+', default=[1, 64],
+                        help='Batch sizes to compare when starting the service locally.')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.url:
+        print(json.dumps({'client': run_clients(args.url, args.clients, args.requests),
+                          'server': json.loads(urllib.request.urlopen(f"{args.url}/stats").read())}, indent=2))
+        return
+
+    from scripts.models.serving import create_server
+    from scripts.models.persistence import load_model
+    model = load_model(args.model) if args.model else synthetic_model()
+    for max_batch_size in args.max_batch_size:
+        server = create_server(model, port=0, max_batch_size=max_batch_size, max_wait_ms=args.max_wait_ms)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+        try:
+            client = run_clients(url, args.clients, args.requests)
+            print(json.dumps({'max_batch_size': max_batch_size, 'client': client,
+                              'server': server.service.batcher.stats()}, indent=2))
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+
+
+if __name__ == '__main__':
+    main()
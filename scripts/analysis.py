@@ -1,7 +1,9 @@
 import pandas as pd
-from geopy.distance import geodesic
-from haversine import Unit, haversine
 from config.config import Config
+from profiling import profile_stage
+from distance import compute_distance
+from spatial_index import SpatialIndex
+from spatiotemporal_join import spatiotemporal_join
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,22 +17,18 @@ def clean_latitude(lat: float) -> float:
         return 90
     return lat
 
-def compute_geodesic_distance(row: pd.Series) -> float:
-    """Compute geodesic distance between origin and destination."""
-    coords_1 = (row['Origin Lat'], row['Origin Lng'])
-    coords_2 = (row['Destination Lat'], row['Destination Lng'])
+def compute_geodesic_distance(row):
+    """Compute geodesic distance between origin and destination for a row or a whole DataFrame."""
     try:
-        return geodesic(coords_1, coords_2).kilometers
+        return compute_distance(row['Origin Lat'], row['Origin Lng'], row['Destination Lat'], row['Destination Lng'], mode='geodesic')
     except Exception as e:
         logger.error(f"Error computing geodesic distance: {str(e)}")
         return None
 
-def compute_haversine_distance(row: pd.Series) -> float:
-    """Compute Haversine distance between origin and destination."""
-    coords_1 = (row['Origin Lat'], row['Origin Lng'])
-    coords_2 = (row['Destination Lat'], row['Destination Lng'])
+def compute_haversine_distance(row):
+    """Compute Haversine distance between origin and destination for a row or a whole DataFrame."""
     try:
-        return haversine(coords_1, coords_2, unit=Unit.KILOMETERS)
+        return compute_distance(row['Origin Lat'], row['Origin Lng'], row['Destination Lat'], row['Destination Lng'], mode='haversine')
     except Exception as e:
         logger.error(f"Error computing Haversine distance: {str(e)}")
         return None
@@ -45,25 +43,42 @@ def compute_driving_speed(row: pd.Series) -> float:
         logger.error("Error computing driving speed: division by zero")
         return None
 
-def count_riders_within_radius(df_feat_eng: pd.DataFrame, radius: float = 0.5) -> int:
-    """Count riders within a specified radius of accepted orders."""
-    accepted_riders_in_circle = 0
-    for _, order in df_feat_eng[df_feat_eng['driver_action'] == 'accepted'].iterrows():
-        order_lat = order['lat']
-        order_lon = order['lng']
-        
-        for _, rider in df_feat_eng.iterrows():
-            rider_lat = rider['lat']
-            rider_lon = rider['lng']
-            try:
-                distance = haversine((order_lat, order_lon), (rider_lat, rider_lon))
-                if distance <= radius:
-                    accepted_riders_in_circle += 1
-            except Exception as e:
-                logger.error(f"Error computing haversine distance for rider: {str(e)}")
-    
+@profile_stage
+def count_riders_within_radius(df_feat_eng: pd.DataFrame, radius: float = None, return_counts: bool = False,
+                               window_minutes: float = None):
+    """
+    Count riders within a specified radius of accepted orders.
+
+    All accepted orders are answered in one batched query against a BallTree of
+    the rider pings, so the cost is O((N + M) log N) instead of O(N * M).
+
+    Args:
+        df_feat_eng (pd.DataFrame): Frame with 'lat', 'lng' and 'driver_action' columns.
+        radius (float): Radius in kilometers. Defaults to Config.RADIUS.
+        return_counts (bool): Also return the per-order counts.
+        window_minutes (float): Optional time window in minutes. Counts riders from any
+            point in time when not set.
+
+    Returns:
+        int, or Tuple[int, pd.Series] when return_counts is set: the total count and
+        the count per accepted order, indexed like df_feat_eng.
+    """
+    radius = Config.RADIUS if radius is None else radius
+    orders = df_feat_eng[df_feat_eng['driver_action'] == 'accepted']
+    if window_minutes is None:
+        index = SpatialIndex(df_feat_eng['lat'].to_numpy(), df_feat_eng['lng'].to_numpy())
+        counts = pd.Series(index.count_within(orders['lat'].to_numpy(), orders['lng'].to_numpy(), radius),
+                           index=orders.index, name='Riders Within Radius')
+    else:
+        pairs = spatiotemporal_join(df_feat_eng, orders, radius=radius, window_minutes=window_minutes)
+        counts = pairs['order_index'].value_counts().reindex(orders.index, fill_value=0).rename('Riders Within Radius')
+    accepted_riders_in_circle = int(counts.sum())
+
+    if return_counts:
+        return accepted_riders_in_circle, counts
     return accepted_riders_in_circle
 
+@profile_stage
 def perform_analysis(df_feat_eng: pd.DataFrame) -> pd.DataFrame:
     """Perform analysis on the feature-engineered DataFrame."""
     try:
@@ -73,11 +88,11 @@ def perform_analysis(df_feat_eng: pd.DataFrame) -> pd.DataFrame:
         logger.info("Cleaned latitude values")
 
         # Compute geodesic distance
-        df_feat_eng['Geodesic Distance'] = df_feat_eng.apply(compute_geodesic_distance, axis=1)
+        df_feat_eng['Geodesic Distance'] = compute_geodesic_distance(df_feat_eng)
         logger.info("Computed geodesic distances")
 
         # Compute Haversine distance
-        df_feat_eng['Haversine Distance'] = df_feat_eng.apply(compute_haversine_distance, axis=1)
+        df_feat_eng['Haversine Distance'] = compute_haversine_distance(df_feat_eng)
         logger.info("Computed Haversine distances")
 
         # Compute average speed
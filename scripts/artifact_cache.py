@@ -0,0 +1,126 @@
+# artifact_cache.py
+
+import os
+import re
+import json
+import hashlib
+import inspect
+import logging
+import pandas as pd
+from typing import Callable, Iterable, Optional
+from config.config import Config
+
+def file_fingerprint(path: str) -> str:
+    """Fingerprint a file by path, size and modification time, or by content if Config.CACHE_HASH_CONTENTS is set."""
+    stat = os.stat(path)
+    if not Config.CACHE_HASH_CONTENTS:
+        return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_fingerprint(*objects) -> str:
+    """Fingerprint the source code of modules or functions so code changes invalidate their stages."""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()
+
+def config_fingerprint(names: Iterable[str] = None) -> str:
+    """
+    Fingerprint the given Config attributes, or all public ones when names is None.
+
+    Raises:
+        ValueError: When a name is not a Config attribute.
+    """
+    names = [name for name in dir(Config) if name.isupper()] if names is None else list(names)
+    unknown = [name for name in names if not hasattr(Config, name)]
+    if unknown:
+        raise ValueError(f"Unknown Config settings: {unknown}")
+    values = {name: repr(getattr(Config, name)) for name in names}
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+def stage_key(*parts: str) -> str:
+    """Combine fingerprints into a short cache key."""
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:16]
+
+def artifact_path(stage: str, key: str, part: int = None) -> str:
+    """Path of the Parquet file holding a stage output."""
+    suffix = '' if part is None else f"-{part}"
+    return os.path.join(Config.CACHE_DIR, f"{stage}-{key}{suffix}.parquet")
+
+def artifact_exists(stage: str, key: str, outputs: int = 1) -> bool:
+    """Whether every part of a stage output is in the cache."""
+    parts = [None] if outputs == 1 else list(range(outputs))
+    return all(os.path.exists(artifact_path(stage, key, part)) for part in parts)
+
+def load_artifact(stage: str, key: str, outputs: int = 1) -> Optional[object]:
+    """Load a cached stage output, or return None if it is missing or unreadable."""
+    if not artifact_exists(stage, key, outputs):
+        return None
+    parts = [None] if outputs == 1 else list(range(outputs))
+    paths = [artifact_path(stage, key, part) for part in parts]
+    try:
+        frames = [pd.read_parquet(path) for path in paths]
+    except Exception as e:
+        logging.warning(f"Could not read cached {stage} artifact {key}: {e}")
+        return None
+    logging.info(f"Loaded cached {stage} artifact {key}.")
+    return frames[0] if outputs == 1 else tuple(frames)
+
+def remove_stale_artifacts(stage: str, key: str) -> None:
+    """Delete the cached outputs of a stage written under any other key."""
+    pattern = re.compile(rf"{re.escape(stage)}-(?P<key>[0-9a-f]+)(-\d+)?\.parquet")
+    for file_name in os.listdir(Config.CACHE_DIR):
+        match = pattern.fullmatch(file_name)
+        if match and match.group('key') != key:
+            os.remove(os.path.join(Config.CACHE_DIR, file_name))
+            logging.info(f"Removed superseded {stage} artifact {file_name}.")
+
+def save_artifact(stage: str, key: str, result, outputs: int = 1) -> None:
+    """
+    Write a stage output to the cache, replacing the outputs the stage cached under other keys.
+
+    Failures are logged and do not stop the pipeline.
+    """
+    frames = [result] if outputs == 1 else list(result)
+    parts = [None] if outputs == 1 else list(range(outputs))
+    try:
+        os.makedirs(Config.CACHE_DIR, exist_ok=True)
+        for frame, part in zip(frames, parts):
+            path = artifact_path(stage, key, part)
+            # Write to a temporary file first so readers never see a partial artifact
+            frame.to_parquet(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        logging.info(f"Cached {stage} artifact {key}.")
+        remove_stale_artifacts(stage, key)
+    except Exception as e:
+        logging.warning(f"Could not cache {stage} artifact {key}: {e}")
+
+def cached_stage(stage: str, key: str, compute: Callable[[], object], outputs: int = 1):
+    """
+    Return the cached output of a stage, computing and caching it on a miss.
+
+    Args:
+        stage (str): Stage name, used in the artifact file name.
+        key (str): Cache key built with stage_key from the stage's inputs, code and config.
+        compute (Callable): Produces the stage output, a DataFrame or a tuple of `outputs` DataFrames.
+        outputs (int): Number of DataFrames the stage returns.
+    """
+    if Config.CACHE_ENABLED:
+        result = load_artifact(stage, key, outputs)
+        if result is not None:
+            return result
+    result = compute()
+    if Config.CACHE_ENABLED:
+        save_artifact(stage, key, result, outputs)
+    return result
+
+def read_csv_cached(path: str, **kwargs) -> pd.DataFrame:
+    """Read a CSV through the cache, so later runs load the Parquet copy instead of parsing it again."""
+    key = stage_key(file_fingerprint(path), json.dumps(kwargs, sort_keys=True, default=str))
+    # One cache entry per file, so a new version of a file replaces only its own copy
+    stage = f"csv_{stage_key(os.path.abspath(path))[:8]}"
+    return cached_stage(stage, key, lambda: pd.read_csv(path, **kwargs))
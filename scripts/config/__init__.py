@@ -0,0 +1 @@
+from .config import Config
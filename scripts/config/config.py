@@ -4,11 +4,34 @@ class Config:
     DF1_PATH: str = "/home/moraa/Documents/10_academy/Week-8/Data/driver_locations_during_request.csv"
     DF2_PATH: str = "/home/moraa/Documents/10_academy/Week-8/Data/nb.csv"
     DF1_DROP_COLUMNS: list = ['created_at', 'updated_at']
+    DF1_TIMESTAMP_COLUMNS: list = ['created_at', 'updated_at']
+    KEEP_PING_TIMESTAMPS: bool = True  # Keep ping timestamps for the time-windowed join
     DF2_IMPUTE_COLUMNS: dict = {
         'Trip Start Time': 'mode',
         'Trip End Time': 'mode'
     }
+    DATETIME_COLUMNS: list = ['Trip Start Time', 'Trip End Time']
+    DATETIME_FORMATS: dict = {
+        'Trip Start Time': '%Y-%m-%d %H:%M:%S',
+        'Trip End Time': '%Y-%m-%d %H:%M:%S'
+    }
+    DATETIME_UNIQUE_RATIO: float = 0.5  # Parse distinct strings once when a column is less unique than this
     LOG_FILE: str = 'logs/preprocessing.log'
+    CHUNK_SIZE: int = 500_000  # Rows per chunk in streaming mode
+    COORDINATE_DTYPE: str = 'float32'  # ~1 m precision at these latitudes, half the memory of float64
+    DTYPE_PLAN: dict = {  # Applied when reading the input files; columns missing from a file are ignored
+        'driver_action': 'category',
+        'lat': COORDINATE_DTYPE,
+        'lng': COORDINATE_DTYPE,
+        'Trip Origin': 'category',
+        'Trip Destination': 'category'
+    }
+    ID_COLUMNS: list = ['id', 'order_id', 'driver_id', 'Trip ID']  # Integer IDs downcast after loading
+    MEMORY_BUDGET_MB = None  # Largest table allowed in memory, None for no limit
+    MEMORY_BUDGET_ACTION: str = 'stream'  # Over budget: 'stream' switches to chunked mode, 'raise' fails
+    MERGE_WORKERS: int = 1  # Processes for the df1/df2 merge; above 1 the merge is hash-partitioned on Trip ID
+    MERGE_PARTITION_ROWS: int = 1_000_000  # Target df1 rows per merge partition
+    STREAMING_MODE: bool = False  # Run the feature pipeline chunk by chunk instead of in memory
 
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +41,19 @@ class Config:
     DF1_PATH = os.path.join(DATA_DIR, 'driver_locations_during_request.csv')
     DF2_PATH = os.path.join(DATA_DIR, 'nb.csv')
     LOG_FILE = os.path.join(LOGS_DIR, 'preprocessing.log')
+    ARTIFACTS_DIR = os.path.join(BASE_DIR, '..', '..', 'artifacts')
+    STREAM_OUTPUT_PATH = os.path.join(ARTIFACTS_DIR, 'df_merged.csv')
+
+    CACHE_DIR = os.path.join(ARTIFACTS_DIR, 'cache')
+    CACHE_ENABLED = True  # Reuse Parquet copies of stage outputs whose inputs, code and config are unchanged
+    PROFILING_ENABLED = True  # Record wall time, CPU time, rows and memory of each stage
+    PROFILE_TRACEMALLOC = False  # Also trace Python allocations per stage (slower)
+    PROFILE_MLFLOW = False  # Log the trace as metrics of the active MLflow run
+    PROFILE_TRACE_DIR = os.path.join(ARTIFACTS_DIR, 'traces')
+    SCALER_PATH = os.path.join(ARTIFACTS_DIR, 'models', 'scaler.json')  # Fitted scaler statistics, reused for new batches
+    SCALER_WORKERS = 1  # Threads fitting the scaler over row blocks whose statistics are then merged
+    PIPELINE_MAX_WORKERS = 4  # Threads for independent pipeline stages
+    CACHE_HASH_CONTENTS = False  # Fingerprint input files by content instead of size and modification time
 
     HOLIDAYS_2021 = [
         '2021-01-01', '2021-04-02', '2021-04-05', '2021-05-01', '2021-05-12', '2021-05-13',
@@ -31,9 +67,39 @@ class Config:
         '2022-07-11', '2022-07-12', '2022-10-01', '2022-10-03', '2022-10-08', '2022-10-09',
         '2022-10-10', '2022-12-25', '2022-12-26', '2022-12-27'
     ]
-    
+
+    # Extra holiday calendars: CSV files with 'date' and 'country' columns, filtered to HOLIDAY_COUNTRIES (None keeps all)
+    HOLIDAY_FILES = []
+    HOLIDAY_COUNTRIES = ['NG']
+
+    # Time of day buckets: each label starts at its hour edge, hours before the first edge wrap to the last label
+    TIME_OF_DAY_EDGES = [5, 12, 17, 21]
+    TIME_OF_DAY_LABELS = ['Morning', 'Afternoon', 'Evening', 'Night']
+
     RADIUS = 0.5  # Radius in kilometers for counting riders around accepted orders
+    TIME_WINDOW_MINUTES = 15  # Time window for matching driver pings to order requests
+
+    GRID_CELL_SIZE = 0.005  # Grid cell edge in degrees (~550 m) for bucketing pings and trip endpoints
+
+    DISTANCE_MODE = 'geodesic'  # 'geodesic' (WGS-84, matches geopy) or 'haversine' (spherical, faster)
 
     DATA_FILE_PATH = '/home/moraa/Documents/10_academy/Week-8/artifacts/df_merged.csv'
     LOG_FILE_PATH = 'logs/app.log'
+    MODEL_PATH = os.path.join(ARTIFACTS_DIR, 'models', 'acceptance_model')  # Directory written by models.persistence.save_model
+
+    SEARCH_STRATEGY = 'halving'  # 'halving' (successive halving under a time budget) or 'random' (RandomizedSearchCV)
+    SEARCH_CANDIDATES = 27  # Candidates sampled by the halving search
+    SEARCH_RESOURCE = 'n_estimators'  # Grown between rungs: 'n_estimators' (trees) or 'n_samples' (training rows)
+    SEARCH_FACTOR = 3  # Keep the best 1/factor of each rung and give them factor times the resource
+    SEARCH_MAX_ESTIMATORS = 300  # Trees in the last rung and in the refitted model
+    SEARCH_TIME_BUDGET_S = None  # Wall-clock limit of the search in seconds, None for no limit
+    TRAIN_STREAMING = False  # Train an incremental model on DATA_FILE_PATH in chunks instead of loading it
+    INCREMENTAL_EPOCHS = 5  # Passes over the training chunks in streaming training
+    TEST_SPLIT_KEY = 'Trip_ID'  # Rows are held out for testing by the hash of this column in streaming training
+
+    SERVING_HOST = '127.0.0.1'
+    SERVING_PORT = 8080
+    SERVING_MAX_BATCH_SIZE = 64  # Rows scored in one predict_proba call
+    SERVING_MAX_WAIT_MS = 5.0  # Longest a request waits for its batch to fill
+    SERVING_STATS_WINDOW = 10_000  # Recent requests kept for latency percentiles and throughput
     # Add other configuration parameters as needed
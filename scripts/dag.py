@@ -0,0 +1,251 @@
+# dag.py
+
+import time
+import logging
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, List, Optional
+from config.config import Config
+from artifact_cache import artifact_exists, code_fingerprint, config_fingerprint, file_fingerprint, load_artifact, save_artifact, stage_key
+from memory import check_memory_budget, memory_usage
+from profiling import count_rows, stage_timer
+
+class Stage:
+    """
+    A pipeline step turning named input artifacts into named output artifacts.
+
+    Args:
+        name (str): Stage name, also used for its cache files.
+        func (Callable): Called with the input artifacts in the order of `inputs`. Returns
+            the output, or a tuple of outputs when the stage has several.
+        inputs: Names of the artifacts the stage reads.
+        outputs: Names of the artifacts the stage produces. Defaults to the stage name.
+        files: Files the stage reads directly; their fingerprints are part of its cache key.
+        code: Modules or functions whose source is part of its cache key, besides `func`.
+        config: Names of the Config settings the stage depends on; only these are part of its
+            cache key. None covers every setting.
+        cache (bool): Cache the outputs as Parquet. Turn off for stages that do not return DataFrames.
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Iterable[str] = (), outputs: Iterable[str] = None,
+                 files: Iterable[str] = (), code: Iterable = (), config: Iterable[str] = None, cache: bool = True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) if outputs is not None else (name,)
+        self.files = tuple(files)
+        self.code = tuple(code)
+        self.config = tuple(config) if config is not None else None
+        self.cache = cache
+
+    def __call__(self, *args) -> tuple:
+        result = self.func(*args)
+        return (result,) if len(self.outputs) == 1 else tuple(result)
+
+class Pipeline:
+    """
+    A set of stages wired together by the artifacts they read and produce.
+
+    run() executes only the stages needed for the requested artifacts whose cached
+    outputs are missing or stale, and runs stages that do not depend on each other
+    in parallel threads.
+    """
+
+    def __init__(self, stages: Iterable[Stage] = ()):
+        self.stages: Dict[str, Stage] = {}
+        self.producers: Dict[str, str] = {}
+        # Bytes held by the outputs of each stage in the last run
+        self.memory: Dict[str, int] = {}
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage: Stage) -> Stage:
+        """Register a stage. Each artifact can only have one producer."""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage {stage.name}")
+        for output in stage.outputs:
+            if output in self.producers:
+                raise ValueError(f"Artifact {output} is produced by both {self.producers[output]} and {stage.name}")
+        for output in stage.outputs:
+            self.producers[output] = stage.name
+        self.stages[stage.name] = stage
+        return stage
+
+    def upstream(self, name: str, provided: Iterable[str] = ()) -> List[str]:
+        """Names of the stages producing the inputs of a stage, skipping provided artifacts."""
+        inputs = [artifact for artifact in self.stages[name].inputs if artifact not in provided]
+        missing = [artifact for artifact in inputs if artifact not in self.producers]
+        if missing:
+            raise ValueError(f"Stage {name} reads artifacts no stage produces: {missing}")
+        return list(dict.fromkeys(self.producers[artifact] for artifact in inputs))
+
+    def order(self, names: Iterable[str], provided: Iterable[str] = ()) -> List[str]:
+        """The given stages and everything upstream of them up to provided artifacts, in dependency order."""
+        ordered, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for upstream in self.upstream(name, provided):
+                visit(upstream, path + [name])
+            state[name] = 'done'
+            ordered.append(name)
+
+        for name in names:
+            visit(name, [])
+        return ordered
+
+    def keys(self, names: Iterable[str], provided: Iterable[str] = ()) -> Dict[str, Optional[str]]:
+        """
+        Cache keys of the given stages and their upstream stages.
+
+        A key covers the stage's code, the config settings it declares, the files it reads and the keys of the
+        stages it reads from, so a change anywhere upstream changes it. Stages that are
+        not cached, or that read from one, or from an artifact passed in to run(), have
+        no key and always run.
+        """
+        provided = set(provided)
+        keys = {}
+        for name in self.order(names, provided):
+            stage = self.stages[name]
+            upstream = self.upstream(name, provided)
+            if (not stage.cache or any(artifact in provided for artifact in stage.inputs)
+                    or any(keys[upstream_name] is None for upstream_name in upstream)):
+                keys[name] = None
+                continue
+            keys[name] = stage_key(name, code_fingerprint(stage.func, *stage.code), config_fingerprint(stage.config),
+                                   *(file_fingerprint(path) for path in stage.files),
+                                   *(keys[upstream_name] for upstream_name in upstream))
+        return keys
+
+    def plan(self, targets: Iterable[str], provided: Iterable[str] = (), keys: Dict[str, Optional[str]] = None) -> Dict[str, str]:
+        """
+        Decide which stages to run and which to load from the cache for the target artifacts.
+
+        Returns:
+            dict: Stage name -> 'run' or 'load', in dependency order. Stages upstream of a
+            cache hit are left out.
+        """
+        provided = set(provided)
+        needed = [self.producers[artifact] for artifact in targets if artifact not in provided]
+        keys = keys if keys is not None else self.keys(needed, provided)
+        actions = {}
+
+        def visit(name):
+            if name in actions:
+                return
+            stage = self.stages[name]
+            if Config.CACHE_ENABLED and keys[name] is not None and artifact_exists(name, keys[name], len(stage.outputs)):
+                actions[name] = 'load'
+                return
+            actions[name] = 'run'
+            for upstream in self.upstream(name, provided):
+                visit(upstream)
+
+        for name in needed:
+            visit(name)
+        return {name: actions[name] for name in keys if name in actions}
+
+    def run(self, targets: Iterable[str] = None, values: Dict[str, object] = None, max_workers: int = None) -> Dict[str, object]:
+        """
+        Produce the target artifacts.
+
+        Args:
+            targets: Artifact names to return. Defaults to every artifact.
+            values (dict): Artifacts to use as given instead of running their producers.
+            max_workers (int): Threads for independent stages. Defaults to Config.PIPELINE_MAX_WORKERS.
+
+        Returns:
+            dict: Artifact name -> value for each target.
+        """
+        targets = list(targets) if targets is not None else list(self.producers)
+        values = dict(values or {})
+        unknown = [artifact for artifact in targets if artifact not in self.producers and artifact not in values]
+        if unknown:
+            raise ValueError(f"No stage produces {unknown}")
+
+        keys = self.keys([self.producers[artifact] for artifact in targets if artifact not in values], values)
+        actions = self.plan(targets, values, keys)
+        dependencies = {name: [] if action == 'load' else self.upstream(name, values)
+                        for name, action in actions.items()}
+
+        # Artifacts read by several stages, or read and also returned, are copied for each
+        # reader since stages may modify their inputs in place
+        readers = {}
+        for name, action in actions.items():
+            if action == 'run':
+                for artifact in self.stages[name].inputs:
+                    readers[artifact] = readers.get(artifact, 0) + 1
+        for artifact in targets:
+            readers[artifact] = readers.get(artifact, 0) + 1
+
+        def take(artifact):
+            value = values[artifact]
+            readers[artifact] -= 1
+            if readers[artifact] > 0:
+                return value.copy() if isinstance(value, (pd.DataFrame, pd.Series)) else value
+            # Last reader: drop intermediates so they can be freed
+            if artifact not in targets:
+                del values[artifact]
+            return value
+
+        pending = dict(actions)
+        running = {}
+        failed = None
+        with ThreadPoolExecutor(max_workers=max_workers or Config.PIPELINE_MAX_WORKERS) as executor:
+            try:
+                while pending or running:
+                    for name in list(pending):
+                        if any(upstream in pending or upstream in running.values() for upstream in dependencies[name]):
+                            continue
+                        stage = self.stages[name]
+                        args = [take(artifact) for artifact in stage.inputs] if pending[name] == 'run' else []
+                        running[executor.submit(self._execute, stage, keys[name], pending.pop(name), args)] = name
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        failed = running.pop(future)
+                        values.update(zip(self.stages[failed].outputs, future.result()))
+                        failed = None
+            except Exception as e:
+                for future in running:
+                    future.cancel()
+                logging.error(f"Pipeline failed in stage {failed}: {e}" if failed else f"Pipeline failed: {e}")
+                raise
+
+        return {artifact: values[artifact] for artifact in targets}
+
+    def _execute(self, stage: Stage, key: Optional[str], action: str, args: list) -> tuple:
+        """Load a stage's outputs from the cache or compute them, and check them against the memory budget."""
+        with stage_timer(f"pipeline.{stage.name}", count_rows(args)) as record:
+            record['action'] = action
+            result = self._load_or_compute(stage, key, action, args)
+            record['rows_out'] = count_rows(result)
+        self.memory[stage.name] = nbytes = memory_usage(result)
+        logging.info(f"Stage {stage.name} outputs use {nbytes / 1e6:.1f} MB.")
+        check_memory_budget(f"Stage {stage.name}", nbytes)
+        return result
+
+    def _load_or_compute(self, stage: Stage, key: Optional[str], action: str, args: list) -> tuple:
+        """Load a stage's outputs from the cache, falling back to computing and caching them."""
+        start = time.perf_counter()
+        outputs = len(stage.outputs)
+        result = None
+        if action == 'load':
+            result = load_artifact(stage.name, key, outputs)
+            if result is not None:
+                result = (result,) if outputs == 1 else result
+            else:
+                # The cached file could not be read: rebuild its inputs and compute it
+                logging.warning(f"Recomputing stage {stage.name} from its inputs.")
+                inputs = self.run(stage.inputs)
+                args = [inputs[artifact] for artifact in stage.inputs]
+
+        if result is None:
+            result = stage(*args)
+            logging.info(f"Ran stage {stage.name} in {time.perf_counter() - start:.2f}s.")
+            if Config.CACHE_ENABLED and key is not None:
+                save_artifact(stage.name, key, result[0] if outputs == 1 else result, outputs)
+        return result
@@ -1,7 +1,9 @@
 import pandas as pd
 import logging
 from config.config import Config
-from typing import Tuple
+from profiling import profile_stage
+from memory import read_csv_planned
+from typing import Iterator, Tuple
 
 def setup_logging() -> None:
     """Sets up the logging configuration."""
@@ -11,6 +13,7 @@ def setup_logging() -> None:
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
+@profile_stage
 def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Loads the data from the specified file paths.
@@ -19,8 +22,8 @@ def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
         Tuple[pd.DataFrame, pd.DataFrame]: The loaded dataframes.
     """
     try:
-        df1 = pd.read_csv(Config.DF1_PATH)
-        df2 = pd.read_csv(Config.DF2_PATH)
+        df1 = read_csv_planned(Config.DF1_PATH)
+        df2 = read_csv_planned(Config.DF2_PATH)
         logging.info("Data loaded successfully.")
         return df1, df2
     except FileNotFoundError as e:
@@ -33,6 +36,65 @@ def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
         logging.error(f"An error occurred while loading data: {e}")
         raise
 
+def load_data_chunks(chunksize: int = None) -> Tuple[Iterator[pd.DataFrame], Iterator[pd.DataFrame]]:
+    """
+    Opens chunked readers over the data files instead of loading them whole.
+
+    Args:
+        chunksize (int): Rows per chunk. Defaults to Config.CHUNK_SIZE.
+
+    Returns:
+        Tuple[Iterator[pd.DataFrame], Iterator[pd.DataFrame]]: Chunk iterators for df1 and df2.
+    """
+    chunksize = chunksize or Config.CHUNK_SIZE
+    try:
+        df1_chunks = pd.read_csv(Config.DF1_PATH, chunksize=chunksize, dtype=Config.DTYPE_PLAN)
+        df2_chunks = pd.read_csv(Config.DF2_PATH, chunksize=chunksize, dtype=Config.DTYPE_PLAN)
+        logging.info(f"Opened chunked readers with {chunksize} rows per chunk.")
+        return df1_chunks, df2_chunks
+    except FileNotFoundError as e:
+        logging.error(f"File not found: {e}")
+        raise
+    except Exception as e:
+        logging.error(f"An error occurred while opening chunked readers: {e}")
+        raise
+
+@profile_stage
+def drop_ping_columns(df1: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drops the unused columns from df1, keeping the ping timestamps if configured.
+
+    Args:
+        df1 (pd.DataFrame): The driver location dataframe.
+
+    Returns:
+        pd.DataFrame: df1 without Config.DF1_DROP_COLUMNS.
+    """
+    drop_columns = Config.DF1_DROP_COLUMNS
+    if Config.KEEP_PING_TIMESTAMPS:
+        drop_columns = [column for column in drop_columns if column not in Config.DF1_TIMESTAMP_COLUMNS]
+    df1.drop(columns=drop_columns, inplace=True)
+    logging.info("Dropped specified columns from df1.")
+    return df1
+
+@profile_stage
+def impute_trip_values(df2: pd.DataFrame) -> pd.DataFrame:
+    """
+    Imputes missing values in df2 as configured in Config.DF2_IMPUTE_COLUMNS.
+
+    Args:
+        df2 (pd.DataFrame): The trip dataframe.
+
+    Returns:
+        pd.DataFrame: df2 with missing values imputed.
+    """
+    for column, method in Config.DF2_IMPUTE_COLUMNS.items():
+        if method == 'mode':
+            df2[column] = df2[column].fillna(df2[column].mode()[0])
+    logging.info("Imputed missing values in df2.")
+    return df2
+
+@profile_stage
 def handle_missing_values(df1: pd.DataFrame, df2: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Handles missing values in the dataframes.
@@ -45,16 +107,8 @@ def handle_missing_values(df1: pd.DataFrame, df2: pd.DataFrame) -> Tuple[pd.Data
         Tuple[pd.DataFrame, pd.DataFrame]: The dataframes with missing values handled.
     """
     try:
-        # Drop specified columns in df1
-        df1.drop(columns=Config.DF1_DROP_COLUMNS, inplace=True)
-        logging.info("Dropped specified columns from df1.")
-
-        # Impute missing values in df2
-        for column, method in Config.DF2_IMPUTE_COLUMNS.items():
-            if method == 'mode':
-                df2[column] = df2[column].fillna(df2[column].mode()[0])
-        logging.info("Imputed missing values in df2.")
-
+        df1 = drop_ping_columns(df1)
+        df2 = impute_trip_values(df2)
         return df1, df2
     except KeyError as e:
         logging.error(f"Column not found: {e}")
@@ -63,6 +117,7 @@ def handle_missing_values(df1: pd.DataFrame, df2: pd.DataFrame) -> Tuple[pd.Data
         logging.error(f"An error occurred while handling missing values: {e}")
         raise
 
+@profile_stage
 def preprocess_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Preprocesses the data by loading and handling missing values.
@@ -1,10 +1,16 @@
 # feature.py
 
+import numpy as np
 import pandas as pd
-from geopy.distance import geodesic
+from pandas.tseries.api import guess_datetime_format
 from sklearn.preprocessing import StandardScaler
 import logging
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from config.config import Config
+from profiling import profile_stage
+from distance import compute_distance
+from grid import lat_lng_to_cell
+from holiday_calendar import get_holiday_calendar
 
 # Configure logging
 logging.basicConfig(
@@ -13,20 +19,118 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+FEATURES_TO_SCALE = ['lat', 'lng', 'Origin Lat', 'Origin Lng', 'Destination Lat', 'Destination Lng', 'Trip Duration', 'Driver Distance to Origin', 'Trip Distance']
+
+def _to_datetime(values, fmt: str, name: str):
+    """pd.to_datetime with a declared format, falling back to per-value inference if it does not fit."""
+    try:
+        return pd.to_datetime(values, format=fmt)
+    except (ValueError, TypeError):
+        logging.warning(f"Values of {name} do not all match format {fmt}; inferring per value.")
+        return pd.to_datetime(values, format='mixed')
+
+def _estimate_unique_ratio(values: pd.Series, sample_size: int = 10_000) -> float:
+    """Estimate the share of distinct values in a column from an evenly spaced sample."""
+    sample = values.iloc[::max(1, len(values) // sample_size)].dropna()
+    k, d = len(sample), sample.nunique()
+    if k == 0 or d == k:
+        return 1.0
+    # k draws from u equally likely values give about u * (1 - exp(-k / u)) distinct ones; solve for u
+    lo, hi = float(d), float(max(len(values), d))
+    for _ in range(50):
+        mid = (lo + hi) / 2
+        if mid * (1 - np.exp(-k / mid)) < d:
+            lo = mid
+        else:
+            hi = mid
+    return hi / len(values)
+
+@profile_stage
+def parse_datetime_column(values: pd.Series, fmt: str = None) -> pd.Series:
+    """
+    Parse a column to datetime64 once, reusing the result for repeated timestamp strings.
+
+    Columns that are already datetime64 are returned untouched, so repeated calls are free.
+    The format comes from fmt, then Config.DATETIME_FORMATS, then is guessed from the first
+    value; if the format does not fit every value pandas falls back to per-element inference.
+    Columns with mostly repeated values are parsed once per distinct string.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    first_valid = values.first_valid_index()
+    if first_valid is None:
+        return pd.to_datetime(values)
+    fmt = fmt or Config.DATETIME_FORMATS.get(values.name) or guess_datetime_format(str(values[first_valid]))
+
+    # Factorizing costs about as much as parsing, so only do it when there are many repeats
+    if _estimate_unique_ratio(values) > Config.DATETIME_UNIQUE_RATIO:
+        return _to_datetime(values, fmt, values.name)
+
+    codes, uniques = pd.factorize(values)
+    result = _to_datetime(pd.Index(uniques), fmt, values.name).to_numpy()[codes]
+    # Missing values have code -1
+    result[codes == -1] = np.datetime64('NaT')
+    return pd.Series(result, index=values.index, name=values.name)
+
+@profile_stage
+def parse_timestamps(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    """Parse every timestamp column exactly once so later steps can use them directly."""
+    try:
+        columns = [column for column in (columns or Config.DATETIME_COLUMNS) if column in df.columns]
+        for column in columns:
+            df[column] = parse_datetime_column(df[column])
+        logging.info(f"Parsed timestamp columns {columns}.")
+    except Exception as e:
+        logging.error(f"Error parsing timestamp columns: {e}")
+        raise
+    return df
+
+@profile_stage
 def preprocess_datetime(df: pd.DataFrame) -> pd.DataFrame:
     """Ensure Trip Start Time is in datetime format."""
     try:
-        df['Trip Start Time'] = pd.to_datetime(df['Trip Start Time'])
+        df['Trip Start Time'] = parse_datetime_column(df['Trip Start Time'])
         logging.info("Preprocessed Trip Start Time to datetime format.")
     except Exception as e:
         logging.error(f"Error preprocessing Trip Start Time: {e}")
         raise
     return df
 
+# Rows per batch when filling derived columns of the merged table, so temporaries stay small
+BATCH_ROWS = 1 << 16
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def _time_parts(values: pd.Series):
+    """Hour of day, day of week (Monday=0) and missing mask computed straight from datetime64 values."""
+    hours = values.to_numpy(dtype='datetime64[ns]').astype('datetime64[h]')
+    missing = np.isnat(hours)
+    hours = hours.astype(np.int64)
+    hour = (hours % 24).astype(np.int8)
+    # 1970-01-01 was a Thursday
+    day_of_week = ((hours // 24 + 3) % 7).astype(np.int8)
+    return hour, day_of_week, missing
+
+def _small_int(values: np.ndarray, missing: np.ndarray):
+    """int8 values, or nullable Int8 when some are missing."""
+    if missing.any():
+        return pd.arrays.IntegerArray(values, missing)
+    return values
+
+def _add_block(df: pd.DataFrame, columns: list, values: np.ndarray) -> pd.DataFrame:
+    """Append the columns of a 2D array as a single block, replacing columns of the same name."""
+    block = pd.DataFrame(values, columns=columns, index=df.index, copy=False)
+    existing = [column for column in columns if column in df.columns]
+    if existing:
+        df = df.drop(columns=existing)
+    return pd.concat([df, block], axis=1)
+
+@profile_stage
 def extract_day_of_week(df: pd.DataFrame) -> pd.DataFrame:
     """Extract day of the week from Trip Start Time."""
     try:
-        df['Day of Week'] = df['Trip Start Time'].dt.day_name()
+        _, day_of_week, missing = _time_parts(df['Trip Start Time'])
+        df['Day of Week'] = pd.Categorical.from_codes(np.where(missing, -1, day_of_week), categories=DAY_NAMES, ordered=True)
         logging.info("Extracted Day of Week from Trip Start Time.")
     except Exception as e:
         logging.error(f"Error extracting Day of Week: {e}")
@@ -35,70 +139,237 @@ def extract_day_of_week(df: pd.DataFrame) -> pd.DataFrame:
 
 def categorize_time_of_day(hour: int) -> str:
     """Categorize time of day."""
-    if 5 <= hour < 12:
-        return 'Morning'
-    elif 12 <= hour < 17:
-        return 'Afternoon'
-    elif 17 <= hour < 21:
-        return 'Evening'
-    else:
-        return 'Night'
+    # Each label starts at its edge; hours before the first edge belong to the last label
+    position = np.searchsorted(Config.TIME_OF_DAY_EDGES, hour, side='right') - 1
+    return Config.TIME_OF_DAY_LABELS[position % len(Config.TIME_OF_DAY_LABELS)]
 
+@profile_stage
 def extract_hour_and_time_of_day(df: pd.DataFrame) -> pd.DataFrame:
     """Extract hour from Trip Start Time and create Time of Day feature."""
     try:
-        df['Hour'] = df['Trip Start Time'].dt.hour
-        df['Time of Day'] = df['Hour'].apply(categorize_time_of_day)
+        hour, _, missing = _time_parts(df['Trip Start Time'])
+        labels = Config.TIME_OF_DAY_LABELS
+        codes = (np.searchsorted(Config.TIME_OF_DAY_EDGES, hour, side='right') - 1) % len(labels)
+        df['Hour'] = _small_int(hour, missing)
+        df['Time of Day'] = pd.Categorical.from_codes(np.where(missing, -1, codes), categories=labels)
         logging.info("Extracted Hour and Time of Day from Trip Start Time.")
     except Exception as e:
         logging.error(f"Error extracting Hour and Time of Day: {e}")
         raise
     return df
 
+@profile_stage
 def create_is_holiday_feature(df: pd.DataFrame) -> pd.DataFrame:
     """Create feature indicating if the date is a holiday."""
     try:
-        all_holidays = pd.to_datetime(Config.HOLIDAYS_2021 + Config.HOLIDAYS_2022)
-        df['Is Holiday'] = df['Trip Start Time'].dt.date.isin(all_holidays.date)
+        df['Is Holiday'] = get_holiday_calendar().is_holiday(df['Trip Start Time'])
         logging.info("Created Is Holiday feature.")
     except Exception as e:
         logging.error(f"Error creating Is Holiday feature: {e}")
         raise
     return df
 
+@profile_stage
+def create_holiday_distance_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Create days to next holiday and days since previous holiday features."""
+    try:
+        calendar = get_holiday_calendar()
+        df['Days To Next Holiday'] = calendar.days_to_next_holiday(df['Trip Start Time'])
+        df['Days Since Last Holiday'] = calendar.days_since_previous_holiday(df['Trip Start Time'])
+        logging.info("Created holiday distance features.")
+    except Exception as e:
+        logging.error(f"Error creating holiday distance features: {e}")
+        raise
+    return df
+
+@profile_stage
 def preprocess_trip_times(df: pd.DataFrame) -> pd.DataFrame:
     """Ensure Trip Start Time and Trip End Time are in datetime format."""
     try:
-        df['Trip Start Time'] = pd.to_datetime(df['Trip Start Time'])
-        df['Trip End Time'] = pd.to_datetime(df['Trip End Time'])
+        df['Trip Start Time'] = parse_datetime_column(df['Trip Start Time'])
+        df['Trip End Time'] = parse_datetime_column(df['Trip End Time'])
         logging.info("Preprocessed Trip Start Time and Trip End Time to datetime format.")
     except Exception as e:
         logging.error(f"Error preprocessing Trip Start Time and Trip End Time: {e}")
         raise
     return df
 
+def _split_lat_lng(series: pd.Series) -> np.ndarray:
+    """Parse 'lat,lng' strings once per distinct value and look rows up by category code; missing rows are NaN."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    categories = pd.Series(series.cat.categories.astype(str), dtype=object)
+    coordinates = categories.str.split(',', expand=True).reindex(columns=[0, 1]).astype(Config.COORDINATE_DTYPE).to_numpy()
+    # Code -1 marks a missing value and reads the NaN row appended last
+    coordinates = np.vstack([coordinates, np.full((1, 2), np.nan, dtype=coordinates.dtype)])
+    return coordinates[series.cat.codes.to_numpy()]
+
+@profile_stage
 def split_origin_destination(df: pd.DataFrame) -> pd.DataFrame:
     """Split Trip Origin and Trip Destination into latitude and longitude."""
     try:
-        df[['Origin Lat', 'Origin Lng']] = df['Trip Origin'].str.split(',', expand=True).astype(float)
-        df[['Destination Lat', 'Destination Lng']] = df['Trip Destination'].str.split(',', expand=True).astype(float)
+        df[['Origin Lat', 'Origin Lng']] = _split_lat_lng(df['Trip Origin'])
+        df[['Destination Lat', 'Destination Lng']] = _split_lat_lng(df['Trip Destination'])
         logging.info("Split Trip Origin and Trip Destination into latitude and longitude.")
     except Exception as e:
         logging.error(f"Error splitting Trip Origin and Trip Destination: {e}")
         raise
     return df
 
+@profile_stage
+def assign_grid_cells(df: pd.DataFrame, cell_size: float = None) -> pd.DataFrame:
+    """Assign integer grid cell ids to driver pings and trip origins and destinations."""
+    try:
+        cell_size = cell_size or Config.GRID_CELL_SIZE
+        pairs = [(lat, lng, cell) for lat, lng, cell in [('lat', 'lng', 'Ping Cell'),
+                                                         ('Origin Lat', 'Origin Lng', 'Origin Cell'),
+                                                         ('Destination Lat', 'Destination Lng', 'Destination Cell')]
+                 if lat in df.columns and lng in df.columns]
+        cells = np.empty((len(df), len(pairs)), dtype=np.int64)
+        for i, (lat, lng, _) in enumerate(pairs):
+            lat, lng = df[lat].to_numpy(), df[lng].to_numpy()
+            for start in range(0, len(df), BATCH_ROWS):
+                rows = slice(start, start + BATCH_ROWS)
+                cells[rows, i] = lat_lng_to_cell(lat[rows], lng[rows], cell_size)
+        df = _add_block(df, [cell for _, _, cell in pairs], cells)
+        logging.info(f"Assigned grid cells of {cell_size} degrees.")
+    except Exception as e:
+        logging.error(f"Error assigning grid cells: {e}")
+        raise
+    return df
+
+def od_key_stride(cell_size: float = None) -> int:
+    """
+    Number of grid cells, the multiplier of the origin cell in origin-destination keys.
+
+    Raises:
+        ValueError: When the grid is too fine for the keys to fit in 64 bits.
+    """
+    cell_size = cell_size or Config.GRID_CELL_SIZE
+    n_cells = int(np.ceil(180 / cell_size)) * int(np.ceil(360 / cell_size))
+    if n_cells > np.iinfo(np.int64).max // n_cells:
+        raise ValueError(f"Grid cells of {cell_size} degrees are too small for 64-bit origin-destination keys")
+    return n_cells
+
+def od_pair_keys(origin_cells: np.ndarray, destination_cells: np.ndarray, cell_size: float = None) -> np.ndarray:
+    """
+    Combine origin and destination grid cells into int64 pair keys, -1 where either is missing.
+
+    Keys are origin * n_cells + destination, so the same pair gets the same key in every batch.
+
+    Raises:
+        ValueError: When the grid is too fine for the keys to fit in 64 bits.
+    """
+    n_cells = od_key_stride(cell_size)
+    origin_cells = np.asarray(origin_cells, dtype=np.int64)
+    destination_cells = np.asarray(destination_cells, dtype=np.int64)
+    valid = (origin_cells >= 0) & (destination_cells >= 0)
+    return np.where(valid, origin_cells * n_cells + destination_cells, -1)
+
+@profile_stage
+def create_origin_destination_features(df: pd.DataFrame, cell_size: float = None) -> pd.DataFrame:
+    """
+    Create origin-destination pair features from the grid cells of trip origins and destinations.
+
+    Origin-Destination Key is the int64 pair key, Origin-Destination_Count the number of rows
+    with the same pair and Origin-Destination_Encoded the rank of the key among the pairs
+    present, like a LabelEncoder. Rows with a missing endpoint get key and encoding -1 and
+    count 0. The Origin Cell and Destination Cell columns are reused when present and no
+    cell_size is given.
+    """
+    try:
+        if cell_size is None and 'Origin Cell' in df.columns and 'Destination Cell' in df.columns:
+            origin_cells, destination_cells = df['Origin Cell'].to_numpy(), df['Destination Cell'].to_numpy()
+        else:
+            origin_cells = lat_lng_to_cell(df['Origin Lat'].to_numpy(), df['Origin Lng'].to_numpy(), cell_size)
+            destination_cells = lat_lng_to_cell(df['Destination Lat'].to_numpy(), df['Destination Lng'].to_numpy(), cell_size)
+        keys = od_pair_keys(origin_cells, destination_cells, cell_size)
+        valid = keys >= 0
+        codes = np.full(len(keys), -1, dtype=np.int64)
+        counts = np.zeros(len(keys), dtype=np.int64)
+        codes[valid], uniques = pd.factorize(keys[valid], sort=True)
+        counts[valid] = np.bincount(codes[valid], minlength=len(uniques))[codes[valid]]
+        df = _add_block(df, ['Origin-Destination Key', 'Origin-Destination_Count', 'Origin-Destination_Encoded'],
+                        np.column_stack([keys, counts, codes]))
+        logging.info(f"Created origin-destination features for {len(uniques)} pairs.")
+    except Exception as e:
+        logging.error(f"Error creating origin-destination features: {e}")
+        raise
+    return df
+
+DRIVER_AVERAGE_COLUMNS = ['Time_Since_Last_Trip', 'Acceptance_Rate', 'Avg_Trip_Distance', 'Avg_Trip_Duration', 'Avg_Speed']
+
+@profile_stage
+def create_driver_history_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create per-driver history features on the merged table in one sort by driver and time.
+
+    Time_Since_Last_Trip (hours) and Previous_Trip_End_Hour/Day_of_Week/Month come from
+    the driver's previous row; Acceptance_Rate, Driver_Experience, Avg_Trip_Distance,
+    Avg_Trip_Duration and Avg_Speed are per-driver aggregates broadcast to every row.
+    Avg_Speed averages Average Speed when present, otherwise Trip Distance over Trip Duration.
+    """
+    try:
+        start = df['Trip Start Time'].to_numpy(dtype='datetime64[ns]')
+        end = df['Trip End Time'].to_numpy(dtype='datetime64[ns]')
+        if 'Average Speed' in df.columns:
+            speed = df['Average Speed'].to_numpy(dtype=np.float64)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                speed = df['Trip Distance'].to_numpy(dtype=np.float64) / (df['Trip Duration'].to_numpy(dtype=np.float64) / 60)
+            speed[~np.isfinite(speed)] = np.nan
+        history = pd.DataFrame({
+            'driver_id': df['driver_id'].to_numpy(),
+            'start': start,
+            'end': end,
+            'accepted': (df['driver_action'] == 'accepted').to_numpy(dtype=np.float64),
+            'distance': df['Trip Distance'].to_numpy(dtype=np.float64),
+            'duration': df['Trip Duration'].to_numpy(dtype=np.float64),
+            'speed': speed,
+        })
+        history = history.sort_values(['driver_id', 'start'], kind='stable')
+        grouped = history.groupby('driver_id', sort=False, dropna=False)
+        previous_end = grouped['end'].shift(1).to_numpy(dtype='datetime64[ns]')
+        averages = grouped[['accepted', 'distance', 'duration', 'speed']].transform('mean').to_numpy()
+        experience = grouped['driver_id'].transform('size').to_numpy()
+
+        # Scatter the sorted results back to the original row order
+        position = history.index.to_numpy()
+        values = np.empty((len(df), len(DRIVER_AVERAGE_COLUMNS)))
+        values[position, 0] = (history['start'].to_numpy() - previous_end) / np.timedelta64(1, 'h')
+        values[position, 1:] = averages
+        df = _add_block(df, DRIVER_AVERAGE_COLUMNS, values)
+
+        driver_experience = np.empty(len(df), dtype=np.int64)
+        driver_experience[position] = experience
+        df['Driver_Experience'] = pd.to_numeric(driver_experience, downcast='integer')
+        previous = np.empty(len(df), dtype='datetime64[ns]')
+        previous[position] = previous_end
+        hour, day_of_week, missing = _time_parts(pd.Series(previous))
+        month = pd.DatetimeIndex(previous).month.to_numpy(dtype=np.float64, na_value=0).astype(np.int8)
+        df['Previous_Trip_End_Hour'] = _small_int(hour, missing)
+        df['Previous_Trip_End_Day_of_Week'] = _small_int(day_of_week, missing)
+        df['Previous_Trip_End_Month'] = _small_int(month, missing)
+        logging.info("Created driver history features.")
+    except Exception as e:
+        logging.error(f"Error creating driver history features: {e}")
+        raise
+    return df
+
+@profile_stage
 def extract_additional_time_features(df: pd.DataFrame) -> pd.DataFrame:
     """Extract additional time-based features."""
     try:
-        df['Start Hour'] = df['Trip Start Time'].dt.hour
-        df['Start Day of Week'] = df['Trip Start Time'].dt.dayofweek
+        hour, day_of_week, missing = _time_parts(df['Trip Start Time'])
+        df['Start Hour'] = _small_int(hour, missing)
+        df['Start Day of Week'] = _small_int(day_of_week, missing)
         logging.info("Extracted additional time-based features.")
     except Exception as e:
         logging.error(f"Error extracting additional time-based features: {e}")
         raise
     return df
 
+@profile_stage
 def calculate_trip_duration(df: pd.DataFrame) -> pd.DataFrame:
     """Calculate trip duration in minutes."""
     try:
@@ -109,31 +380,180 @@ def calculate_trip_duration(df: pd.DataFrame) -> pd.DataFrame:
         raise
     return df
 
-def merge_and_calculate_distances(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-    """Merge datasets and calculate distances."""
-    try:
-        df1.rename(columns={'order_id': 'Trip ID'}, inplace=True)
-        df_merged = pd.merge(df1, df2, on='Trip ID')
+def sort_by_trip_id(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort trips by Trip ID once so joins against them can skip sorting."""
+    if 'Trip ID' in df.columns and not df['Trip ID'].is_monotonic_increasing:
+        df = df.sort_values('Trip ID', kind='stable', ignore_index=True)
+    return df
+
+def _join_indexer(left_keys: np.ndarray, right_keys: np.ndarray):
+    """
+    Row positions of the matching pairs of an inner join.
+
+    Only the right keys are sorted (skipped if they already are). Unique integer keys
+    over a compact range are then indexed by a dense key -> row array; otherwise each
+    left key finds its run of matches by binary search. Either way pairs come out in
+    left row order and, within a left row, in right row order, like pd.merge.
+    """
+    if len(right_keys) > 1 and not (right_keys[1:] >= right_keys[:-1]).all():
+        right_order = np.argsort(right_keys, kind='stable')
+    else:
+        right_order = np.arange(len(right_keys))
+    sorted_keys = right_keys[right_order]
+
+    if (left_keys.dtype.kind in 'iu' and len(sorted_keys)
+            and (sorted_keys[1:] > sorted_keys[:-1]).all()
+            and int(sorted_keys[-1]) - int(sorted_keys[0]) < 4 * len(sorted_keys) + 1024):
+        low, size = int(sorted_keys[0]), int(sorted_keys[-1]) - int(sorted_keys[0]) + 1
+        # The extra last slot stays -1 and catches keys outside the range
+        rows = np.full(size + 1, -1, dtype=np.int64)
+        rows[sorted_keys.astype(np.int64) - low] = right_order
+        offsets = left_keys.astype(np.int64) - low
+        offsets[(offsets < 0) | (offsets >= size)] = size
+        matched = rows[offsets]
+        left_index = np.flatnonzero(matched >= 0)
+        return left_index, matched[left_index]
+
+    start = np.searchsorted(sorted_keys, left_keys, side='left')
+    counts = np.searchsorted(sorted_keys, left_keys, side='right') - start
+    left_index = np.repeat(np.arange(len(left_keys)), counts)
+    run_offsets = np.arange(len(left_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_index = right_order[np.repeat(start, counts) + run_offsets]
+    return left_index, right_index
+
+@profile_stage
+def join_on_trip_id(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
+    """
+    Inner join df1 and df2 on Trip ID with the same rows, row order and columns as pd.merge.
+
+    Numeric keys go through a sorted join that gathers each side once into the output;
+    other keys, or overlapping column names, fall back to pd.merge.
+    """
+    left_keys, right_keys = df1['Trip ID'].to_numpy(), df2['Trip ID'].to_numpy()
+    overlap = set(df1.columns) & set(df2.columns) - {'Trip ID'}
+    if overlap or left_keys.dtype.kind not in 'iuf' or right_keys.dtype.kind not in 'iuf':
+        return pd.merge(df1, df2, on='Trip ID')
+    dtype = np.result_type(left_keys.dtype, right_keys.dtype)
+    left_index, right_index = _join_indexer(left_keys.astype(dtype, copy=False), right_keys.astype(dtype, copy=False))
+    left = df1.take(left_index).reset_index(drop=True)
+    right = df2.drop(columns='Trip ID').take(right_index).reset_index(drop=True)
+    return pd.concat([left, right], axis=1)
+
+def _merge_partition(df1: pd.DataFrame, df2: pd.DataFrame, mode: str = None) -> pd.DataFrame:
+    """Merge one pair of partitions on Trip ID and compute the distance columns."""
+    df_merged = join_on_trip_id(df1, df2)
+    lat, lng, origin_lat, origin_lng, destination_lat, destination_lng = (
+        df_merged[column].to_numpy() for column in ['lat', 'lng', 'Origin Lat', 'Origin Lng', 'Destination Lat', 'Destination Lng'])
+    distances = np.empty((len(df_merged), 2))
+    for start in range(0, len(df_merged), BATCH_ROWS):
+        rows = slice(start, start + BATCH_ROWS)
+        distances[rows, 0] = compute_distance(lat[rows], lng[rows], origin_lat[rows], origin_lng[rows], mode=mode)
+        distances[rows, 1] = compute_distance(origin_lat[rows], origin_lng[rows], destination_lat[rows], destination_lng[rows], mode=mode)
+    return _add_block(df_merged, ['Driver Distance to Origin', 'Trip Distance'], distances)
+
+def _partition_rows(n_partitions: int, codes: np.ndarray) -> list:
+    """Row positions of each partition, in their original order."""
+    partition = codes % n_partitions
+    order = np.argsort(partition, kind='stable')
+    return np.split(order, np.searchsorted(partition[order], np.arange(1, n_partitions)))
+
+@profile_stage
+def merge_partitioned(df1: pd.DataFrame, df2: pd.DataFrame, workers: int = None, partition_rows: int = None) -> pd.DataFrame:
+    """
+    Merge df1 and df2 on Trip ID and compute distances in a process pool.
+
+    Both sides are hash-partitioned on Trip ID so matching rows land in the same
+    partition. At most two partitions per worker are in flight at a time, and the
+    result is put back in the row order of a single pd.merge.
 
-        def calculate_distance(row, lat1, lon1, lat2, lon2):
-            point1 = (row[lat1], row[lon1])
-            point2 = (row[lat2], row[lon2])
-            return geodesic(point1, point2).kilometers
+    Args:
+        df1 (pd.DataFrame): Pings with a Trip ID column.
+        df2 (pd.DataFrame): Trips with a Trip ID column.
+        workers (int): Worker processes. Defaults to Config.MERGE_WORKERS.
+        partition_rows (int): Target df1 rows per partition. Defaults to Config.MERGE_PARTITION_ROWS.
 
-        df_merged['Driver Distance to Origin'] = df_merged.apply(lambda row: calculate_distance(row, 'lat', 'lng', 'Origin Lat', 'Origin Lng'), axis=1)
-        df_merged['Trip Distance'] = df_merged.apply(lambda row: calculate_distance(row, 'Origin Lat', 'Origin Lng', 'Destination Lat', 'Destination Lng'), axis=1)
+    Returns:
+        pd.DataFrame: The merged DataFrame.
+    """
+    workers = workers or Config.MERGE_WORKERS
+    partition_rows = partition_rows or Config.MERGE_PARTITION_ROWS
+    n_partitions = max(1, -(-len(df1) // partition_rows))
+
+    # Factorize the keys of both sides together so equal ids get the same code whatever their dtype
+    codes, _ = pd.factorize(pd.concat([df1['Trip ID'], df2['Trip ID']], ignore_index=True))
+    left_parts = _partition_rows(n_partitions, codes[:len(df1)])
+    right_parts = _partition_rows(n_partitions, codes[len(df1):])
+
+    results, running = {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for i, (left, right) in enumerate(zip(left_parts, right_parts)):
+            if len(left) == 0 or len(right) == 0:
+                continue
+            while len(running) >= 2 * workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+            left_df = df1.iloc[left].assign(_left_row=left)
+            right_df = df2.iloc[right].assign(_right_row=right)
+            running[executor.submit(_merge_partition, left_df, right_df, Config.DISTANCE_MODE)] = i
+        for future in running:
+            results[running[future]] = future.result()
+
+    if not results:
+        return _merge_partition(df1.iloc[:0], df2.iloc[:0])
+    df_merged = pd.concat([results[i] for i in sorted(results)], ignore_index=True)
+    df_merged = df_merged.sort_values(['_left_row', '_right_row'], kind='stable', ignore_index=True)
+    logging.info(f"Merged {n_partitions} partitions with {workers} workers.")
+    return df_merged.drop(columns=['_left_row', '_right_row'])
+
+@profile_stage
+def merge_and_calculate_distances(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
+    """Merge datasets and calculate distances, in a process pool when Config.MERGE_WORKERS > 1 and df1 is large."""
+    try:
+        df1 = df1.rename(columns={'order_id': 'Trip ID'})
+        if Config.MERGE_WORKERS > 1 and len(df1) > Config.MERGE_PARTITION_ROWS:
+            df_merged = merge_partitioned(df1, df2)
+        else:
+            df_merged = _merge_partition(df1, df2)
         logging.info("Merged datasets and calculated distances.")
     except Exception as e:
         logging.error(f"Error merging datasets and calculating distances: {e}")
         raise
     return df_merged
 
-def scale_features(df: pd.DataFrame) -> pd.DataFrame:
-    """Select relevant features for scaling and apply StandardScaler."""
+@profile_stage
+def engineer_trip_features(df2: pd.DataFrame) -> pd.DataFrame:
+    """Run the per-row trip feature steps on df2."""
+    df2 = parse_timestamps(df2)
+    df2 = preprocess_datetime(df2)
+    df2 = extract_day_of_week(df2)
+    df2 = extract_hour_and_time_of_day(df2)
+    df2 = create_is_holiday_feature(df2)
+    df2 = create_holiday_distance_features(df2)
+    df2 = preprocess_trip_times(df2)
+    df2 = split_origin_destination(df2)
+    df2 = extract_additional_time_features(df2)
+    df2 = calculate_trip_duration(df2)
+    df2 = sort_by_trip_id(df2)
+    return df2
+
+@profile_stage
+def engineer_features(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
+    """Run the trip feature steps on df2, merge with df1 and compute distances and grid cells."""
+    df2 = engineer_trip_features(df2)
+    df_merged = merge_and_calculate_distances(df1, df2)
+    df_merged = assign_grid_cells(df_merged)
+    return df_merged
+
+@profile_stage
+def scale_features(df: pd.DataFrame, scaler: StandardScaler = None) -> pd.DataFrame:
+    """Select relevant features for scaling and apply StandardScaler, fitting it unless a fitted scaler is given."""
     try:
-        features_to_scale = ['lat', 'lng', 'Origin Lat', 'Origin Lng', 'Destination Lat', 'Destination Lng', 'Trip Duration', 'Driver Distance to Origin', 'Trip Distance']
-        scaler = StandardScaler()
-        df[features_to_scale] = scaler.fit_transform(df[features_to_scale])
+        if scaler is None:
+            scaler = StandardScaler()
+            df[FEATURES_TO_SCALE] = scaler.fit_transform(df[FEATURES_TO_SCALE])
+        else:
+            df[FEATURES_TO_SCALE] = scaler.transform(df[FEATURES_TO_SCALE])
         logging.info("Scaled selected features using StandardScaler.")
     except Exception as e:
         logging.error(f"Error scaling features: {e}")
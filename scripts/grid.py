@@ -0,0 +1,86 @@
+# grid.py
+
+import math
+import numpy as np
+from config.config import Config
+
+# Kilometers per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = 111.32
+
+MISSING_CELL = -1
+
+def _grid_shape(cell_size: float):
+    return int(np.ceil(180 / cell_size)), int(np.ceil(360 / cell_size))
+
+def lat_lng_to_cell(lat, lng, cell_size: float = None) -> np.ndarray:
+    """
+    Map coordinates to int64 grid cell ids on a regular lat/lng grid.
+
+    Cell ids are row * n_cols + col, with rows counted from the south pole and columns
+    from the antimeridian. Missing coordinates map to MISSING_CELL.
+
+    Args:
+        lat, lng: Scalars or array-likes of coordinates in degrees.
+        cell_size (float): Cell edge in degrees. Defaults to Config.GRID_CELL_SIZE.
+
+    Returns:
+        np.ndarray: Cell ids.
+    """
+    cell_size = cell_size or Config.GRID_CELL_SIZE
+    n_rows, n_cols = _grid_shape(cell_size)
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    missing = np.isnan(lat) | np.isnan(lng)
+    with np.errstate(invalid='ignore'):
+        row = np.clip(np.floor((np.nan_to_num(lat) + 90) / cell_size), 0, n_rows - 1).astype(np.int64)
+        col = np.floor((np.nan_to_num(lng) + 180) / cell_size).astype(np.int64) % n_cols
+    return np.where(missing, MISSING_CELL, row * n_cols + col)
+
+def lat_lng_to_cell_scalar(lat: float, lng: float, cell_size: float = None) -> int:
+    """lat_lng_to_cell for a single point, on plain floats to avoid NumPy call overhead."""
+    if math.isnan(lat) or math.isnan(lng):
+        return MISSING_CELL
+    cell_size = cell_size or Config.GRID_CELL_SIZE
+    n_rows, n_cols = _grid_shape(cell_size)
+    row = min(max(math.floor((lat + 90) / cell_size), 0), n_rows - 1)
+    col = math.floor((lng + 180) / cell_size) % n_cols
+    return row * n_cols + col
+
+def cell_to_lat_lng(cells, cell_size: float = None):
+    """Return the latitude and longitude of the center of each cell."""
+    cell_size = cell_size or Config.GRID_CELL_SIZE
+    _, n_cols = _grid_shape(cell_size)
+    cells = np.asarray(cells, dtype=np.int64)
+    lat = (cells // n_cols + 0.5) * cell_size - 90
+    lng = (cells % n_cols + 0.5) * cell_size - 180
+    return lat, lng
+
+def rings_for_radius(radius_km: float, cell_size: float = None, max_abs_lat: float = 0.0) -> int:
+    """
+    Number of rings of neighbor cells that cover a radius around any point in a cell.
+
+    Longitude cells narrow towards the poles, so max_abs_lat should be the largest
+    absolute latitude the query points can have.
+    """
+    cell_size = cell_size or Config.GRID_CELL_SIZE
+    narrowest_km = cell_size * KM_PER_DEGREE * np.cos(np.radians(min(abs(max_abs_lat), 89.0)))
+    return int(np.ceil(radius_km / narrowest_km))
+
+def neighbor_cells(cells, rings: int = 1, cell_size: float = None) -> np.ndarray:
+    """
+    Enumerate the cells within `rings` rows and columns of each cell, itself included.
+
+    Columns wrap around the antimeridian; rows beyond the poles are dropped by
+    repeating the edge row, so duplicates can appear for polar cells.
+
+    Returns:
+        np.ndarray: Array of shape (len(cells), (2 * rings + 1) ** 2).
+    """
+    cell_size = cell_size or Config.GRID_CELL_SIZE
+    n_rows, n_cols = _grid_shape(cell_size)
+    cells = np.atleast_1d(np.asarray(cells, dtype=np.int64))
+    offsets = np.arange(-rings, rings + 1)
+    d_row, d_col = (o.ravel() for o in np.meshgrid(offsets, offsets, indexing='ij'))
+    row = np.clip(cells[:, None] // n_cols + d_row, 0, n_rows - 1)
+    col = (cells[:, None] % n_cols + d_col) % n_cols
+    return row * n_cols + col
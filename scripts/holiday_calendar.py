@@ -0,0 +1,96 @@
+# holiday_calendar.py
+
+import numpy as np
+import pandas as pd
+import logging
+from typing import Iterable
+from config.config import Config
+
+def to_day_ordinals(values) -> np.ndarray:
+    """Days since 1970-01-01 as int64, with NaT as the int64 minimum."""
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype='datetime64[ns]')
+    return np.asarray(values, dtype='datetime64[D]').astype(np.int64)
+
+class HolidayCalendar:
+    """
+    Set of holiday dates answering membership and distance queries on datetime64 days.
+
+    Membership is a lookup into a boolean array indexed by day ordinal, built once,
+    so queries never create per-row date objects.
+    """
+
+    NAT = np.iinfo(np.int64).min
+
+    def __init__(self, dates: Iterable):
+        days = np.unique(to_day_ordinals(pd.to_datetime(list(dates)).to_numpy()))
+        self.days = days
+        self.first_day = days[0] if len(days) else 0
+        self.lookup = np.zeros((days[-1] - self.first_day + 1) if len(days) else 0, dtype=bool)
+        self.lookup[days - self.first_day] = True
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def is_holiday(self, values) -> np.ndarray:
+        """True for timestamps that fall on a holiday."""
+        days = to_day_ordinals(values)
+        offsets = np.where(days == self.NAT, -1, days - self.first_day)
+        in_range = (offsets >= 0) & (offsets < len(self.lookup))
+        result = np.zeros(offsets.shape, dtype=bool)
+        result[in_range] = self.lookup[offsets[in_range]]
+        return result
+
+    def days_to_next_holiday(self, values) -> np.ndarray:
+        """Days until the next holiday, 0 on a holiday, NaN when missing or after the last holiday."""
+        days = to_day_ordinals(values)
+        position = np.searchsorted(self.days, days, side='left')
+        valid = (days != self.NAT) & (position < len(self.days))
+        result = np.full(days.shape, np.nan)
+        result[valid] = self.days[position[valid]] - days[valid]
+        return result
+
+    def days_since_previous_holiday(self, values) -> np.ndarray:
+        """Days since the previous holiday, 0 on a holiday, NaN when missing or before the first holiday."""
+        days = to_day_ordinals(values)
+        position = np.searchsorted(self.days, days, side='right') - 1
+        valid = (days != self.NAT) & (position >= 0)
+        result = np.full(days.shape, np.nan)
+        result[valid] = days[valid] - self.days[position[valid]]
+        return result
+
+def load_holiday_files(paths: Iterable[str], countries: Iterable[str] = None) -> list:
+    """
+    Read holiday dates from CSV files with 'date' and 'country' columns.
+
+    Args:
+        paths: CSV files to read.
+        countries: Country codes to keep. All countries are kept when not given.
+
+    Returns:
+        list: Holiday dates as strings.
+    """
+    dates = []
+    for path in paths:
+        holidays = pd.read_csv(path, dtype={'date': str, 'country': str})
+        if countries is not None:
+            holidays = holidays[holidays['country'].isin(list(countries))]
+        dates.extend(holidays['date'].tolist())
+        logging.info(f"Loaded {len(holidays)} holidays from {path}.")
+    return dates
+
+_calendars = {}
+
+def get_holiday_calendar() -> HolidayCalendar:
+    """
+    Calendar of the holidays in Config.HOLIDAYS_2021, Config.HOLIDAYS_2022 and Config.HOLIDAY_FILES.
+
+    The calendar is built once per distinct configuration and reused afterwards.
+    """
+    key = (tuple(Config.HOLIDAYS_2021), tuple(Config.HOLIDAYS_2022), tuple(Config.HOLIDAY_FILES),
+           None if Config.HOLIDAY_COUNTRIES is None else tuple(Config.HOLIDAY_COUNTRIES))
+    if key not in _calendars:
+        dates = Config.HOLIDAYS_2021 + Config.HOLIDAYS_2022
+        dates = dates + load_holiday_files(Config.HOLIDAY_FILES, Config.HOLIDAY_COUNTRIES)
+        _calendars[key] = HolidayCalendar(dates)
+    return _calendars[key]
@@ -3,47 +3,36 @@ import psycopg2
 from psycopg2 import sql
 from dotenv import load_dotenv
 from scripts.sql_intergration.config import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, CSV_FILE_1, CSV_FILE_2, TABLE_1, TABLE_2
+from scripts.sql_intergration.load_data import load_tables
+from scripts.sql_intergration.connection import with_postgres_connection
 from data_preprocessing import preprocess_data, setup_logging
 import pandas as pd
 from feat_eng import *
 from config.config import Config
 from feat_eng import preprocess_data, perform_feature_engineering
-from analysis import perform_analysis
 import logging
-from feat_eng import preprocess_datetime, extract_day_of_week, extract_hour_and_time_of_day, create_is_holiday_feature, preprocess_trip_times, split_origin_destination, extract_additional_time_features, calculate_trip_duration, merge_and_calculate_distances, scale_features
 import os
+from streaming import run_streaming_pipeline
+from pipeline import cached_preprocess_data, cached_feature_table, run_pipeline
+from artifact_cache import read_csv_cached
+from memory import MemoryBudgetExceeded, fits_memory_budget
+from profiling import start_trace, write_trace
 
 import logging
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from scripts.models.evaluation import evaluate_model
+from scripts.models.persistence import save_model
 from config import Config
 from models.preprocessing import preprocess_data
 
 # Load environment variables from .env file
 load_dotenv()
 
-# PostgreSQL connection function decorator
-def with_postgres_connection(func):
-    def wrapper(*args, **kwargs):
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
-        try:
-            result = func(conn, *args, **kwargs)
-        finally:
-            conn.close()
-        return result
-    return wrapper
-
 # Function to execute SQL script for database initialization
 @with_postgres_connection
-def execute_sql_script(conn: psycopg2.Connection, sql_file: str) -> None:
+def execute_sql_script(conn: psycopg2.extensions.connection, sql_file: str) -> None:
     """
     Execute SQL script for database initialization.
 
@@ -56,36 +45,6 @@ def execute_sql_script(conn: psycopg2.Connection, sql_file: str) -> None:
             cur.execute(f.read())
     conn.commit()
 
-# Function to load data from CSV file into PostgreSQL table
-@with_postgres_connection
-def load_csv_to_db(conn: psycopg2.Connection, csv_file: str, table_name: str) -> None:
-    """
-    Load data from a CSV file into a PostgreSQL table.
-
-    Args:
-    - conn: psycopg2 connection object
-    - csv_file: path to the CSV file
-    - table_name: name of the PostgreSQL table
-    """
-    # Read the CSV file into a DataFrame
-    df = pd.read_csv(csv_file)
-    
-    # Prepare columns for SQL insertion
-    columns = df.columns.tolist()
-    columns_str = ', '.join(columns)
-    placeholders = ', '.join(['%s'] * len(columns))
-    
-    # Create the insert query dynamically
-    insert_query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-    
-    # Iterate over the DataFrame rows and execute the insert query
-    records = df.values.tolist()
-    with conn.cursor() as cur:
-        cur.executemany(insert_query, records)
-    
-    # Commit the transaction
-    conn.commit()
-
 # Main function to execute database initialization and data loading
 def main() -> None:
     """
@@ -96,13 +55,11 @@ def main() -> None:
         execute_sql_script('scripts/sql_integration/init.sql')
         print("Database initialized successfully.")
 
-        # Load data into table 1
-        load_csv_to_db(CSV_FILE_1, TABLE_1)
-        print(f"Data loaded from {CSV_FILE_1} into table {TABLE_1}")
-
-        # Load data into table 2
-        load_csv_to_db(CSV_FILE_2, TABLE_2)
-        print(f"Data loaded from {CSV_FILE_2} into table {TABLE_2}")
+        # Bulk load both tables with COPY
+        tables = [(CSV_FILE_1, TABLE_1), (CSV_FILE_2, TABLE_2)]
+        load_tables(tables)
+        for csv_file, table_name in tables:
+            print(f"Data loaded from {csv_file} into table {table_name}")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -114,7 +71,7 @@ def main() -> None:
     """
     setup_logging()
     try:
-        df1, df2 = preprocess_data()
+        df1, df2 = cached_preprocess_data()
         print("DataFrame 1 after preprocessing:")
         print(df1.head())
         print("\nDataFrame 2 after preprocessing:")
@@ -130,23 +87,23 @@ if __name__ == "__main__":
 
 def main():
     """Main function to execute feature engineering steps."""
+    start_trace()
     try:
-        # Load datasets
-        df1 = pd.read_csv(Config.DF1_PATH)
-        df2 = pd.read_csv(Config.DF2_PATH)
-        logging.info("Loaded datasets.")
-
-        # Perform feature engineering
-        df2 = preprocess_datetime(df2)
-        df2 = extract_day_of_week(df2)
-        df2 = extract_hour_and_time_of_day(df2)
-        df2 = create_is_holiday_feature(df2)
-        df2 = preprocess_trip_times(df2)
-        df2 = split_origin_destination(df2)
-        df2 = extract_additional_time_features(df2)
-        df2 = calculate_trip_duration(df2)
-        df_merged = merge_and_calculate_distances(df1, df2)
-        df_merged = scale_features(df_merged)
+        if Config.STREAMING_MODE or not fits_memory_budget([Config.DF1_PATH, Config.DF2_PATH]):
+            output_path = run_streaming_pipeline()
+            logging.info(f"Feature engineering completed in streaming mode: {output_path}")
+            return
+
+        # Load datasets and perform feature engineering, reusing cached stages
+        try:
+            df_merged = cached_feature_table()
+        except MemoryBudgetExceeded as e:
+            if Config.MEMORY_BUDGET_ACTION != 'stream':
+                raise
+            logging.warning(f"{e}; switching to chunked mode.")
+            output_path = run_streaming_pipeline()
+            logging.info(f"Feature engineering completed in streaming mode: {output_path}")
+            return
 
         # Display the first few rows of the transformed dataframe
         print(df_merged.head())
@@ -154,6 +111,8 @@ def main():
     except Exception as e:
         logging.error(f"Error during feature engineering: {e}")
         raise
+    finally:
+        write_trace()
 
 if __name__ == "__main__":
     main()
@@ -163,16 +122,11 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 def main():
+    start_trace()
     try:
-        # Preprocess data and perform feature engineering
-        df1 = pd.read_csv(Config.DF1_PATH)
-        df2 = pd.read_csv(Config.DF2_PATH)
-        
-        df_feat_eng = preprocess_data(df1, df2)
-        df_feat_eng = perform_feature_engineering(df_feat_eng)
-        
-        # Perform analysis
-        df_analysis, riders_count = perform_analysis(df_feat_eng)
+        # Preprocess data, perform feature engineering and analysis, reusing cached stages
+        results = run_pipeline(['analysis', 'riders_count'])
+        df_analysis, riders_count = results['analysis'], results['riders_count']
         
         # Save or further process df_analysis if needed
         df_analysis.to_csv("analysis_results.csv", index=False)
@@ -182,6 +136,8 @@ def main():
 
     except Exception as e:
         logger.error(f"Error in main process: {str(e)}")
+    finally:
+        write_trace()
 
 if __name__ == "__main__":
     main()
@@ -190,8 +146,8 @@ if __name__ == "__main__":
 
 if __name__ == "__main__":
     # Example usage
-    df_feat_eng = pd.read_csv(Config.FEATURE_ENG_DATA_PATH)
-    df_analysis, riders_count = perform_analysis(df_feat_eng)
+    results = run_pipeline(['analysis', 'riders_count'])
+    df_analysis, riders_count = results['analysis'], results['riders_count']
     # Further processing or saving
     print(df_analysis.head())
     print(f"Number of riders within {Config.RADIUS} km of accepted orders: {riders_count}")
@@ -210,18 +166,8 @@ def add_remaining_features(df: pd.DataFrame) -> pd.DataFrame:
 def process_dataset(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
     """Process the dataset using feature engineering functions."""
     try:
-        df1 = preprocess_datetime(df1)
-        df1 = extract_day_of_week(df1)
-        df1 = extract_hour_and_time_of_day(df1)
-        df1 = create_is_holiday_feature(df1)
-
-        df2 = preprocess_trip_times(df2)
-        df2 = split_origin_destination(df2)
-        df2 = extract_additional_time_features(df2)
-        df2 = calculate_trip_duration(df2)
-
-        df_merged = merge_and_calculate_distances(df1, df2)
-        df_merged = scale_features(df_merged)
+        # Run the feature stages of the pipeline on the given frames instead of the data files
+        df_merged = run_pipeline(['features'], values={'pings': df1, 'trips': df2})['features']
 
         add_remaining_features(df_merged)
 
@@ -257,7 +203,7 @@ def main():
         setup_logging()
 
         # Example: Load data
-        df = pd.read_csv(Config.DATA_FILE_PATH)
+        df = read_csv_cached(Config.DATA_FILE_PATH)
         
         # Example: Preprocess data
         X, y = preprocess_data(df)
@@ -272,8 +218,8 @@ def main():
         # Example: Evaluate the model
         evaluate_model(model, X_test, y_test)
 
-        # Optionally, save the trained model
-        # model.save_model(Config.MODEL_SAVE_PATH)
+        # Save the trained model for evaluation and serving
+        save_model(model, Config.MODEL_PATH)
 
     except Exception as e:
         logging.error(f"Error in main execution: {e}")
@@ -0,0 +1,83 @@
+# memory.py
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from itertools import islice
+from typing import Iterable
+from config.config import Config
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised when a table would not fit in Config.MEMORY_BUDGET_MB."""
+
+def downcast_ids(df: pd.DataFrame, columns: Iterable[str] = None) -> pd.DataFrame:
+    """Downcast integer ID columns to the smallest integer type that holds them."""
+    columns = Config.ID_COLUMNS if columns is None else columns
+    for column in columns:
+        if column in df.columns and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+def read_csv_planned(path: str, **kwargs) -> pd.DataFrame:
+    """Read a CSV with the dtypes of Config.DTYPE_PLAN and downcast its ID columns."""
+    return downcast_ids(pd.read_csv(path, dtype=Config.DTYPE_PLAN, **kwargs))
+
+def memory_usage(obj) -> int:
+    """Bytes held by a DataFrame or Series, or the sum over a tuple of them. Other objects count as 0."""
+    if isinstance(obj, (tuple, list)):
+        return sum(memory_usage(item) for item in obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    return 0
+
+def budget_bytes() -> float:
+    """The memory budget in bytes, or infinity when Config.MEMORY_BUDGET_MB is not set."""
+    return np.inf if Config.MEMORY_BUDGET_MB is None else Config.MEMORY_BUDGET_MB * 1e6
+
+def check_memory_budget(name: str, nbytes: int) -> None:
+    """Raise MemoryBudgetExceeded if a table of `nbytes` is over the budget."""
+    if nbytes > budget_bytes():
+        raise MemoryBudgetExceeded(f"{name} needs {nbytes / 1e6:.1f} MB, over the {Config.MEMORY_BUDGET_MB} MB budget")
+
+def estimate_csv_memory(path: str, sample_rows: int = 10_000) -> int:
+    """
+    Estimate the bytes a CSV takes once loaded with the dtype plan.
+
+    A sample of rows is loaded and its in-memory size is scaled by the ratio of the
+    file size to the sample's size on disk.
+    """
+    sample = read_csv_planned(path, nrows=sample_rows)
+    in_memory = memory_usage(sample)
+    with open(path, 'rb') as f:
+        on_disk = sum(len(line) for line in islice(f, sample_rows + 1))
+    file_size = os.path.getsize(path)
+    if on_disk >= file_size or on_disk == 0:
+        return in_memory
+    return int(in_memory * file_size / on_disk)
+
+def fits_memory_budget(paths: Iterable[str]) -> bool:
+    """
+    Check whether the input files fit in the memory budget once loaded.
+
+    Returns False when they do not and Config.MEMORY_BUDGET_ACTION is 'stream', so the
+    caller can switch to the chunked pipeline.
+
+    Raises:
+        MemoryBudgetExceeded: When they do not fit and Config.MEMORY_BUDGET_ACTION is 'raise'.
+    """
+    if Config.MEMORY_BUDGET_MB is None:
+        return True
+    estimate = sum(estimate_csv_memory(path) for path in paths)
+    logging.info(f"Estimated {estimate / 1e6:.1f} MB to load the input files, budget is {Config.MEMORY_BUDGET_MB} MB.")
+    try:
+        check_memory_budget('Loading the input files', estimate)
+    except MemoryBudgetExceeded as e:
+        if Config.MEMORY_BUDGET_ACTION != 'stream':
+            logging.error(str(e))
+            raise
+        logging.warning(f"{e}; switching to chunked mode.")
+        return False
+    return True
@@ -1,12 +1,14 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import os
 import logging
 from typing import Tuple
 import pandas as pd
 from sklearn.base import ClassifierMixin
 from ..config import Config
 from .preprocessing import preprocess_data
+from .persistence import load_model, save_model
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 
@@ -67,9 +69,13 @@ def main():
         # Split data into training and testing sets (example)
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        # Example: Initialize and train a model (Random Forest)
-        model = RandomForestClassifier(random_state=42, n_jobs=-1)
-        model.fit(X_train, y_train)
+        # Reuse the saved model if there is one, otherwise train and save a Random Forest
+        if os.path.exists(Config.MODEL_PATH):
+            model = load_model(Config.MODEL_PATH)
+        else:
+            model = RandomForestClassifier(random_state=42, n_jobs=-1)
+            model.fit(X_train, y_train)
+            save_model(model, Config.MODEL_PATH)
 
         # Evaluate the model
         accuracy, metrics_dict = evaluate_model(model, X_test, y_test)
@@ -0,0 +1,102 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Iterator, Tuple
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+from .preprocessing import FEATURE_COLUMNS
+from .persistence import save_model
+from ..config import Config
+
+TARGET_COLUMN = 'driver_action'
+HASH_BUCKETS = 10_000
+
+def hash_split(keys: pd.Series, test_size: float = 0.2) -> np.ndarray:
+    """
+    Deterministic train/test assignment by key: True for rows held out for testing.
+
+    A key always lands on the same side, in every chunk and every run, so all rows of a
+    trip stay together. Keys are hashed as float64 so chunks where the column was read
+    as integers or as floats (with missing values) agree.
+    """
+    hashes = pd.util.hash_pandas_object(keys.astype(np.float64), index=False).to_numpy()
+    return hashes % HASH_BUCKETS < round(test_size * HASH_BUCKETS)
+
+def iter_split_chunks(path: str, chunk_size: int = None, test_size: float = 0.2) -> Iterator[Tuple[pd.DataFrame, pd.Series, np.ndarray]]:
+    """Read the feature columns and target of a feature table in chunks, with the test mask of each chunk."""
+    chunk_size = chunk_size or Config.CHUNK_SIZE
+    for chunk in pd.read_csv(path, usecols=FEATURE_COLUMNS + [TARGET_COLUMN], chunksize=chunk_size):
+        chunk = chunk.dropna(subset=[TARGET_COLUMN])
+        yield chunk[FEATURE_COLUMNS], chunk[TARGET_COLUMN].astype(str), hash_split(chunk[Config.TEST_SPLIT_KEY], test_size)
+
+def train_incremental(path: str = None, chunk_size: int = None, epochs: int = None, test_size: float = 0.2,
+                      random_state: int = 42) -> Pipeline:
+    """
+    Train the acceptance model on a feature table too large to load, one chunk at a time.
+
+    The first pass collects the driver actions and fits the scaler on the training rows
+    with partial_fit. Each epoch then streams the table again and updates an
+    SGDClassifier with logistic loss on the shuffled training rows of every chunk. A last
+    pass scores the held-out rows, chosen by hashing Config.TEST_SPLIT_KEY. Only one chunk
+    and the held-out labels are in memory at any time.
+
+    Args:
+        path (str): Feature table CSV. Defaults to Config.DATA_FILE_PATH.
+        chunk_size (int): Rows per chunk. Defaults to Config.CHUNK_SIZE.
+        epochs (int): Passes over the training rows. Defaults to Config.INCREMENTAL_EPOCHS.
+        test_size (float): Fraction of keys held out for testing.
+        random_state (int): Seed of the classifier and the shuffling.
+
+    Returns:
+        Pipeline: Scaler, missing-value fill and classifier, with classes encoded like preprocess_data.
+    """
+    path = path or Config.DATA_FILE_PATH
+    epochs = epochs or Config.INCREMENTAL_EPOCHS
+    try:
+        scaler, actions, n_train = StandardScaler(), set(), 0
+        for X, actions_chunk, test in iter_split_chunks(path, chunk_size, test_size):
+            actions.update(actions_chunk.unique())
+            if (~test).any():
+                scaler.partial_fit(X[~test])
+                n_train += int((~test).sum())
+        if not n_train:
+            raise ValueError(f"No training rows in {path}")
+        # Same codes as the LabelEncoder of preprocess_data, which sorts the actions
+        action_codes = {action: code for code, action in enumerate(sorted(actions))}
+        classes = np.arange(len(action_codes))
+        logging.info(f"Streaming {n_train} training rows from {path}, actions {action_codes}.")
+
+        model = Pipeline([
+            ('scale', scaler),
+            # Missing features become the training mean
+            ('fill', FunctionTransformer(np.nan_to_num, feature_names_out='one-to-one')),
+            ('classifier', SGDClassifier(loss='log_loss', random_state=random_state)),
+        ])
+        prepare, classifier = model[:-1], model[-1]
+        rng = np.random.RandomState(random_state)
+        for epoch in range(epochs):
+            for X, actions_chunk, test in iter_split_chunks(path, chunk_size, test_size):
+                rows = rng.permutation(np.flatnonzero(~test))
+                if len(rows):
+                    classifier.partial_fit(prepare.transform(X.iloc[rows]), actions_chunk.iloc[rows].map(action_codes).to_numpy(),
+                                           classes=classes)
+            logging.info(f"Finished epoch {epoch + 1} of {epochs}.")
+
+        y_test, y_pred = [], []
+        for X, actions_chunk, test in iter_split_chunks(path, chunk_size, test_size):
+            if test.any():
+                y_test.append(actions_chunk[test].map(action_codes).to_numpy(np.int8))
+                y_pred.append(model.predict(X[test]).astype(np.int8))
+        if y_test:
+            y_test, y_pred = np.concatenate(y_test), np.concatenate(y_pred)
+            logging.info(f'Test Accuracy for streamed SGD classifier: {accuracy_score(y_test, y_pred):.2f} on {len(y_test)} rows')
+            logging.info(classification_report(y_test, y_pred, zero_division=0))
+            logging.info(confusion_matrix(y_test, y_pred))
+    except Exception as e:
+        logging.error(f"Error in streamed training: {e}")
+        raise
+
+    save_model(model, Config.MODEL_PATH)
+    return model
@@ -0,0 +1,190 @@
+import os
+import json
+import shutil
+import logging
+import numpy as np
+import pandas as pd
+from typing import Union
+from sklearn.base import ClassifierMixin
+from ..config import Config
+
+FORMAT_VERSION = 1
+METADATA_FILE = 'model.json'
+TREE_ARRAYS = ['children', 'feature', 'threshold', 'missing_left', 'proba', 'roots']
+# Leaves have no children in sklearn trees
+LEAF = -1
+
+class MappedForest:
+    """
+    Tree ensemble classifier scored straight from memory-mapped node arrays.
+
+    The nodes of all trees are concatenated into flat arrays, so loading only maps the
+    files: start-up does not depend on the size of the forest, and every process that
+    maps the same files shares their pages. Predictions match the sklearn estimator
+    it was saved from.
+    """
+
+    def __init__(self, arrays: dict, metadata: dict):
+        for name in TREE_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.classes_ = np.asarray(metadata['classes'])
+        self.n_features_in_ = metadata['n_features']
+        if metadata.get('feature_names') is not None:
+            self.feature_names_in_ = np.asarray(metadata['feature_names'], dtype=object)
+        self.metadata = metadata
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf reached in every tree by every row, shape (n_rows, n_trees)."""
+        n_trees, n_features = len(self.roots), X.shape[1]
+        values = np.ascontiguousarray(X).ravel()
+        node = np.tile(np.asarray(self.roots, dtype=np.int64), len(X))
+        row_offsets = np.repeat(np.arange(len(X)) * n_features, n_trees)
+        active = np.arange(node.size)
+        while active.size:
+            current = node[active]
+            value = values[row_offsets[active] + self.feature[current]]
+            go_left = value <= self.threshold[current]
+            missing = np.isnan(value)
+            if missing.any():
+                go_left = np.where(missing, self.missing_left[current], go_left)
+            following = self.children[go_left.view(np.int8), current]
+            node[active] = following
+            # Leaves point to themselves, so rows stay put once they reach one
+            active = active[following != current]
+        return node.reshape(len(X), n_trees)
+
+    def predict_proba(self, X: Union[pd.DataFrame, np.ndarray], batch_rows: int = 4096) -> np.ndarray:
+        """Class probabilities averaged over the trees, in the order of classes_."""
+        # Trees compare float32 features, as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got array of shape {X.shape}")
+        result = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), batch_rows):
+            leaves = self._leaves(X[start:start + batch_rows])
+            result[start:start + batch_rows] = self.proba[leaves].mean(axis=1)
+        return result
+
+    def predict(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def _tree_arrays(estimators: list) -> dict:
+    """
+    Concatenate the nodes of fitted sklearn trees into flat arrays.
+
+    children[0] is the right and children[1] the left child, offset into the flat arrays;
+    leaves have themselves as both children and feature 0, so traversal needs no leaf checks.
+    """
+    parts = {name: [] for name in TREE_ARRAYS}
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        nodes = np.arange(offset, offset + tree.node_count)
+        leaf = tree.children_left == LEAF
+        parts['children'].append(np.stack([np.where(leaf, nodes, tree.children_right + offset),
+                                           np.where(leaf, nodes, tree.children_left + offset)]))
+        parts['feature'].append(np.where(leaf, 0, tree.feature))
+        parts['threshold'].append(tree.threshold)
+        parts['missing_left'].append(tree.missing_go_to_left.astype(bool))
+        # Leaf values hold class counts or fractions depending on the sklearn version; store probabilities
+        value = tree.value[:, 0, :]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            parts['proba'].append(np.nan_to_num(value / value.sum(axis=1, keepdims=True)))
+        parts['roots'].append([offset])
+        offset += tree.node_count
+    index_dtype = np.int32 if offset < np.iinfo(np.int32).max else np.int64
+    arrays = {name: np.concatenate(values, axis=1 if name == 'children' else 0) for name, values in parts.items()}
+    for name in ['children', 'feature', 'roots']:
+        arrays[name] = arrays[name].astype(index_dtype)
+    return arrays
+
+def _remove(path: str) -> None:
+    """Delete a model directory or file if it exists."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+def save_model(model: ClassifierMixin, path: str = None) -> str:
+    """
+    Save a fitted classifier as a model directory.
+
+    Forests and single trees are written as flat .npy node arrays that load_model
+    memory-maps. Other estimators are written with joblib, whose arrays can also be
+    memory-mapped.
+
+    Args:
+        model (ClassifierMixin): Fitted classifier.
+        path (str): Model directory, replaced if it exists. Defaults to Config.MODEL_PATH.
+
+    Returns:
+        str: The directory written.
+    """
+    path = path or Config.MODEL_PATH
+    try:
+        estimators = getattr(model, 'estimators_', [model] if hasattr(model, 'tree_') else None)
+        tmp_path = f"{path}.tmp"
+        _remove(tmp_path)
+        os.makedirs(tmp_path)
+        metadata = {
+            'format_version': FORMAT_VERSION,
+            'estimator': type(model).__name__,
+            'params': {key: value for key, value in model.get_params().items() if isinstance(value, (int, float, str, bool, type(None)))},
+        }
+        if estimators is not None and getattr(model, 'n_outputs_', 1) == 1 and all(hasattr(e, 'tree_') for e in estimators):
+            for name, array in _tree_arrays(estimators).items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+            metadata.update({
+                'format': 'trees',
+                'classes': model.classes_.tolist(),
+                'n_features': int(model.n_features_in_),
+                'feature_names': model.feature_names_in_.tolist() if hasattr(model, 'feature_names_in_') else None,
+                'n_trees': len(estimators),
+            })
+        else:
+            import joblib
+            joblib.dump(model, os.path.join(tmp_path, 'model.joblib'))
+            metadata['format'] = 'joblib'
+        with open(os.path.join(tmp_path, METADATA_FILE), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        # Move the previous model (a directory, or a model file from older versions) aside
+        # before renaming the complete new directory in, and delete it only afterwards.
+        # Readers never see a partial model; between the two renames the path is briefly missing.
+        old_path = f"{path}.old"
+        _remove(old_path)
+        if os.path.lexists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        _remove(old_path)
+        logging.info(f"Saved {metadata['estimator']} to {path} in {metadata['format']} format.")
+    except Exception as e:
+        logging.error(f"Error saving model: {e}")
+        raise
+    return path
+
+def load_model(path: str = None, mmap: bool = True) -> Union[MappedForest, ClassifierMixin]:
+    """
+    Load a model directory written by save_model.
+
+    Args:
+        path (str): Model directory. Defaults to Config.MODEL_PATH.
+        mmap (bool): Memory-map the arrays read-only instead of reading them into memory.
+
+    Returns:
+        MappedForest for tree ensembles, otherwise the joblib-loaded estimator.
+    """
+    path = path or Config.MODEL_PATH
+    try:
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        if metadata['format'] == 'trees':
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None) for name in TREE_ARRAYS}
+            model = MappedForest(arrays, metadata)
+        else:
+            import joblib
+            model = joblib.load(os.path.join(path, 'model.joblib'), mmap_mode='r' if mmap else None)
+        logging.info(f"Loaded {metadata['estimator']} from {path}.")
+    except Exception as e:
+        logging.error(f"Error loading model from {path}: {e}")
+        raise
+    return model
@@ -2,6 +2,14 @@ import pandas as pd
 from sklearn.preprocessing import LabelEncoder
 from ..config import Config
 
+# Feature contract of the acceptance model, shared by training and serving
+FEATURE_COLUMNS = ['id', 'Trip_ID', 'driver_id', 'Hour', 'Start_Hour', 'Geodesic_Distance',
+                   'Haversine_Distance', 'Average_Speed', 'Time_Since_Last_Trip',
+                   'Origin-Destination_Count', 'Origin_Distance_to_City_Center',
+                   'Destination_Distance_to_City_Center', 'Driver_Experience', 'Avg_Speed',
+                   'Day_of_Week_Encoded', 'Previous_Trip_End_Hour',
+                   'Previous_Trip_End_Day_of_Week', 'Previous_Trip_End_Month', 'Origin-Destination_Encoded']
+
 def encode_categorical(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """Encode categorical column using LabelEncoder."""
     try:
@@ -14,20 +22,12 @@ def encode_categorical(df: pd.DataFrame, column: str) -> pd.DataFrame:
 def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     """Perform data preprocessing tasks."""
     try:
-        # Define feature columns
-        feature_columns = ['id', 'Trip_ID', 'driver_id', 'Hour', 'Start_Hour', 'Geodesic_Distance',
-                           'Haversine_Distance', 'Average_Speed', 'Time_Since_Last_Trip',
-                           'Origin-Destination_Count', 'Origin_Distance_to_City_Center',
-                           'Destination_Distance_to_City_Center', 'Driver_Experience', 'Avg_Speed',
-                           'Day_of_Week_Encoded', 'Previous_Trip_End_Hour',
-                           'Previous_Trip_End_Day_of_Week', 'Previous_Trip_End_Month', 'Origin-Destination_Encoded']
-        
         # Perform feature encoding, scaling, or other preprocessing steps as needed
         df = encode_categorical(df, 'driver_action')
         # Add other preprocessing steps
         
         # Select specific feature columns
-        X = df[feature_columns]
+        X = df[FEATURE_COLUMNS]
         y = df['driver_action_encoded']
         
         return X, y
@@ -0,0 +1,165 @@
+import math
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Union
+from sklearn.base import ClassifierMixin, clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+from sklearn.utils import _safe_indexing
+from ..config import Config
+
+RESOURCES = ['n_samples', 'n_estimators']
+# Smallest rung: trees per forest, or training rows per class and fold
+MIN_ESTIMATORS = 10
+MIN_SAMPLES_PER_CLASS_AND_FOLD = 20
+
+class SuccessiveHalvingSearch:
+    """
+    Successive-halving hyperparameter search under a wall-clock budget.
+
+    Sampled candidates are cross-validated with a small resource, the best 1/factor of
+    them are kept and evaluated again with factor times the resource, until one rung
+    reaches the full resource. The resource is either training rows ('n_samples', nested
+    subsamples of the training set) or trees ('n_estimators'; estimators with warm_start
+    keep their fold models and only add trees). Each candidate result is logged as it
+    finishes. When the time budget runs out the search stops and the best candidate of
+    the highest rung reached is refitted on all the data.
+    """
+
+    def __init__(self, estimator: ClassifierMixin, param_distributions: dict, n_candidates: int = None,
+                 resource: str = None, factor: int = None, min_resources: int = None, max_resources: int = None,
+                 cv: int = 3, scoring: str = 'accuracy', time_budget_s: float = None, refit: bool = True,
+                 random_state: int = None):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_candidates = n_candidates or Config.SEARCH_CANDIDATES
+        self.resource = resource or Config.SEARCH_RESOURCE
+        self.factor = factor or Config.SEARCH_FACTOR
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.cv = cv
+        self.scoring = scoring
+        self.time_budget_s = Config.SEARCH_TIME_BUDGET_S if time_budget_s is None else time_budget_s
+        self.refit = refit
+        self.random_state = random_state
+        if self.resource not in RESOURCES:
+            raise ValueError(f"Unknown resource '{self.resource}', expected one of {RESOURCES}")
+        if self.factor < 2:
+            raise ValueError(f"factor must be at least 2, got {self.factor}")
+
+    def _schedule(self, n_rows: int, n_classes: int) -> list:
+        """Resource of each rung, growing by factor up to max_resources."""
+        if self.resource == 'n_estimators':
+            max_resources = self.max_resources or Config.SEARCH_MAX_ESTIMATORS
+            floor = MIN_ESTIMATORS
+        else:
+            max_resources = min(self.max_resources or n_rows, n_rows)
+            floor = MIN_SAMPLES_PER_CLASS_AND_FOLD * n_classes * self.cv
+        # Enough rungs to narrow the candidates down to one, starting no lower than the floor
+        n_rungs = int(math.log(self.n_candidates, self.factor) + 1e-9) + 1
+        min_resources = self.min_resources or max(floor, max_resources // self.factor ** (n_rungs - 1))
+        min_resources = min(min_resources, max_resources)
+        n_rungs = min(n_rungs, int(math.log(max_resources / min_resources, self.factor) + 1e-9) + 1)
+        resources = [min_resources * self.factor ** rung for rung in range(n_rungs - 1)]
+        return resources + [max_resources]
+
+    def _evaluate(self, candidate: int, params: dict, resource: int, X, y, folds: dict) -> list:
+        """Cross-validated scores of one candidate with the given resource."""
+        if self.resource == 'n_samples':
+            rows = self._order[:resource]
+            X_rung, y_rung = _safe_indexing(X, rows), _safe_indexing(y, rows)
+            splits = StratifiedKFold(self.cv).split(X_rung, y_rung)
+        else:
+            X_rung, y_rung, splits = X, y, self._splits
+        scores = []
+        for fold, (train, test) in enumerate(splits):
+            if self.resource == 'n_estimators':
+                model = folds.get((candidate, fold))
+                if model is None or not self._warm_start:
+                    model = clone(self.estimator).set_params(**params)
+                    if self._warm_start:
+                        model.set_params(warm_start=True)
+                model.set_params(n_estimators=resource)
+                if self._warm_start:
+                    folds[(candidate, fold)] = model
+            else:
+                model = clone(self.estimator).set_params(**params)
+            model.fit(_safe_indexing(X_rung, train), _safe_indexing(y_rung, train))
+            scores.append(self._scorer(model, _safe_indexing(X_rung, test), _safe_indexing(y_rung, test)))
+        return scores
+
+    def fit(self, X: Union[pd.DataFrame, np.ndarray], y: Union[pd.Series, np.ndarray]) -> 'SuccessiveHalvingSearch':
+        """
+        Run the search and refit the best candidate on X and y.
+
+        Returns:
+            SuccessiveHalvingSearch: self, with best_params_, best_score_, best_estimator_ and results_.
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget_s if self.time_budget_s else math.inf
+        rng = np.random.RandomState(self.random_state)
+        n_classes = len(np.unique(y))
+        self._scorer = check_scoring(self.estimator, scoring=self.scoring)
+        self._warm_start = 'warm_start' in self.estimator.get_params()
+        self._order = rng.permutation(len(X))
+        self._splits = list(StratifiedKFold(self.cv, shuffle=True, random_state=rng).split(X, y))
+        resources = self._schedule(len(X), n_classes)
+        candidates = list(ParameterSampler(self.param_distributions, self.n_candidates, random_state=rng))
+        logging.info(f"Successive halving over {len(candidates)} candidates, {self.resource} per rung {resources}, "
+                     f"time budget {self.time_budget_s or 'none'}s.")
+
+        results, folds, alive, budget_exhausted = [], {}, list(range(len(candidates))), False
+        for rung, resource in enumerate(resources):
+            rung_scores, rung_times = {}, []
+            for candidate in alive:
+                # Stop when the budget is spent or the next fit would likely overrun it
+                expected = np.mean(rung_times) if rung_times else 0.0
+                if results and time.perf_counter() + expected > deadline:
+                    budget_exhausted = True
+                    break
+                fit_start = time.perf_counter()
+                try:
+                    scores = self._evaluate(candidate, candidates[candidate], resource, X, y, folds)
+                except Exception as e:
+                    logging.error(f"Candidate {candidate} failed with {candidates[candidate]}: {e}")
+                    scores = [np.nan]
+                rung_times.append(time.perf_counter() - fit_start)
+                rung_scores[candidate] = float(np.mean(scores))
+                results.append({'rung': rung, self.resource: resource, 'candidate': candidate, 'params': candidates[candidate],
+                                'mean_test_score': rung_scores[candidate], 'std_test_score': float(np.std(scores)),
+                                'fit_time': rung_times[-1]})
+                logging.info(f"Rung {rung} ({self.resource}={resource}) candidate {candidate}: "
+                             f"{self.scoring} {rung_scores[candidate]:.4f} in {rung_times[-1]:.1f}s {candidates[candidate]}")
+            scored = sorted((c for c in rung_scores if not np.isnan(rung_scores[c])), key=lambda c: -rung_scores[c])
+            if scored:
+                best_candidate, self.best_score_, self.best_resource_ = scored[0], rung_scores[scored[0]], resource
+            if budget_exhausted or rung == len(resources) - 1:
+                break
+            # Early elimination: only the best 1/factor of the rung go on to the next resource
+            alive = scored[:max(1, math.ceil(len(alive) / self.factor))]
+            for key in [key for key in folds if key[0] not in alive]:
+                del folds[key]
+        if budget_exhausted:
+            logging.warning(f"Search time budget of {self.time_budget_s}s exhausted in rung {rung}.")
+        if not hasattr(self, 'best_score_'):
+            raise RuntimeError("No candidate could be evaluated")
+
+        self.results_ = pd.DataFrame(results)
+        self.best_params_ = candidates[best_candidate]
+        self.search_time_ = time.perf_counter() - start
+        logging.info(f"Best candidate {best_candidate} at {self.resource}={self.best_resource_}: "
+                     f"{self.scoring} {self.best_score_:.4f} {self.best_params_} after {self.search_time_:.1f}s.")
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            if self.resource == 'n_estimators':
+                self.best_estimator_.set_params(n_estimators=resources[-1])
+            self.best_estimator_.fit(X, y)
+        return self
+
+    def predict(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        return self.best_estimator_.predict_proba(X)
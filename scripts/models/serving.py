@@ -0,0 +1,253 @@
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+from sklearn.base import ClassifierMixin
+from .preprocessing import FEATURE_COLUMNS
+from .persistence import load_model
+from ..config import Config
+
+# LabelEncoder code of 'accepted' in preprocess_data, which sorts the driver actions
+ACCEPTED_CLASS = 0
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring requests into batches for a single model call.
+
+    A background thread takes the first waiting request, then keeps collecting requests
+    until the batch holds max_batch_size rows or max_wait_ms have passed since the first
+    one, and scores them together. Latency, batch size and completion time of recent
+    requests are kept for stats().
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], max_batch_size: int = None,
+                 max_wait_ms: float = None, stats_window: int = None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size or Config.SERVING_MAX_BATCH_SIZE
+        self.max_wait = (Config.SERVING_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        window = stats_window or Config.SERVING_STATS_WINDOW
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._completed = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._requests = 0
+        self._batches = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue a 2D array of feature rows; the future resolves to one score per row."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('batcher closed')
+            self._queue.put((np.atleast_2d(features), future, time.perf_counter()))
+        return future
+
+    def predict(self, features: np.ndarray, timeout: float = None) -> np.ndarray:
+        """Score feature rows as part of the next batch and wait for the result."""
+        return self.submit(features).result(timeout)
+
+    def close(self) -> None:
+        """Stop accepting requests, score the ones already queued and stop the batching thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, rows = [item], len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch)
+        # Fail whatever is still queued so no caller waits forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(RuntimeError('batcher closed'))
+
+    def _score(self, batch: list) -> None:
+        try:
+            features = batch[0][0] if len(batch) == 1 else np.concatenate([item[0] for item in batch])
+            scores = np.asarray(self.predict_fn(features))
+            offsets = np.cumsum([len(item[0]) for item in batch])[:-1]
+            for (_, future, _), result in zip(batch, np.split(scores, offsets)):
+                future.set_result(result)
+        except Exception as e:
+            logging.error(f"Error scoring a batch of {len(batch)} requests: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+        now = time.perf_counter()
+        with self._lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._batch_sizes.append(len(batch))
+            for _, _, submitted in batch:
+                self._latencies.append(now - submitted)
+                self._completed.append(now)
+
+    def stats(self) -> Dict[str, object]:
+        """Latency percentiles in milliseconds, throughput and batch sizes over the recent requests."""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            completed = np.array(self._completed)
+            batch_sizes = np.array(self._batch_sizes)
+            requests, batches = self._requests, self._batches
+        span = completed[-1] - completed[0] if len(completed) > 1 else 0.0
+        return {
+            'requests': requests,
+            'batches': batches,
+            'mean_batch_size': round(float(batch_sizes.mean()), 2) if len(batch_sizes) else None,
+            'throughput_rps': round((len(completed) - 1) / span, 1) if span > 0 else None,
+            'latency_ms': {f"p{q}": round(float(np.percentile(latencies, q)), 3) for q in (50, 90, 95, 99)} if len(latencies) else {},
+        }
+
+class PredictionService:
+    """Score driver-acceptance probabilities with a trained classifier through a MicroBatcher."""
+
+    def __init__(self, model: ClassifierMixin, max_batch_size: int = None, max_wait_ms: float = None):
+        self.model = model
+        self.accepted_column = list(model.classes_).index(ACCEPTED_CLASS)
+        self.batcher = MicroBatcher(self._predict_batch, max_batch_size, max_wait_ms)
+
+    def _predict_batch(self, features: np.ndarray) -> np.ndarray:
+        # Keep the column names the model was fitted with
+        return self.model.predict_proba(pd.DataFrame(features, columns=FEATURE_COLUMNS))[:, self.accepted_column]
+
+    def predict(self, records: List[dict]) -> np.ndarray:
+        """
+        Score records holding the FEATURE_COLUMNS of models.preprocessing.
+
+        Returns:
+            np.ndarray: Probability that the driver accepts, one per record.
+
+        Raises:
+            KeyError: When a record lacks one of the feature columns.
+        """
+        if not records:
+            return np.empty(0)
+        features = np.array([[record[column] for column in FEATURE_COLUMNS] for record in records], dtype=np.float64)
+        return self.batcher.predict(features)
+
+    def close(self) -> None:
+        self.batcher.close()
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """POST /predict with a record or {"instances": [records]}; GET /stats and /health."""
+
+    def _send_json(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.service.batcher.stats())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            records = body['instances'] if isinstance(body, dict) and 'instances' in body else [body]
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': f"Invalid JSON body: {e}"})
+            return
+        try:
+            probabilities = self.server.service.predict(records)
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {'error': f"Invalid features: {e}"})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'probabilities': probabilities.tolist()})
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+class PredictionServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a listen backlog large enough for bursts of concurrent clients."""
+    daemon_threads = True
+    request_queue_size = 128
+
+def create_server(model: ClassifierMixin, host: str = None, port: int = None, max_batch_size: int = None,
+                  max_wait_ms: float = None) -> PredictionServer:
+    """
+    Create the prediction HTTP server; call serve_forever() on it to start serving.
+
+    Args:
+        model (ClassifierMixin): Classifier trained on the FEATURE_COLUMNS of models.preprocessing.
+        host (str): Interface to bind. Defaults to Config.SERVING_HOST.
+        port (int): Port to bind, 0 for any free port. Defaults to Config.SERVING_PORT.
+        max_batch_size (int): Largest batch in rows. Defaults to Config.SERVING_MAX_BATCH_SIZE.
+        max_wait_ms (float): Longest wait for a batch to fill. Defaults to Config.SERVING_MAX_WAIT_MS.
+
+    Returns:
+        PredictionServer: The server, with the PredictionService as its service attribute.
+    """
+    host = host or Config.SERVING_HOST
+    port = Config.SERVING_PORT if port is None else port
+    server = PredictionServer((host, port), PredictionHandler)
+    server.service = PredictionService(model, max_batch_size, max_wait_ms)
+    logging.info(f"Prediction service listening on {host}:{server.server_address[1]}.")
+    return server
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve driver-acceptance predictions over HTTP.")
+    parser.add_argument('--model', default=Config.MODEL_PATH, help='Model directory written by save_model.')
+    parser.add_argument('--host', default=Config.SERVING_HOST)
+    parser.add_argument('--port', type=int, default=Config.SERVING_PORT)
+    parser.add_argument('--max-batch-size', type=int, default=Config.SERVING_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=Config.SERVING_MAX_WAIT_MS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    server = create_server(load_model(args.model), args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,34 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.model_selection import RandomizedSearchCV
 from .preprocessing import preprocess_data
+from .persistence import save_model
+from .search import SuccessiveHalvingSearch
+from .incremental import train_incremental
 from ..config import Config
+from ..artifact_cache import read_csv_cached
+from ..memory import fits_memory_budget
 import logging
 
 logging.basicConfig(filename=Config.LOG_FILE_PATH, level=logging.INFO)
 
+# Search space of the Random Forest; n_estimators is the resource of the halving search unless it grows samples
+PARAM_DISTRIBUTIONS = {
+    'n_estimators': [100, 200, 300],
+    'max_features': ['sqrt', 'log2', 0.3, 0.5],
+    'max_depth': [10, 20, 30, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'bootstrap': [True, False]
+}
+
 def train_model():
     try:
+        # Stream the feature table when it is too large to load
+        if Config.TRAIN_STREAMING or not fits_memory_budget([Config.DATA_FILE_PATH]):
+            return train_incremental(Config.DATA_FILE_PATH)
+
         # Load data
-        df = pd.read_csv(Config.DATA_FILE_PATH)
+        df = read_csv_cached(Config.DATA_FILE_PATH)
         
         # Preprocess data
         X, y = preprocess_data(df)
@@ -23,27 +42,30 @@ def train_model():
         # Base Random Forest classifier
         base_rf = RandomForestClassifier(random_state=42, n_jobs=-1)
 
-        # Parameter grid for Randomized Search
-        param_grid = {
-            'n_estimators': [100, 200, 300],
-            'max_features': ['auto', 'sqrt', 'log2'],
-            'max_depth': [10, 20, 30, None],
-            'min_samples_split': [2, 5, 10],
-            'min_samples_leaf': [1, 2, 4],
-            'bootstrap': [True, False]
-        }
-
-        # Randomized Search Cross-Validation
-        random_search_rf = RandomizedSearchCV(
-            estimator=base_rf,
-            param_distributions=param_grid,
-            n_iter=10,  # Adjust as needed
-            scoring='accuracy',
-            cv=3,
-            verbose=2,
-            random_state=42,
-            n_jobs=-1
-        )
+        if Config.SEARCH_STRATEGY == 'halving':
+            param_grid = dict(PARAM_DISTRIBUTIONS)
+            if Config.SEARCH_RESOURCE == 'n_estimators':
+                del param_grid['n_estimators']
+            # Successive halving: cheap evaluations of many candidates, full forests for the best few
+            random_search_rf = SuccessiveHalvingSearch(
+                estimator=base_rf,
+                param_distributions=param_grid,
+                scoring='accuracy',
+                cv=3,
+                random_state=42
+            )
+        else:
+            # Randomized Search Cross-Validation
+            random_search_rf = RandomizedSearchCV(
+                estimator=base_rf,
+                param_distributions=PARAM_DISTRIBUTIONS,
+                n_iter=10,  # Adjust as needed
+                scoring='accuracy',
+                cv=3,
+                verbose=2,
+                random_state=42,
+                n_jobs=-1
+            )
 
         # Fit the random search model
         random_search_rf.fit(X_train, y_train)
@@ -65,6 +87,10 @@ def train_model():
         logging.info('\nConfusion Matrix for Random Forest:')
         logging.info(confusion_matrix(y_test, y_pred_rf))
 
+        # Save the best forest for evaluation and serving
+        save_model(random_search_rf.best_estimator_, Config.MODEL_PATH)
+        return random_search_rf.best_estimator_
+
     except Exception as e:
         logging.error(f"Error in training model: {e}")
         raise RuntimeError(f"Error in training model: {e}")
@@ -0,0 +1,196 @@
+# online_features.py
+
+import math
+import bisect
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Union
+from config.config import Config
+from distance import compute_distance_scalar
+from grid import MISSING_CELL, lat_lng_to_cell_scalar
+from feat_eng import DAY_NAMES, DRIVER_AVERAGE_COLUMNS, od_key_stride
+from holiday_calendar import get_holiday_calendar
+
+_EPOCH = datetime(1970, 1, 1)
+_NS_PER_SECOND = 1_000_000_000
+
+class TripRequest(NamedTuple):
+    """One (driver ping, order) pair at request time. Times are datetimes or epoch seconds."""
+    driver_id: int
+    lat: float
+    lng: float
+    origin_lat: float
+    origin_lng: float
+    destination_lat: float
+    destination_lng: float
+    trip_start: Union[datetime, float]
+    trip_end: Optional[Union[datetime, float]] = None
+
+# Features in the order and with the names of the batch pipeline columns
+ONLINE_FEATURE_COLUMNS = [
+    'Day of Week', 'Hour', 'Time of Day', 'Is Holiday', 'Days To Next Holiday', 'Days Since Last Holiday',
+    'Start Hour', 'Start Day of Week', 'Trip Duration', 'Driver Distance to Origin', 'Trip Distance',
+    'Ping Cell', 'Origin Cell', 'Destination Cell'
+] + DRIVER_AVERAGE_COLUMNS + [
+    'Driver_Experience', 'Previous_Trip_End_Hour', 'Previous_Trip_End_Day_of_Week', 'Previous_Trip_End_Month',
+    'Origin-Destination Key', 'Origin-Destination_Count', 'Origin-Destination_Encoded'
+]
+
+def _to_ns(value) -> Optional[int]:
+    """Nanoseconds since the epoch of a naive datetime, a datetime64, or epoch seconds; None when missing."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.value
+    if isinstance(value, datetime):
+        return (value - _EPOCH) // timedelta(microseconds=1) * 1000
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else int(value.astype('datetime64[ns]').astype(np.int64))
+    if math.isnan(value):
+        return None
+    return int(round(value * _NS_PER_SECOND))
+
+class DriverHistoryTable:
+    """
+    Per-driver lookups for the driver-history features.
+
+    Holds the aggregates of create_driver_history_features for each driver, and the
+    driver's trip start and end times sorted by start to find the previous trip.
+    """
+
+    def __init__(self, aggregates: dict, starts: dict, ends: dict):
+        self.aggregates = aggregates
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'DriverHistoryTable':
+        """Build the lookups from the output of create_driver_history_features."""
+        history = df[['driver_id', 'Trip Start Time', 'Trip End Time'] + DRIVER_AVERAGE_COLUMNS[1:] + ['Driver_Experience']]
+        history = history.sort_values(['driver_id', 'Trip Start Time'], kind='stable')
+        drivers = history['driver_id'].to_numpy()
+        starts = history['Trip Start Time'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        ends = history['Trip End Time'].to_numpy(dtype='datetime64[ns]')
+        ends = np.where(np.isnat(ends), None, ends.astype(np.int64)).tolist()
+        bounds = np.flatnonzero(np.r_[True, drivers[1:] != drivers[:-1]])
+        values = history[DRIVER_AVERAGE_COLUMNS[1:] + ['Driver_Experience']].to_numpy(dtype=np.float64)[bounds].tolist()
+        ids = drivers[bounds].tolist()
+        stops = np.r_[bounds[1:], len(drivers)].tolist()
+        starts = starts.tolist()
+        return cls(
+            {driver: tuple(row[:-1]) + (int(row[-1]),) for driver, row in zip(ids, values)},
+            {driver: starts[start:stop] for driver, start, stop in zip(ids, bounds.tolist(), stops)},
+            {driver: ends[start:stop] for driver, start, stop in zip(ids, bounds.tolist(), stops)},
+        )
+
+    def previous_trip_end(self, driver_id, start_ns: int) -> Optional[int]:
+        """End time in nanoseconds of the driver's last trip that started before start_ns."""
+        starts = self.starts.get(driver_id)
+        if not starts or start_ns is None:
+            return None
+        position = bisect.bisect_left(starts, start_ns) - 1
+        return self.ends[driver_id][position] if position >= 0 else None
+
+class OriginDestinationTable:
+    """Lookups of pair counts and encodings by origin-destination key, from create_origin_destination_features."""
+
+    def __init__(self, lookup: dict):
+        self.lookup = lookup
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OriginDestinationTable':
+        pairs = df[['Origin-Destination Key', 'Origin-Destination_Count', 'Origin-Destination_Encoded']]
+        pairs = pairs[pairs['Origin-Destination Key'] >= 0].drop_duplicates('Origin-Destination Key')
+        return cls(dict(zip(pairs['Origin-Destination Key'].tolist(),
+                            zip(pairs['Origin-Destination_Count'].tolist(), pairs['Origin-Destination_Encoded'].tolist()))))
+
+class OnlineFeatures:
+    """
+    Compute the batch pipeline features of a single request from plain scalars.
+
+    Everything that depends on other rows comes from tables precomputed on a batch
+    output: the holiday calendar, driver history and origin-destination pairs, and an
+    hour to time-of-day table. No DataFrame is built per request.
+    """
+
+    def __init__(self, drivers: DriverHistoryTable = None, pairs: OriginDestinationTable = None):
+        self.drivers = drivers or DriverHistoryTable({}, {}, {})
+        self.pairs = pairs or OriginDestinationTable({})
+        calendar = get_holiday_calendar()
+        self.holidays = calendar.days.tolist()
+        self.holiday_set = set(self.holidays)
+        labels = Config.TIME_OF_DAY_LABELS
+        self.time_of_day = [labels[(bisect.bisect_right(Config.TIME_OF_DAY_EDGES, hour) - 1) % len(labels)] for hour in range(24)]
+        # Coordinates are rounded to the dtype the batch pipeline loads them with
+        self.coordinate = np.dtype(Config.COORDINATE_DTYPE).type
+        self.cell_size = Config.GRID_CELL_SIZE
+        self.od_stride = od_key_stride(self.cell_size)
+        self.distance_mode = Config.DISTANCE_MODE
+        self.unknown_driver = (math.nan,) * (len(DRIVER_AVERAGE_COLUMNS) - 1) + (0,)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OnlineFeatures':
+        """Build the lookup tables from a batch table with driver-history and origin-destination features."""
+        online = cls(DriverHistoryTable.from_frame(df), OriginDestinationTable.from_frame(df))
+        logging.info(f"Built online feature tables for {len(online.drivers.aggregates)} drivers and {len(online.pairs.lookup)} pairs.")
+        return online
+
+    def compute(self, request: TripRequest) -> dict:
+        """Features of one request, keyed by ONLINE_FEATURE_COLUMNS."""
+        return self.features(*request)
+
+    def features(self, driver_id, lat: float, lng: float, origin_lat: float, origin_lng: float,
+                 destination_lat: float, destination_lng: float, trip_start, trip_end=None) -> dict:
+        """Features of one request from plain scalars, keyed by ONLINE_FEATURE_COLUMNS."""
+        coordinate = self.coordinate
+        lat, lng = float(coordinate(lat)), float(coordinate(lng))
+        origin_lat, origin_lng = float(coordinate(origin_lat)), float(coordinate(origin_lng))
+        destination_lat, destination_lng = float(coordinate(destination_lat)), float(coordinate(destination_lng))
+        start_ns, end_ns = _to_ns(trip_start), _to_ns(trip_end)
+
+        features = dict.fromkeys(ONLINE_FEATURE_COLUMNS)
+        if start_ns is not None:
+            hours = start_ns // (3600 * _NS_PER_SECOND)
+            hour, day = hours % 24, hours // 24
+            day_of_week = (day + 3) % 7
+            features['Day of Week'] = DAY_NAMES[day_of_week]
+            features['Hour'] = features['Start Hour'] = hour
+            features['Start Day of Week'] = day_of_week
+            features['Time of Day'] = self.time_of_day[hour]
+            features['Is Holiday'] = day in self.holiday_set
+            position = bisect.bisect_left(self.holidays, day)
+            features['Days To Next Holiday'] = float(self.holidays[position] - day) if position < len(self.holidays) else math.nan
+            position = bisect.bisect_right(self.holidays, day) - 1
+            features['Days Since Last Holiday'] = float(day - self.holidays[position]) if position >= 0 else math.nan
+        else:
+            features['Is Holiday'] = False
+            features['Days To Next Holiday'] = features['Days Since Last Holiday'] = math.nan
+        features['Trip Duration'] = (end_ns - start_ns) / (60 * _NS_PER_SECOND) if start_ns is not None and end_ns is not None else math.nan
+
+        features['Driver Distance to Origin'] = compute_distance_scalar(lat, lng, origin_lat, origin_lng, self.distance_mode)
+        features['Trip Distance'] = compute_distance_scalar(origin_lat, origin_lng, destination_lat, destination_lng, self.distance_mode)
+        features['Ping Cell'] = lat_lng_to_cell_scalar(lat, lng, self.cell_size)
+        origin_cell = features['Origin Cell'] = lat_lng_to_cell_scalar(origin_lat, origin_lng, self.cell_size)
+        destination_cell = features['Destination Cell'] = lat_lng_to_cell_scalar(destination_lat, destination_lng, self.cell_size)
+
+        aggregates = self.drivers.aggregates.get(driver_id, self.unknown_driver)
+        previous_ns = self.drivers.previous_trip_end(driver_id, start_ns)
+        features['Time_Since_Last_Trip'] = (start_ns - previous_ns) / (3600 * _NS_PER_SECOND) if previous_ns is not None else math.nan
+        for column, value in zip(DRIVER_AVERAGE_COLUMNS[1:] + ['Driver_Experience'], aggregates):
+            features[column] = value
+        if previous_ns is not None:
+            previous = _EPOCH + timedelta(microseconds=previous_ns // 1000)
+            features['Previous_Trip_End_Hour'] = previous.hour
+            features['Previous_Trip_End_Day_of_Week'] = previous.weekday()
+            features['Previous_Trip_End_Month'] = previous.month
+
+        if origin_cell == MISSING_CELL or destination_cell == MISSING_CELL:
+            features['Origin-Destination Key'], count, code = -1, 0, -1
+        else:
+            features['Origin-Destination Key'] = key = origin_cell * self.od_stride + destination_cell
+            count, code = self.pairs.lookup.get(key, (0, -1))
+        features['Origin-Destination_Count'], features['Origin-Destination_Encoded'] = count, code
+        return features
+
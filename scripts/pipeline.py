@@ -0,0 +1,82 @@
+# pipeline.py
+
+import pandas as pd
+from typing import Dict, Iterable, Tuple
+from config.config import Config
+import analysis
+import data_preprocessing
+import distance
+import feat_eng
+import grid
+import holiday_calendar
+import memory
+import scaling
+from dag import Pipeline, Stage
+
+def load_pings() -> pd.DataFrame:
+    """Load df1 and drop its unused columns."""
+    return data_preprocessing.drop_ping_columns(memory.read_csv_planned(Config.DF1_PATH))
+
+def load_trips() -> pd.DataFrame:
+    """Load df2 and impute its missing values."""
+    return data_preprocessing.impute_trip_values(memory.read_csv_planned(Config.DF2_PATH))
+
+def merge_features(pings: pd.DataFrame, trip_features: pd.DataFrame) -> pd.DataFrame:
+    """Merge the pings with the featurized trips and assign grid cells."""
+    return feat_eng.assign_grid_cells(feat_eng.merge_and_calculate_distances(pings, trip_features))
+
+def scale_merged(merged: pd.DataFrame, scaler_state: pd.DataFrame) -> pd.DataFrame:
+    """Scale the merged table with the fitted scaler state, without refitting."""
+    return feat_eng.scale_features(merged, scaling.scaler_from_frame(scaler_state))
+
+def train() -> object:
+    """Train the model on Config.DATA_FILE_PATH."""
+    from scripts.models.train import train_model
+    return train_model()
+
+def build_pipeline() -> Pipeline:
+    """
+    Register the pipeline stages.
+
+    The df1 (pings) and df2 (trips) branches are independent until the merge, so they
+    run concurrently; analysis and training run on their own branches after it. Each
+    cached stage lists the Config settings that change its output, so unrelated
+    settings do not invalidate it.
+    """
+    return Pipeline([
+        Stage('pings', load_pings, files=[Config.DF1_PATH], code=[data_preprocessing, memory],
+              config=['DF1_DROP_COLUMNS', 'DF1_TIMESTAMP_COLUMNS', 'KEEP_PING_TIMESTAMPS', 'DTYPE_PLAN', 'ID_COLUMNS']),
+        Stage('trips', load_trips, files=[Config.DF2_PATH], code=[data_preprocessing, memory],
+              config=['DF2_IMPUTE_COLUMNS', 'DTYPE_PLAN', 'ID_COLUMNS']),
+        Stage('trip_features', feat_eng.engineer_trip_features, inputs=['trips'], code=[feat_eng, holiday_calendar],
+              config=['DATETIME_COLUMNS', 'DATETIME_FORMATS', 'COORDINATE_DTYPE', 'TIME_OF_DAY_EDGES', 'TIME_OF_DAY_LABELS',
+                      'HOLIDAYS_2021', 'HOLIDAYS_2022', 'HOLIDAY_FILES', 'HOLIDAY_COUNTRIES']),
+        Stage('merged', merge_features, inputs=['pings', 'trip_features'], code=[feat_eng, distance, grid],
+              config=['DISTANCE_MODE', 'GRID_CELL_SIZE']),
+        Stage('scaler', scaling.fit_scaler_state, inputs=['merged'], code=[scaling, feat_eng], config=[]),
+        Stage('features', scale_merged, inputs=['merged', 'scaler'], code=[feat_eng, scaling], config=[]),
+        Stage('driver_history', feat_eng.create_driver_history_features, inputs=['merged'], code=[feat_eng], config=[]),
+        Stage('od_pairs', feat_eng.create_origin_destination_features, inputs=['driver_history'], code=[feat_eng, grid],
+              config=['GRID_CELL_SIZE']),
+        Stage('analysis', analysis.perform_analysis, inputs=['merged'], outputs=['analysis', 'riders_count'], cache=False),
+        Stage('model', train, cache=False),
+    ])
+
+def run_pipeline(targets: Iterable[str] = None, values: Dict[str, object] = None) -> Dict[str, object]:
+    """Run the pipeline for the target artifacts, reusing cached stages whose inputs did not change."""
+    return build_pipeline().run(targets, values)
+
+def cached_preprocess_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Load and preprocess df1 and df2, reusing the cached result when nothing changed."""
+    results = run_pipeline(['pings', 'trips'])
+    return results['pings'], results['trips']
+
+def cached_merged_table() -> pd.DataFrame:
+    """Build the unscaled merged feature table, reusing the cached result when nothing changed."""
+    return run_pipeline(['merged'])['merged']
+
+def cached_feature_table() -> pd.DataFrame:
+    """Build the scaled feature table, reusing the cached result when nothing changed, and save the scaler next to the model."""
+    results = run_pipeline(['features', 'scaler'])
+    scaling.save_scaler(scaling.scaler_from_frame(results['scaler']))
+    return results['features']
@@ -0,0 +1,165 @@
+# profiling.py
+
+import os
+import json
+import time
+import uuid
+import logging
+import resource
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import pandas as pd
+from config.config import Config
+
+_lock = threading.Lock()
+_local = threading.local()
+_trace = {}
+
+def start_trace() -> dict:
+    """Start a new trace, discarding the stages recorded so far."""
+    global _trace
+    with _lock:
+        _trace = {
+            'run_id': uuid.uuid4().hex,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'stages': [],
+            '_start': time.perf_counter()
+        }
+    if Config.PROFILE_TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _trace
+
+def current_trace() -> dict:
+    """The trace being recorded, or an empty dict when no trace is active."""
+    return _trace
+
+def stop_trace() -> dict:
+    """Stop recording and return the trace; stages run afterwards are not kept until the next start_trace."""
+    global _trace
+    with _lock:
+        trace, _trace = _trace, {}
+    return trace
+
+def count_rows(obj) -> Optional[int]:
+    """Rows of a DataFrame or Series, summed over tuples and lists; None for anything else."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        counts = [count_rows(item) for item in obj]
+        counts = [count for count in counts if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+@contextmanager
+def stage_timer(name: str, rows_in: Optional[int] = None):
+    """
+    Record wall time, CPU time, rows and memory of the enclosed block as one stage of the trace.
+
+    Yields a dict; set its 'rows_out' entry to record the output size. CPU time is for
+    the whole process, so it includes other threads running at the same time. Memory is
+    the growth of the process peak RSS, plus the tracemalloc peak of the block when
+    Config.PROFILE_TRACEMALLOC is set. Nothing is recorded unless a trace was started
+    with start_trace, so library use without an entry point does not accumulate stages.
+    """
+    trace = current_trace()
+    if not Config.PROFILING_ENABLED or not trace:
+        yield {}
+        return
+    stack = _local.__dict__.setdefault('stack', [])
+    record = {'stage': name, 'depth': len(stack), 'thread': threading.current_thread().name, 'rows_in': rows_in, 'rows_out': None}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # Resetting the peak would hide it from enclosing stages, so hand it to them first
+        current, peak = tracemalloc.get_traced_memory()
+        for outer in stack:
+            outer['_peak'] = max(outer['_peak'], peak)
+        record['_before'], record['_peak'] = current, current
+        tracemalloc.reset_peak()
+    rss_before = _peak_rss_mb()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    stack.append(record)
+    try:
+        yield record
+    finally:
+        stack.pop()
+        record['start_s'] = round(start_wall - trace['_start'], 6)
+        record['wall_s'] = round(time.perf_counter() - start_wall, 6)
+        record['cpu_s'] = round(time.process_time() - start_cpu, 6)
+        record['peak_rss_mb'] = round(_peak_rss_mb(), 1)
+        record['rss_growth_mb'] = round(record['peak_rss_mb'] - rss_before, 1)
+        if tracing:
+            peak = max(tracemalloc.get_traced_memory()[1], record.pop('_peak'))
+            record['tracemalloc_peak_mb'] = round((peak - record.pop('_before')) / 1e6, 3)
+        with _lock:
+            trace['stages'].append(record)
+
+def profile_stage(func: Callable = None, *, name: str = None) -> Callable:
+    """
+    Decorator recording each call of a function as a stage of the trace.
+
+    Rows in are counted over the DataFrame and Series arguments, rows out over the result.
+    """
+    if func is None:
+        return functools.partial(profile_stage, name=name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage_timer(name or func.__name__, count_rows(list(args) + list(kwargs.values()))) as record:
+            result = func(*args, **kwargs)
+            record['rows_out'] = count_rows(result)
+        return result
+    return wrapper
+
+def write_trace(path: str = None) -> str:
+    """
+    Stop the current trace and write it as JSON, optionally logging it to MLflow.
+
+    Args:
+        path (str): Output file. Defaults to Config.PROFILE_TRACE_DIR/trace-<run_id>.json.
+
+    Returns:
+        str: The path written.
+
+    Raises:
+        RuntimeError: When no trace was started.
+    """
+    trace = stop_trace()
+    if not trace:
+        raise RuntimeError("No trace to write; call start_trace first")
+    trace = {key: value for key, value in trace.items() if not key.startswith('_')}
+    path = path or os.path.join(Config.PROFILE_TRACE_DIR, f"trace-{trace['run_id']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(trace, f, indent=2)
+    logging.info(f"Wrote profiling trace with {len(trace['stages'])} stages to {path}.")
+    if Config.PROFILE_MLFLOW:
+        log_trace_to_mlflow(trace)
+    return path
+
+def trace_metrics(trace: dict) -> list:
+    """
+    Flatten a trace into (metric name, value, step) tuples, one step per call of a stage.
+    """
+    metrics, calls = [], {}
+    for record in trace['stages']:
+        step = calls.get(record['stage'], 0)
+        calls[record['stage']] = step + 1
+        for field in ['wall_s', 'cpu_s', 'rows_in', 'rows_out', 'rss_growth_mb', 'tracemalloc_peak_mb']:
+            if record.get(field) is not None:
+                metrics.append((f"{record['stage']}.{field}", record[field], step))
+    return metrics
+
+def log_trace_to_mlflow(trace: dict) -> None:
+    """Log the numbers of a trace as MLflow metrics of the active run, like mlflow_script.log_mlflow_metrics."""
+    import mlflow
+    for key, value, step in trace_metrics(trace):
+        mlflow.log_metric(key, value, step=step)
+    logging.info(f"Logged {len(trace['stages'])} profiled stages to MLflow.")
@@ -0,0 +1,146 @@
+# scaling.py
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from sklearn.preprocessing import StandardScaler
+from config.config import Config
+from profiling import profile_stage
+from feat_eng import FEATURES_TO_SCALE, scale_features
+
+STATE_ROWS = ['mean', 'var', 'n_samples_seen']
+
+def _scaler_from_stats(columns: list, mean: np.ndarray, var: np.ndarray, n_samples_seen: np.ndarray) -> StandardScaler:
+    """Build a fitted StandardScaler from its statistics."""
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(mean, dtype=np.float64)
+    scaler.var_ = np.asarray(var, dtype=np.float64)
+    scale = np.sqrt(scaler.var_)
+    # Constant features are left unscaled, as in StandardScaler
+    scaler.scale_ = np.where(scale < 10 * np.finfo(np.float64).eps, 1.0, scale)
+    n_samples_seen = np.asarray(n_samples_seen, dtype=np.int64)
+    scaler.n_samples_seen_ = int(n_samples_seen[0]) if (n_samples_seen == n_samples_seen[0]).all() else n_samples_seen
+    scaler.n_features_in_ = len(columns)
+    scaler.feature_names_in_ = np.asarray(columns, dtype=object)
+    return scaler
+
+def _samples_seen(scaler: StandardScaler) -> np.ndarray:
+    return np.broadcast_to(np.asarray(scaler.n_samples_seen_, dtype=np.int64), scaler.mean_.shape)
+
+def merge_scalers(scalers: Iterable[StandardScaler]) -> StandardScaler:
+    """
+    Combine scalers fitted on disjoint parts of the same columns into the scaler of all the rows.
+
+    Means and variances are pooled with the parallel update of Chan et al., so the result
+    matches a single fit over the concatenated rows.
+    """
+    scalers = [scaler for scaler in scalers if _samples_seen(scaler).any()]
+    if not scalers:
+        raise ValueError("No fitted scalers to merge")
+    columns = list(scalers[0].feature_names_in_)
+    n, mean, m2 = np.zeros(len(columns)), np.zeros(len(columns)), np.zeros(len(columns))
+    for scaler in scalers:
+        if list(scaler.feature_names_in_) != columns:
+            raise ValueError(f"Cannot merge scalers fitted on {columns} and {list(scaler.feature_names_in_)}")
+        n_part = _samples_seen(scaler).astype(np.float64)
+        total = n + n_part
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.nan_to_num(scaler.mean_) - mean
+            mean = np.where(total > 0, mean + delta * n_part / total, 0.0)
+            m2 = np.where(total > 0, m2 + np.nan_to_num(scaler.var_) * n_part + delta ** 2 * n * n_part / total, 0.0)
+        n = total
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = np.where(n > 0, m2 / n, np.nan)
+    return _scaler_from_stats(columns, np.where(n > 0, mean, np.nan), var, n)
+
+@profile_stage
+def fit_scaler(df: pd.DataFrame, columns: list = None, workers: int = None) -> StandardScaler:
+    """
+    Fit a StandardScaler on the given columns, over row blocks in parallel threads.
+
+    Args:
+        df (pd.DataFrame): Feature table.
+        columns (list): Columns to scale. Defaults to FEATURES_TO_SCALE.
+        workers (int): Threads, each fitting one block of rows. Defaults to Config.SCALER_WORKERS.
+
+    Returns:
+        StandardScaler: The fitted scaler.
+    """
+    columns = columns or FEATURES_TO_SCALE
+    workers = max(1, min(workers or Config.SCALER_WORKERS, len(df)))
+    try:
+        bounds = np.linspace(0, len(df), workers + 1).astype(int)
+        blocks = [df[columns].iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+        if workers == 1:
+            scaler = StandardScaler().partial_fit(blocks[0])
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                scaler = merge_scalers(pool.map(lambda block: StandardScaler().partial_fit(block), blocks))
+        logging.info(f"Fitted scaler on {len(df)} rows with {workers} workers.")
+    except Exception as e:
+        logging.error(f"Error fitting scaler: {e}")
+        raise
+    return scaler
+
+def scaler_to_frame(scaler: StandardScaler) -> pd.DataFrame:
+    """The statistics of a fitted scaler as a DataFrame with one column per feature, so it can be cached like other stage outputs."""
+    return pd.DataFrame([scaler.mean_, scaler.var_, _samples_seen(scaler).astype(np.float64)],
+                        index=STATE_ROWS, columns=list(scaler.feature_names_in_))
+
+def scaler_from_frame(state: pd.DataFrame) -> StandardScaler:
+    """Rebuild a fitted scaler from scaler_to_frame output."""
+    return _scaler_from_stats(list(state.columns), state.loc['mean'].to_numpy(), state.loc['var'].to_numpy(),
+                              state.loc['n_samples_seen'].to_numpy())
+
+def fit_scaler_state(df: pd.DataFrame) -> pd.DataFrame:
+    """Fit the scaler on the merged table and return its statistics as a DataFrame."""
+    return scaler_to_frame(fit_scaler(df))
+
+def save_scaler(scaler: StandardScaler, path: str = None) -> str:
+    """
+    Write the statistics of a fitted scaler as JSON.
+
+    Args:
+        scaler (StandardScaler): Fitted scaler.
+        path (str): Output file. Defaults to Config.SCALER_PATH, next to the model.
+
+    Returns:
+        str: The path written.
+    """
+    path = path or Config.SCALER_PATH
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        state = {'columns': list(scaler.feature_names_in_), 'mean': scaler.mean_.tolist(), 'var': scaler.var_.tolist(),
+                 'n_samples_seen': _samples_seen(scaler).tolist()}
+        with open(path, 'w') as f:
+            json.dump(state, f, indent=2)
+        logging.info(f"Saved scaler to {path}.")
+    except Exception as e:
+        logging.error(f"Error saving scaler: {e}")
+        raise
+    return path
+
+_loaded = {}
+
+def load_scaler(path: str = None) -> StandardScaler:
+    """Load a scaler written by save_scaler, reusing the loaded copy while the file is unchanged."""
+    path = path or Config.SCALER_PATH
+    try:
+        version = os.stat(path).st_mtime_ns
+        if _loaded.get(path, (None,))[0] != version:
+            with open(path) as f:
+                state = json.load(f)
+            _loaded[path] = (version, _scaler_from_stats(state['columns'], state['mean'], state['var'], state['n_samples_seen']))
+            logging.info(f"Loaded scaler from {path}.")
+    except Exception as e:
+        logging.error(f"Error loading scaler: {e}")
+        raise
+    return _loaded[path][1]
+
+def transform_batch(df: pd.DataFrame, scaler: StandardScaler = None) -> pd.DataFrame:
+    """Scale a new batch with the persisted scaler, without refitting."""
+    return scale_features(df, scaler or load_scaler())
@@ -0,0 +1,48 @@
+# spatial_index.py
+
+import numpy as np
+import logging
+from sklearn.neighbors import BallTree
+from distance import EARTH_RADIUS_KM
+
+class SpatialIndex:
+    """
+    BallTree over lat/lng points with the haversine metric.
+
+    Rows with missing coordinates are left out of the tree. Query results are
+    positions into the arrays the index was built from.
+    """
+
+    def __init__(self, lat, lng, leaf_size: int = 40):
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        self.positions = np.flatnonzero(valid)
+        self.size = len(lat)
+        # BallTree rejects empty input; without points every query finds nothing
+        self.tree = BallTree(np.radians(np.column_stack([lat[valid], lng[valid]])), leaf_size=leaf_size,
+                             metric='haversine') if len(self.positions) else None
+        logging.info(f"Built spatial index over {len(self.positions)} of {self.size} points.")
+
+    def _queries(self, lat, lng):
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lng = np.atleast_1d(np.asarray(lng, dtype=np.float64))
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        return np.radians(np.column_stack([lat[valid], lng[valid]])), valid
+
+    def count_within(self, lat, lng, radius_km: float) -> np.ndarray:
+        """Number of indexed points within radius_km of each query point (0 for missing coordinates)."""
+        queries, valid = self._queries(lat, lng)
+        counts = np.zeros(len(valid), dtype=np.int64)
+        if self.tree is not None and valid.any():
+            counts[valid] = self.tree.query_radius(queries, r=radius_km / EARTH_RADIUS_KM, count_only=True)
+        return counts
+
+    def query_within(self, lat, lng, radius_km: float) -> list:
+        """Positions of the indexed points within radius_km of each query point."""
+        queries, valid = self._queries(lat, lng)
+        neighbors = [np.empty(0, dtype=np.int64) for _ in range(len(valid))]
+        if self.tree is not None and valid.any():
+            for i, ind in zip(np.flatnonzero(valid), self.tree.query_radius(queries, r=radius_km / EARTH_RADIUS_KM)):
+                neighbors[i] = self.positions[ind]
+        return neighbors
@@ -0,0 +1,95 @@
+# spatiotemporal_join.py
+
+import numpy as np
+import pandas as pd
+import logging
+from config.config import Config
+from distance import haversine_distance
+from spatial_index import SpatialIndex
+
+def _to_nanoseconds(values: pd.Series) -> np.ndarray:
+    """Convert a timestamp column to int64 nanoseconds, with NaT as the int64 minimum."""
+    return pd.to_datetime(values).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+def spatiotemporal_join(pings: pd.DataFrame, orders: pd.DataFrame, radius: float = None, window_minutes: float = None,
+                        ping_columns: tuple = ('lat', 'lng', 'created_at'),
+                        order_columns: tuple = ('lat', 'lng', 'created_at')) -> pd.DataFrame:
+    """
+    Find the driver pings within a radius and time window of each order.
+
+    Orders are swept in time order in blocks spanning one window. For each block only
+    the pings whose timestamps fall inside the block's window (found by binary search
+    on the sorted ping times) are indexed in a BallTree, so the work stays proportional
+    to the pings that can actually match instead of the full cross product.
+
+    Args:
+        pings (pd.DataFrame): Driver pings.
+        orders (pd.DataFrame): Order requests.
+        radius (float): Radius in kilometers. Defaults to Config.RADIUS.
+        window_minutes (float): Maximum absolute time difference between a ping and an
+            order. Defaults to Config.TIME_WINDOW_MINUTES.
+        ping_columns (tuple): Latitude, longitude and timestamp columns of pings.
+        order_columns (tuple): Latitude, longitude and timestamp columns of orders.
+
+    Returns:
+        pd.DataFrame: One row per matching (order, ping) pair with the original index
+        labels ('order_index', 'ping_index'), 'distance_km' and 'time_delta_s'
+        (ping time minus order time), plus 'driver_id' when pings carry it.
+    """
+    radius = Config.RADIUS if radius is None else radius
+    window_minutes = Config.TIME_WINDOW_MINUTES if window_minutes is None else window_minutes
+    window = np.int64(window_minutes * 60 * 1e9)
+    p_lat_col, p_lng_col, p_time_col = ping_columns
+    o_lat_col, o_lng_col, o_time_col = order_columns
+
+    try:
+        p_time = _to_nanoseconds(pings[p_time_col])
+        o_time = _to_nanoseconds(orders[o_time_col])
+        nat = np.iinfo(np.int64).min
+
+        # Sort both sides by time once, leaving out rows without a timestamp
+        p_sorted = np.flatnonzero(p_time != nat)
+        p_sorted = p_sorted[np.argsort(p_time[p_sorted], kind='stable')]
+        o_sorted = np.flatnonzero(o_time != nat)
+        o_sorted = o_sorted[np.argsort(o_time[o_sorted], kind='stable')]
+        p_time_sorted = p_time[p_sorted]
+        o_time_sorted = o_time[o_sorted]
+        p_lat = pings[p_lat_col].to_numpy(dtype=np.float64)[p_sorted]
+        p_lng = pings[p_lng_col].to_numpy(dtype=np.float64)[p_sorted]
+        o_lat = orders[o_lat_col].to_numpy(dtype=np.float64)[o_sorted]
+        o_lng = orders[o_lng_col].to_numpy(dtype=np.float64)[o_sorted]
+
+        order_hits, ping_hits = [], []
+        start = 0
+        while start < len(o_sorted):
+            stop = np.searchsorted(o_time_sorted, o_time_sorted[start] + window, side='right')
+            lo = np.searchsorted(p_time_sorted, o_time_sorted[start] - window, side='left')
+            hi = np.searchsorted(p_time_sorted, o_time_sorted[stop - 1] + window, side='right')
+            if hi > lo:
+                index = SpatialIndex(p_lat[lo:hi], p_lng[lo:hi])
+                neighbors = index.query_within(o_lat[start:stop], o_lng[start:stop], radius)
+                lengths = np.fromiter((len(n) for n in neighbors), dtype=np.int64, count=len(neighbors))
+                if lengths.sum():
+                    block_orders = np.repeat(np.arange(start, stop), lengths)
+                    block_pings = np.concatenate(neighbors) + lo
+                    in_window = np.abs(p_time_sorted[block_pings] - o_time_sorted[block_orders]) <= window
+                    order_hits.append(block_orders[in_window])
+                    ping_hits.append(block_pings[in_window])
+            start = stop
+
+        order_hits = np.concatenate(order_hits) if order_hits else np.empty(0, dtype=np.int64)
+        ping_hits = np.concatenate(ping_hits) if ping_hits else np.empty(0, dtype=np.int64)
+
+        result = pd.DataFrame({
+            'order_index': orders.index.to_numpy()[o_sorted[order_hits]],
+            'ping_index': pings.index.to_numpy()[p_sorted[ping_hits]],
+            'distance_km': haversine_distance(o_lat[order_hits], o_lng[order_hits], p_lat[ping_hits], p_lng[ping_hits]),
+            'time_delta_s': (p_time_sorted[ping_hits] - o_time_sorted[order_hits]) / 1e9,
+        })
+        if 'driver_id' in pings.columns:
+            result['driver_id'] = pings['driver_id'].to_numpy()[p_sorted[ping_hits]]
+        logging.info(f"Joined {len(o_sorted)} orders to pings within {radius} km and {window_minutes} minutes: {len(result)} pairs.")
+    except Exception as e:
+        logging.error(f"Error joining pings to orders: {e}")
+        raise
+    return result
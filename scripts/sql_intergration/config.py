@@ -13,8 +13,18 @@ DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT')
 
+# Connection pool
+DB_POOL_MIN_CONNECTIONS = int(os.getenv('DB_POOL_MIN_CONNECTIONS', 1))
+DB_POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX_CONNECTIONS', 4))
+DB_POOL_HEALTH_CHECK = True  # Run SELECT 1 on checkout and replace dead connections
+
 # Define CSV file paths and table names
 CSV_FILE_1 = '/home/moraa/Documents/10_academy/Week-8/data/driver_locations_during_request.csv'
 CSV_FILE_2 = '/home/moraa/Documents/10_academy/Week-8/data/nb.csv'
 TABLE_1 = 'df1_driver_locations_during_request'
 TABLE_2 = 'df2_nb'
+
+# Bulk loading
+COPY_BUFFER_SIZE = 8 * 1024 * 1024  # Bytes handed to COPY per read
+COPY_PROGRESS_INTERVAL = 64 * 1024 * 1024  # Log progress every this many bytes
+LOAD_CONCURRENTLY = True  # Load TABLE_1 and TABLE_2 at the same time over separate connections
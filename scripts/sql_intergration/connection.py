@@ -0,0 +1,115 @@
+import atexit
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from typing import Iterator
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extensions import connection
+
+from scripts.sql_intergration.config import (
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT,
+    DB_POOL_MIN_CONNECTIONS, DB_POOL_MAX_CONNECTIONS, DB_POOL_HEALTH_CHECK
+)
+
+_pool = None
+_slots = None
+_lock = threading.Lock()
+
+
+def get_pool() -> pool.ThreadedConnectionPool:
+    """
+    Return the shared connection pool, creating it on first use.
+    """
+    global _pool, _slots
+    with _lock:
+        if _pool is None or _pool.closed:
+            _pool = pool.ThreadedConnectionPool(
+                DB_POOL_MIN_CONNECTIONS,
+                DB_POOL_MAX_CONNECTIONS,
+                dbname=DB_NAME,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                host=DB_HOST,
+                port=DB_PORT
+            )
+            # Callers wait for a free connection instead of getting a PoolError
+            _slots = threading.BoundedSemaphore(DB_POOL_MAX_CONNECTIONS)
+            logging.info(f"Opened PostgreSQL connection pool ({DB_POOL_MIN_CONNECTIONS}-{DB_POOL_MAX_CONNECTIONS} connections)")
+        return _pool
+
+
+def close_pool() -> None:
+    """
+    Close every connection in the shared pool.
+    """
+    global _pool
+    with _lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+            logging.info("Closed PostgreSQL connection pool")
+        _pool = None
+
+
+atexit.register(close_pool)
+
+
+def is_healthy(conn: connection) -> bool:
+    """
+    Check that a pooled connection is still usable.
+    """
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+@contextmanager
+def postgres_connection() -> Iterator[connection]:
+    """
+    Borrow a connection from the shared pool.
+
+    Anything the caller did not commit is rolled back before the connection goes
+    back to the pool. Connections that failed the health check or broke while in
+    use are closed instead of being reused.
+    """
+    conn_pool = get_pool()
+    slots = _slots
+    slots.acquire()
+    try:
+        conn = conn_pool.getconn()
+        if DB_POOL_HEALTH_CHECK and not is_healthy(conn):
+            logging.warning("Replacing unhealthy PostgreSQL connection")
+            conn_pool.putconn(conn, close=True)
+            conn = conn_pool.getconn()
+
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            if not broken and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            conn_pool.putconn(conn, close=broken or bool(conn.closed))
+    finally:
+        slots.release()
+
+
+# PostgreSQL connection function decorator
+def with_postgres_connection(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with postgres_connection() as conn:
+            return func(conn, *args, **kwargs)
+    return wrapper
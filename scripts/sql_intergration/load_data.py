@@ -1,7 +1,9 @@
 import os
-import pandas as pd
-import psycopg2
+import csv
+import logging
 from psycopg2 import sql
+from psycopg2.extensions import connection
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from typing import List, Tuple
 
@@ -9,56 +11,109 @@ from typing import List, Tuple
 load_dotenv()
 
 # Import configuration from config.py
-from scripts.sql_intergration.config import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, CSV_FILE_1, CSV_FILE_2, TABLE_1, TABLE_2
-
-
-# PostgreSQL connection function decorator
-def with_postgres_connection(func):
-    def wrapper(*args, **kwargs):
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
-        try:
-            result = func(conn, *args, **kwargs)
-        finally:
-            conn.close()
-        return result
-    return wrapper
+from scripts.sql_intergration.config import (
+    CSV_FILE_1, CSV_FILE_2, TABLE_1, TABLE_2, COPY_BUFFER_SIZE, COPY_PROGRESS_INTERVAL, LOAD_CONCURRENTLY
+)
+from scripts.sql_intergration.connection import with_postgres_connection
+
+
+class ProgressReader:
+    """File wrapper that logs how much of a file COPY has consumed."""
+
+    def __init__(self, f, total_bytes: int, label: str, interval: int = COPY_PROGRESS_INTERVAL):
+        self.f = f
+        self.total_bytes = total_bytes
+        self.label = label
+        self.interval = interval
+        self.bytes_read = 0
+        self.last_logged = 0
+
+    def _report(self, data) -> None:
+        self.bytes_read += len(data)
+        if self.bytes_read - self.last_logged >= self.interval or (not data and self.bytes_read != self.last_logged):
+            percent = 100 * self.bytes_read / self.total_bytes if self.total_bytes else 100
+            logging.info(f"{self.label}: {self.bytes_read / 1e6:.1f} MB of {self.total_bytes / 1e6:.1f} MB copied ({percent:.0f}%)")
+            self.last_logged = self.bytes_read
+
+    def read(self, size: int = -1):
+        data = self.f.read(size)
+        self._report(data)
+        return data
+
+    def readline(self, size: int = -1):
+        data = self.f.readline(size)
+        self._report(data)
+        return data
+
+
+def read_csv_columns(csv_file: str) -> List[str]:
+    """
+    Read the header of a CSV file and normalize it to table column names.
+
+    Args:
+    - csv_file: path to the CSV file
+
+    Returns:
+    - Column names in snake_case, e.g. 'Trip ID' -> 'trip_id'
+    """
+    with open(csv_file, newline='') as f:
+        header = next(csv.reader(f))
+    return [column.strip().lower().replace(' ', '_') for column in header]
 
 
 # Function to load data from CSV file into PostgreSQL table
 @with_postgres_connection
-def load_csv_to_db(conn: psycopg2.Connection, csv_file: str, table_name: str) -> None:
+def load_csv_to_db(conn: connection, csv_file: str, table_name: str) -> int:
     """
     Load data from a CSV file into a PostgreSQL table.
 
+    The file is streamed to the server with COPY FROM STDIN in COPY_BUFFER_SIZE
+    reads, so memory stays bounded regardless of the file size and there is a
+    single round trip instead of one per row.
+
     Args:
     - conn: psycopg2 connection object
     - csv_file: path to the CSV file
     - table_name: name of the PostgreSQL table
+
+    Returns:
+    - Number of rows copied
     """
-    # Read the CSV file into a DataFrame
-    df = pd.read_csv(csv_file)
-    
-    # Prepare columns for SQL insertion
-    columns = df.columns.tolist()
-    columns_str = ', '.join(columns)
-    placeholders = ', '.join(['%s'] * len(columns))
-    
-    # Create the insert query dynamically
-    insert_query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-    
-    # Iterate over the DataFrame rows and execute the insert query
-    records = df.values.tolist()
-    with conn.cursor() as cur:
-        cur.executemany(insert_query, records)
-    
+    columns = read_csv_columns(csv_file)
+    copy_query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)").format(
+        sql.Identifier(table_name),
+        sql.SQL(', ').join(sql.Identifier(column) for column in columns)
+    )
+
+    with open(csv_file, 'rb') as f:
+        reader = ProgressReader(f, os.path.getsize(csv_file), table_name)
+        with conn.cursor() as cur:
+            cur.copy_expert(copy_query, reader, size=COPY_BUFFER_SIZE)
+            rows = cur.rowcount
+
     # Commit the transaction
     conn.commit()
+    logging.info(f"Copied {rows} rows from {csv_file} into {table_name}")
+    return rows
+
+
+def load_tables(tables: List[Tuple[str, str]], concurrent: bool = LOAD_CONCURRENTLY) -> List[int]:
+    """
+    Load several CSV files into their tables, optionally at the same time.
+
+    Args:
+    - tables: list of (csv_file, table_name) pairs
+    - concurrent: load each table in its own thread over its own pooled connection
+
+    Returns:
+    - Number of rows copied into each table
+    """
+    if not concurrent or len(tables) < 2:
+        return [load_csv_to_db(csv_file, table_name) for csv_file, table_name in tables]
+
+    with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+        futures = [executor.submit(load_csv_to_db, csv_file, table_name) for csv_file, table_name in tables]
+        return [future.result() for future in futures]
 
 
 # Main function to execute data loading process
@@ -67,13 +122,10 @@ def main() -> None:
     Main function to execute the data loading process.
     """
     try:
-        # Load data into table 1
-        load_csv_to_db(CSV_FILE_1, TABLE_1)
-        print(f"Data loaded from {CSV_FILE_1} into table {TABLE_1}")
-
-        # Load data into table 2
-        load_csv_to_db(CSV_FILE_2, TABLE_2)
-        print(f"Data loaded from {CSV_FILE_2} into table {TABLE_2}")
+        tables = [(CSV_FILE_1, TABLE_1), (CSV_FILE_2, TABLE_2)]
+        load_tables(tables)
+        for csv_file, table_name in tables:
+            print(f"Data loaded from {csv_file} into table {table_name}")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,102 @@
+# streaming.py
+
+import os
+import pandas as pd
+import logging
+from typing import Iterable
+from sklearn.preprocessing import StandardScaler
+from config.config import Config
+from profiling import profile_stage
+from data_preprocessing import load_data_chunks
+from feat_eng import FEATURES_TO_SCALE, engineer_trip_features, assign_grid_cells, merge_and_calculate_distances, scale_features
+from scaling import save_scaler
+
+def compute_impute_values(df2_chunks: Iterable[pd.DataFrame]) -> dict:
+    """Compute the mode of each column in Config.DF2_IMPUTE_COLUMNS across all chunks."""
+    counts = {column: pd.Series(dtype='int64') for column, method in Config.DF2_IMPUTE_COLUMNS.items() if method == 'mode'}
+    for chunk in df2_chunks:
+        for column in counts:
+            counts[column] = counts[column].add(chunk[column].value_counts(), fill_value=0)
+    # Ties go to the smallest value, like Series.mode()[0]
+    return {column: count.sort_index().idxmax() for column, count in counts.items() if len(count)}
+
+@profile_stage
+def process_trip_chunk(df2: pd.DataFrame, impute_values: dict) -> pd.DataFrame:
+    """Impute missing values and run the per-row trip feature steps on one df2 chunk."""
+    for column, value in impute_values.items():
+        df2[column] = df2[column].fillna(value)
+    df2 = engineer_trip_features(df2)
+    return df2
+
+@profile_stage
+def process_ping_chunk(df1: pd.DataFrame, trips: pd.DataFrame) -> pd.DataFrame:
+    """Drop unused columns from one df1 chunk, merge it with the trips and compute distances and grid cells."""
+    drop_columns = Config.DF1_DROP_COLUMNS
+    if Config.KEEP_PING_TIMESTAMPS:
+        drop_columns = [column for column in drop_columns if column not in Config.DF1_TIMESTAMP_COLUMNS]
+    df1 = df1.drop(columns=drop_columns)
+    df_merged = merge_and_calculate_distances(df1, trips)
+    df_merged = assign_grid_cells(df_merged)
+    return df_merged
+
+@profile_stage
+def run_streaming_pipeline(output_path: str = None, chunksize: int = None) -> str:
+    """
+    Run preprocessing and feature engineering chunk by chunk and write the merged table incrementally.
+
+    The trip table (df2) is the small side of the join: its chunks are featurized and
+    kept, while the ping table (df1) is streamed and merged against it chunk by chunk.
+    Unscaled merged chunks are spilled to a temporary file while the scaler is fitted
+    with partial_fit, then read back, transformed and appended to the output, so the
+    result matches the in-memory path. The fitted scaler is saved to Config.SCALER_PATH
+    for transforming new batches.
+
+    Args:
+        output_path (str): CSV file to write. Defaults to Config.STREAM_OUTPUT_PATH.
+        chunksize (int): Rows per chunk. Defaults to Config.CHUNK_SIZE.
+
+    Returns:
+        str: The output path.
+    """
+    output_path = output_path or Config.STREAM_OUTPUT_PATH
+    chunksize = chunksize or Config.CHUNK_SIZE
+    spill_path = f"{output_path}.unscaled.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    try:
+        _, df2_chunks = load_data_chunks(chunksize)
+        impute_values = compute_impute_values(df2_chunks)
+
+        df1_chunks, df2_chunks = load_data_chunks(chunksize)
+        trips = pd.concat([process_trip_chunk(chunk, impute_values) for chunk in df2_chunks], ignore_index=True)
+        logging.info(f"Processed {len(trips)} trips in streaming mode.")
+
+        scaler = StandardScaler()
+        rows = 0
+        float_dtypes = {}
+        for i, chunk in enumerate(df1_chunks):
+            df_merged = process_ping_chunk(chunk, trips)
+            if len(df_merged):
+                scaler.partial_fit(df_merged[FEATURES_TO_SCALE])
+                float_dtypes = {column: dtype for column, dtype in df_merged.dtypes.items() if dtype.kind == 'f'}
+            df_merged.to_csv(spill_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            rows += len(df_merged)
+            logging.info(f"Merged ping chunk {i} ({rows} rows so far).")
+
+        if rows == 0:
+            raise ValueError("Streaming pipeline produced no merged rows.")
+
+        save_scaler(scaler)
+
+        # Read the spill back with the float widths it was written with, so float32 columns round-trip exactly
+        for i, chunk in enumerate(pd.read_csv(spill_path, chunksize=chunksize, dtype=float_dtypes)):
+            chunk = scale_features(chunk, scaler)
+            chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        logging.info(f"Streaming pipeline wrote {rows} rows to {output_path}.")
+    except Exception as e:
+        logging.error(f"Error in streaming pipeline: {e}")
+        raise
+    finally:
+        if os.path.exists(spill_path):
+            os.remove(spill_path)
+    return output_path
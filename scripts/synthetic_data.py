@@ -0,0 +1,173 @@
+# synthetic_data.py
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+# Lagos demand hotspots: (lat, lng, spread in degrees, weight)
+LAGOS_HOTSPOTS = [
+    (6.6018, 3.3515, 0.020, 0.18),  # Ikeja
+    (6.4281, 3.4219, 0.012, 0.14),  # Victoria Island
+    (6.4550, 3.3941, 0.010, 0.10),  # Lagos Island
+    (6.4698, 3.5852, 0.025, 0.12),  # Lekki
+    (6.5095, 3.3711, 0.012, 0.10),  # Yaba
+    (6.5000, 3.3500, 0.015, 0.09),  # Surulere
+    (6.4500, 3.3667, 0.012, 0.06),  # Apapa
+    (6.4667, 3.2833, 0.015, 0.06),  # Festac
+    (6.6194, 3.5105, 0.025, 0.07),  # Ikorodu
+    (6.4670, 3.5700, 0.020, 0.08),  # Ajah
+]
+# Remaining demand is spread uniformly over the metro area
+LAGOS_BOUNDS = (6.40, 6.70, 3.20, 3.65)
+BACKGROUND_WEIGHT = 0.10
+
+# Relative trip volume by hour of day, with morning and evening peaks
+HOURLY_PROFILE = np.array([1, 1, 1, 1, 2, 4, 8, 12, 14, 10, 8, 8, 9, 8, 8, 9, 11, 14, 15, 12, 9, 6, 4, 2], dtype=float)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def sample_locations(rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sample n points from the Lagos hotspot mixture."""
+    lat0, lat1, lng0, lng1 = LAGOS_BOUNDS
+    weights = np.array([hotspot[3] for hotspot in LAGOS_HOTSPOTS] + [BACKGROUND_WEIGHT])
+    component = rng.choice(len(weights), size=n, p=weights / weights.sum())
+    centers = np.array([hotspot[:3] for hotspot in LAGOS_HOTSPOTS])
+    hotspot = component < len(LAGOS_HOTSPOTS)
+    lat = np.where(hotspot, 0.0, rng.uniform(lat0, lat1, n))
+    lng = np.where(hotspot, 0.0, rng.uniform(lng0, lng1, n))
+    picked = centers[component[hotspot]]
+    lat[hotspot] = rng.normal(picked[:, 0], picked[:, 2])
+    lng[hotspot] = rng.normal(picked[:, 1], picked[:, 2])
+    return np.clip(lat, lat0, lat1), np.clip(lng, lng0, lng1)
+
+def format_timestamps(values) -> np.ndarray:
+    """Format timestamps as TIMESTAMP_FORMAT strings, much faster than strftime."""
+    seconds = np.asarray(values, dtype='datetime64[s]')
+    return np.char.replace(np.datetime_as_string(seconds), 'T', ' ')
+
+def _format_points(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    return np.char.add(np.char.add(np.round(lat, 6).astype(str), ','), np.round(lng, 6).astype(str))
+
+def generate_trips(n_trips: int, seed: int = 0, first_trip_id: int = 1, start: str = '2021-07-01',
+                   days: int = 180, missing_fraction: float = 0.01) -> pd.DataFrame:
+    """
+    Generate trips in the nb.csv schema.
+
+    Args:
+        n_trips (int): Number of trips.
+        seed (int): Random seed.
+        first_trip_id (int): Trip ID of the first trip; IDs are consecutive.
+        start (str): First day of the period.
+        days (int): Length of the period in days.
+        missing_fraction (float): Share of trips with a missing Trip End Time.
+
+    Returns:
+        pd.DataFrame: Trip ID, Trip Origin, Trip Destination, Trip Start Time and Trip End Time.
+    """
+    rng = np.random.default_rng(seed)
+    origin_lat, origin_lng = sample_locations(rng, n_trips)
+    destination_lat, destination_lng = sample_locations(rng, n_trips)
+
+    hours = rng.choice(24, size=n_trips, p=HOURLY_PROFILE / HOURLY_PROFILE.sum())
+    seconds = rng.integers(0, days, n_trips) * 86400 + hours * 3600 + rng.integers(0, 3600, n_trips)
+    starts = pd.Timestamp(start) + pd.to_timedelta(seconds, unit='s')
+    # Roughly 3 minutes per km on congested roads, plus pickup time
+    km = np.hypot(destination_lat - origin_lat, (destination_lng - origin_lng) * np.cos(np.radians(origin_lat))) * 111.32
+    ends = starts + pd.to_timedelta((km * 180 + rng.gamma(2.0, 300, n_trips)).astype(np.int64), unit='s')
+
+    end_times = pd.Series(format_timestamps(ends), dtype=object)
+    end_times[rng.random(n_trips) < missing_fraction] = np.nan
+    return pd.DataFrame({
+        'Trip ID': np.arange(first_trip_id, first_trip_id + n_trips),
+        'Trip Origin': _format_points(origin_lat, origin_lng),
+        'Trip Destination': _format_points(destination_lat, destination_lng),
+        'Trip Start Time': format_timestamps(starts),
+        'Trip End Time': end_times,
+    })
+
+def generate_pings(trips: pd.DataFrame, pings_per_trip: float = 5.0, n_drivers: int = None, seed: int = 0,
+                   first_id: int = 1, accept_rate: float = 0.3) -> pd.DataFrame:
+    """
+    Generate driver locations in the driver_locations_during_request.csv schema.
+
+    Each trip gets a Poisson number of pings from drivers within a few kilometers of
+    its origin, stamped shortly after the trip request.
+
+    Args:
+        trips (pd.DataFrame): Trips from generate_trips.
+        pings_per_trip (float): Mean pings per trip.
+        n_drivers (int): Size of the driver pool. Defaults to one driver per 20 trips.
+        seed (int): Random seed.
+        first_id (int): id of the first ping; ids are consecutive.
+        accept_rate (float): Share of pings with driver_action 'accepted'.
+
+    Returns:
+        pd.DataFrame: id, order_id, driver_id, driver_action, lat, lng, created_at and updated_at.
+    """
+    rng = np.random.default_rng(seed)
+    n_drivers = n_drivers or max(1, len(trips) // 20)
+    counts = rng.poisson(pings_per_trip, len(trips))
+    trip_rows = np.repeat(np.arange(len(trips)), counts)
+    n = len(trip_rows)
+
+    origin = trips['Trip Origin'].str.split(',', expand=True).astype(float).to_numpy()
+    origin_lat, origin_lng = origin[trip_rows, 0], origin[trip_rows, 1]
+    # Drivers are typically 0.5-3 km from the pickup point
+    distance_deg = rng.gamma(2.0, 0.008, n)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    lat = origin_lat + distance_deg * np.sin(angle)
+    lng = origin_lng + distance_deg * np.cos(angle) / np.cos(np.radians(origin_lat))
+
+    requested = pd.to_datetime(trips['Trip Start Time'], format=TIMESTAMP_FORMAT).to_numpy()[trip_rows]
+    created = requested - rng.integers(30, 600, n).astype('timedelta64[s]')
+    updated = created + rng.integers(0, 60, n).astype('timedelta64[s]')
+    return pd.DataFrame({
+        'id': np.arange(first_id, first_id + n),
+        'order_id': trips['Trip ID'].to_numpy()[trip_rows],
+        'driver_id': rng.integers(1, n_drivers + 1, n),
+        'driver_action': np.where(rng.random(n) < accept_rate, 'accepted', 'rejected'),
+        'lat': np.round(lat, 6),
+        'lng': np.round(lng, 6),
+        'created_at': format_timestamps(created),
+        'updated_at': format_timestamps(updated),
+    })
+
+def generate_dataset(n_pings: int, pings_per_trip: float = 5.0, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Generate about n_pings driver locations (df1) and the trips they belong to (df2)."""
+    trips = generate_trips(max(1, int(n_pings / pings_per_trip)), seed=seed)
+    pings = generate_pings(trips, pings_per_trip, seed=seed + 1)
+    return pings, trips
+
+def write_dataset(directory: str, n_pings: int, pings_per_trip: float = 5.0, seed: int = 0,
+                  chunk_pings: int = 1_000_000) -> Tuple[str, str]:
+    """
+    Write a synthetic df1/df2 pair as CSV files, generating chunk by chunk so any size fits in memory.
+
+    Args:
+        directory (str): Output directory.
+        n_pings (int): Approximate number of driver locations, from 10^4 up to 10^8 and beyond.
+        pings_per_trip (float): Mean pings per trip.
+        seed (int): Random seed; each chunk derives its own.
+        chunk_pings (int): Approximate pings generated per chunk.
+
+    Returns:
+        Tuple[str, str]: Paths of the driver locations and trips files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    pings_path = os.path.join(directory, 'driver_locations_during_request.csv')
+    trips_path = os.path.join(directory, 'nb.csv')
+    n_trips = max(1, int(n_pings / pings_per_trip))
+    trips_per_chunk = max(1, int(chunk_pings / pings_per_trip))
+    n_drivers = max(1, n_trips // 20)
+    next_trip, next_ping = 1, 1
+    for i, first in enumerate(range(0, n_trips, trips_per_chunk)):
+        trips = generate_trips(min(trips_per_chunk, n_trips - first), seed=seed + 2 * i, first_trip_id=next_trip)
+        pings = generate_pings(trips, pings_per_trip, n_drivers=n_drivers, seed=seed + 2 * i + 1, first_id=next_ping)
+        trips.to_csv(trips_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        pings.to_csv(pings_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        next_trip += len(trips)
+        next_ping += len(pings)
+        logging.info(f"Wrote {next_ping - 1} pings and {next_trip - 1} trips to {directory}.")
+    return pings_path, trips_path
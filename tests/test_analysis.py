@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
 
 # Import the functions to be tested
@@ -13,23 +14,21 @@ class TestAnalysis(unittest.TestCase):
         self.assertEqual(clean_latitude(100), 90)
         self.assertEqual(clean_latitude(45), 45)
 
-    @patch('scripts.analysis.geodesic')
-    def test_compute_geodesic_distance(self, mock_geodesic):
-        mock_row = pd.Series({'Origin Lat': 0, 'Origin Lng': 0, 'Destination Lat': 0, 'Destination Lng': 0})
-        mock_geodesic.return_value.kilometers = 100
-
+    def test_compute_geodesic_distance(self):
+        mock_row = pd.Series({'Origin Lat': 0, 'Origin Lng': 0, 'Destination Lat': 2, 'Destination Lng': 2})
         result = compute_geodesic_distance(mock_row)
-        self.assertEqual(result, 100)
-        mock_geodesic.assert_called_once()
-
-    @patch('scripts.analysis.haversine')
-    def test_compute_haversine_distance(self, mock_haversine):
-        mock_row = pd.Series({'Origin Lat': 0, 'Origin Lng': 0, 'Destination Lat': 0, 'Destination Lng': 0})
-        mock_haversine.return_value = 100
+        self.assertAlmostEqual(float(result), 313.776, places=2)
 
+    def test_compute_haversine_distance(self):
+        mock_row = pd.Series({'Origin Lat': 0, 'Origin Lng': 0, 'Destination Lat': 2, 'Destination Lng': 2})
         result = compute_haversine_distance(mock_row)
-        self.assertEqual(result, 100)
-        mock_haversine.assert_called_once()
+        self.assertAlmostEqual(float(result), 314.50, places=1)
+
+    def test_compute_distances_on_dataframe(self):
+        mock_df = pd.DataFrame({'Origin Lat': [0, 6.5], 'Origin Lng': [0, 3.3], 'Destination Lat': [0, 6.6], 'Destination Lng': [0, 3.4]})
+        result = compute_geodesic_distance(mock_df)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0], 0)
 
     def test_compute_driving_speed(self):
         mock_row = pd.Series({'Haversine Distance': 100, 'Trip Duration': 120})
@@ -40,18 +39,46 @@ class TestAnalysis(unittest.TestCase):
         result_zero_duration = compute_driving_speed(mock_row_zero_duration)
         self.assertEqual(result_zero_duration, 0)
 
-    @patch('scripts.analysis.haversine')
-    def test_count_riders_within_radius(self, mock_haversine):
-        mock_haversine.side_effect = lambda x, y: 0.4  # Distance within radius
+    def test_count_riders_within_radius(self):
+        mock_df = pd.DataFrame({
+            'lat': [6.5000, 6.5010, 6.5020, 6.6000],
+            'lng': [3.3000, 3.3000, 3.3000, 3.3000],
+            'driver_action': ['accepted', 'accepted', 'rejected', 'accepted']
+        })
+
+        result = count_riders_within_radius(mock_df, radius=0.2)
+        self.assertEqual(result, 6)  # 2 + 3 riders around the first two orders, the far order only sees itself
+
+        total, counts = count_riders_within_radius(mock_df, radius=0.2, return_counts=True)
+        self.assertEqual(total, 6)
+        self.assertEqual(counts.tolist(), [2, 3, 1])
+        self.assertEqual(counts.index.tolist(), [0, 1, 3])
+
+    def test_count_riders_within_radius_without_coordinates(self):
+        mock_df = pd.DataFrame({'lat': [np.nan, np.nan], 'lng': [3.3, np.nan], 'driver_action': ['accepted', 'rejected']})
+        total, counts = count_riders_within_radius(mock_df, radius=0.2, return_counts=True)
+        self.assertEqual(total, 0)
+        self.assertEqual(counts.tolist(), [0])
+        self.assertEqual(count_riders_within_radius(mock_df.iloc[:0], radius=0.2), 0)
 
+    @patch('scripts.analysis.Config.RADIUS', 0.05)
+    def test_count_riders_within_radius_uses_config_radius(self):
         mock_df = pd.DataFrame({
-            'lat': [1, 2, 3],
-            'lng': [1, 2, 3],
+            'lat': [6.5000, 6.5010, 6.5020],
+            'lng': [3.3000, 3.3000, 3.3000],
             'driver_action': ['accepted', 'accepted', 'rejected']
         })
+        self.assertEqual(count_riders_within_radius(mock_df), 2)
 
-        result = count_riders_within_radius(mock_df)
-        self.assertEqual(result, 6)  # 2 accepted riders with 3 riders each in the radius
+    def test_count_riders_within_radius_and_window(self):
+        mock_df = pd.DataFrame({
+            'lat': [6.5000, 6.5010, 6.5010],
+            'lng': [3.3000, 3.3000, 3.3000],
+            'driver_action': ['accepted', 'rejected', 'rejected'],
+            'created_at': pd.to_datetime(['2021-07-01 08:00', '2021-07-01 08:10', '2021-07-01 12:00'])
+        })
+        self.assertEqual(count_riders_within_radius(mock_df, radius=0.2), 3)
+        self.assertEqual(count_riders_within_radius(mock_df, radius=0.2, window_minutes=15), 2)
 
     @patch('scripts.analysis.compute_geodesic_distance')
     @patch('scripts.analysis.compute_haversine_distance')
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+
+# Import the functions to be tested
+from scripts.artifact_cache import cached_stage, file_fingerprint, read_csv_cached, stage_key
+
+
+class TestArtifactCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.patcher = patch('config.config.Config.CACHE_DIR', os.path.join(self.tmp_dir, 'cache'))
+        self.patcher.start()
+        self.df = pd.DataFrame({'Trip ID': [1, 2], 'Trip Origin': ['6.5,3.3', '6.6,3.4'], 'Trip Duration': [10.5, 20.0]})
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cached_stage_computes_once(self):
+        compute = MagicMock(return_value=self.df)
+        first = cached_stage('merged', 'abc', compute)
+        second = cached_stage('merged', 'abc', compute)
+        compute.assert_called_once()
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_cached_stage_multiple_outputs(self):
+        compute = MagicMock(return_value=(self.df, self.df.head(1)))
+        cached_stage('preprocessed', 'abc', compute, outputs=2)
+        df1, df2 = cached_stage('preprocessed', 'abc', compute, outputs=2)
+        compute.assert_called_once()
+        self.assertEqual(len(df2), 1)
+
+    def test_new_key_replaces_previous_artifact(self):
+        cached_stage('merged', 'abc1', lambda: self.df)
+        cached_stage('merged_extra', 'abc1', lambda: self.df)
+        cached_stage('preprocessed', 'abc1', lambda: (self.df, self.df), outputs=2)
+        cached_stage('merged', 'abc2', lambda: self.df.head(1))
+        cached_stage('preprocessed', 'abc2', lambda: (self.df, self.df), outputs=2)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp_dir, 'cache'))),
+                         ['merged-abc2.parquet', 'merged_extra-abc1.parquet',
+                          'preprocessed-abc2-0.parquet', 'preprocessed-abc2-1.parquet'])
+
+    @patch('config.config.Config.CACHE_ENABLED', False)
+    def test_cache_disabled(self):
+        compute = MagicMock(return_value=self.df)
+        cached_stage('merged', 'abc', compute)
+        cached_stage('merged', 'abc', compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'cache')))
+
+    def test_read_csv_cached_invalidates_on_change(self):
+        path = os.path.join(self.tmp_dir, 'data.csv')
+        self.df.to_csv(path, index=False)
+        key = stage_key(file_fingerprint(path))
+        pd.testing.assert_frame_equal(read_csv_cached(path), self.df)
+
+        with patch('scripts.artifact_cache.pd.read_csv') as mock_read_csv:
+            pd.testing.assert_frame_equal(read_csv_cached(path), self.df)
+            mock_read_csv.assert_not_called()
+
+        self.df.head(1).to_csv(path, index=False)
+        os.utime(path, ns=(0, 0))
+        self.assertNotEqual(stage_key(file_fingerprint(path)), key)
+        self.assertEqual(len(read_csv_cached(path)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import psycopg2
+
+# Import the functions to be tested
+from scripts.sql_intergration.connection import close_pool, postgres_connection, with_postgres_connection
+
+
+def make_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    return conn
+
+
+class TestConnection(unittest.TestCase):
+
+    def tearDown(self):
+        close_pool()
+
+    @patch("psycopg2.connect")
+    def test_connection_is_reused(self, mock_connect):
+        mock_connect.side_effect = lambda *args, **kwargs: make_connection()
+
+        @with_postgres_connection
+        def query(conn, value):
+            return conn, value
+
+        first, _ = query(1)
+        second, value = query(2)
+
+        self.assertIs(first, second)
+        self.assertEqual(value, 2)
+        self.assertEqual(mock_connect.call_count, 1)
+        first.close.assert_not_called()
+
+    @patch("psycopg2.connect")
+    def test_unhealthy_connection_is_replaced(self, mock_connect):
+        dead = make_connection()
+        dead.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("gone")
+        fresh = make_connection()
+        mock_connect.side_effect = [dead, fresh]
+
+        with postgres_connection() as conn:
+            self.assertIs(conn, fresh)
+        dead.close.assert_called_once()
+
+    @patch("psycopg2.connect")
+    def test_broken_connection_is_discarded(self, mock_connect):
+        mock_connect.side_effect = lambda *args, **kwargs: make_connection()
+
+        with self.assertRaises(psycopg2.OperationalError):
+            with postgres_connection() as conn:
+                raise psycopg2.OperationalError("server closed the connection")
+        conn.close.assert_called_once()
+
+        with postgres_connection() as other:
+            self.assertIsNot(other, conn)
+
+    @patch("psycopg2.connect")
+    def test_uncommitted_work_is_rolled_back(self, mock_connect):
+        mock_connect.side_effect = lambda *args, **kwargs: make_connection()
+
+        with self.assertRaises(ValueError):
+            with postgres_connection() as conn:
+                raise ValueError("bad row")
+        conn.rollback.assert_called()
+        conn.close.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import pandas as pd
+
+# Import the classes to be tested
+from scripts.dag import Pipeline, Stage
+
+calls = []
+
+def load(path):
+    calls.append('load')
+    return pd.read_csv(path)
+
+def double(df):
+    calls.append('double')
+    df['value'] = df['value'] * 2
+    return df
+
+def other():
+    calls.append('other')
+    return pd.DataFrame({'value': [10]})
+
+def combine(doubled, other):
+    calls.append('combine')
+    return pd.concat([doubled, other], ignore_index=True)
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.patcher = patch('config.config.Config.CACHE_DIR', os.path.join(self.tmp_dir, 'cache'))
+        self.patcher.start()
+        self.path = os.path.join(self.tmp_dir, 'input.csv')
+        pd.DataFrame({'value': [1, 2]}).to_csv(self.path, index=False)
+        calls.clear()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def build(self):
+        return Pipeline([
+            Stage('raw', lambda: load(self.path), files=[self.path]),
+            Stage('doubled', double, inputs=['raw']),
+            Stage('other', other),
+            Stage('combined', combine, inputs=['doubled', 'other']),
+        ])
+
+    def test_run_and_reuse(self):
+        result = self.build().run(['combined'])['combined']
+        self.assertEqual(result['value'].tolist(), [2, 4, 10])
+        self.assertEqual(sorted(calls), ['combine', 'double', 'load', 'other'])
+
+        calls.clear()
+        result = self.build().run(['combined'])['combined']
+        self.assertEqual(result['value'].tolist(), [2, 4, 10])
+        self.assertEqual(calls, [])
+
+    def test_only_changed_branch_reruns(self):
+        self.build().run(['combined'])
+        calls.clear()
+        pd.DataFrame({'value': [3]}).to_csv(self.path, index=False)
+        os.utime(self.path, ns=(0, 1))
+        result = self.build().run(['combined'])['combined']
+        self.assertEqual(result['value'].tolist(), [6, 10])
+        self.assertEqual(sorted(calls), ['combine', 'double', 'load'])
+
+    def test_only_declared_settings_invalidate(self):
+        def build():
+            return Pipeline([
+                Stage('raw', lambda: load(self.path), files=[self.path], config=['GRID_CELL_SIZE']),
+                Stage('doubled', double, inputs=['raw'], config=[]),
+            ])
+        build().run(['doubled'])
+        calls.clear()
+        with patch('config.config.Config.SERVING_PORT', 9999):
+            build().run(['doubled'])
+        self.assertEqual(calls, [])
+        with patch('config.config.Config.GRID_CELL_SIZE', 0.01):
+            build().run(['doubled'])
+        self.assertEqual(calls, ['load', 'double'])
+        # The outputs cached under the old keys were replaced
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp_dir, 'cache'))), 2)
+        with self.assertRaises(ValueError):
+            Pipeline([Stage('raw', other, config=['NO_SUCH_SETTING'])]).run(['raw'])
+
+    def test_shared_inputs_are_copied(self):
+        result = self.build().run(['raw', 'doubled'])
+        self.assertEqual(result['raw']['value'].tolist(), [1, 2])
+        self.assertEqual(result['doubled']['value'].tolist(), [2, 4])
+
+    def test_values_replace_stages(self):
+        result = self.build().run(['combined'], values={'raw': pd.DataFrame({'value': [5]})})['combined']
+        self.assertEqual(result['value'].tolist(), [10, 10])
+        self.assertNotIn('load', calls)
+
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        pipeline = Pipeline([
+            Stage('a', lambda: barrier.wait(), cache=False),
+            Stage('b', lambda: barrier.wait(), cache=False),
+        ])
+        self.assertEqual(set(pipeline.run(max_workers=2)), {'a', 'b'})
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Pipeline([Stage('a', other), Stage('b', other, outputs=['a'])])
+        cyclic = Pipeline([Stage('a', double, inputs=['b']), Stage('b', double, inputs=['a'])])
+        with self.assertRaises(ValueError):
+            cyclic.run(['a'])
+        with self.assertRaises(ValueError):
+            self.build().run(['missing'])
+
+    def test_failing_stage_is_logged(self):
+        def fail():
+            raise KeyError('boom')
+        pipeline = Pipeline([Stage('slow', other), Stage('broken', fail), Stage('after', double, inputs=['slow'])])
+        with patch('scripts.dag.logging.error') as mock_error, self.assertRaises(KeyError):
+            pipeline.run(['after', 'broken'], max_workers=1)
+        self.assertIn('stage broken', mock_error.call_args[0][0])
+        # A failure outside any stage is not blamed on the last stage scheduled
+        with patch('scripts.dag.wait', side_effect=RuntimeError('scheduler')), \
+                patch('scripts.dag.logging.error') as mock_error, self.assertRaises(RuntimeError):
+            Pipeline([Stage('raw', other, cache=False)]).run(['raw'])
+        self.assertEqual(mock_error.call_args[0][0], 'Pipeline failed: scheduler')
+
+if __name__ == '__main__':
+    unittest.main()
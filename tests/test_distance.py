@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from geopy.distance import geodesic
+from haversine import haversine
+
+# Import the functions to be tested
+from scripts.distance import haversine_distance, geodesic_distance, compute_distance, compute_distance_scalar
+
+
+class TestDistance(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        # Lagos-area pings plus a handful of long-range pairs
+        self.lat1 = np.concatenate([rng.uniform(6.4, 6.7, 200), rng.uniform(-80, 80, 50)])
+        self.lng1 = np.concatenate([rng.uniform(3.2, 3.6, 200), rng.uniform(-180, 180, 50)])
+        self.lat2 = np.concatenate([rng.uniform(6.4, 6.7, 200), rng.uniform(-80, 80, 50)])
+        self.lng2 = np.concatenate([rng.uniform(3.2, 3.6, 200), rng.uniform(-180, 180, 50)])
+
+    def test_haversine_matches_haversine_package(self):
+        result = haversine_distance(self.lat1, self.lng1, self.lat2, self.lng2)
+        expected = [haversine((a, b), (c, d)) for a, b, c, d in zip(self.lat1, self.lng1, self.lat2, self.lng2)]
+        np.testing.assert_allclose(result, expected, rtol=1e-9)
+
+    def test_geodesic_matches_geopy(self):
+        result = geodesic_distance(self.lat1, self.lng1, self.lat2, self.lng2)
+        expected = [geodesic((a, b), (c, d)).kilometers for a, b, c, d in zip(self.lat1, self.lng1, self.lat2, self.lng2)]
+        np.testing.assert_allclose(result, expected, atol=1e-6)
+
+    def test_geodesic_edge_cases(self):
+        self.assertEqual(geodesic_distance(6.5, 3.3, 6.5, 3.3), 0)
+        self.assertAlmostEqual(float(geodesic_distance(0, 0, 0.5, 179.7)), geodesic((0, 0), (0.5, 179.7)).kilometers, places=6)
+        self.assertTrue(np.isnan(geodesic_distance([np.nan], [0], [1], [1])[0]))
+
+    def test_compute_distance_modes(self):
+        np.testing.assert_array_equal(compute_distance(self.lat1, self.lng1, self.lat2, self.lng2, mode='haversine'),
+                                      haversine_distance(self.lat1, self.lng1, self.lat2, self.lng2))
+        with self.assertRaises(ValueError):
+            compute_distance(0, 0, 1, 1, mode='manhattan')
+
+    def test_scalar_matches_batched(self):
+        for mode in ['haversine', 'geodesic']:
+            expected = compute_distance(self.lat1, self.lng1, self.lat2, self.lng2, mode=mode)
+            result = [compute_distance_scalar(a, b, c, d, mode=mode) for a, b, c, d in zip(self.lat1, self.lng1, self.lat2, self.lng2)]
+            np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-7)
+        self.assertEqual(compute_distance_scalar(6.5, 3.3, 6.5, 3.3), 0)
+        self.assertTrue(np.isnan(compute_distance_scalar(np.nan, 0, 1, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,16 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
 # Import the functions to be tested
 from scripts.feat_eng import (
-    preprocess_datetime, extract_day_of_week, categorize_time_of_day, extract_hour_and_time_of_day,
-    create_is_holiday_feature, preprocess_trip_times, split_origin_destination,
+    parse_datetime_column, parse_timestamps, preprocess_datetime, extract_day_of_week, categorize_time_of_day, extract_hour_and_time_of_day,
+    create_is_holiday_feature, preprocess_trip_times, split_origin_destination, assign_grid_cells,
     extract_additional_time_features, calculate_trip_duration, merge_and_calculate_distances,
-    scale_features
+    merge_partitioned, join_on_trip_id, create_driver_history_features,
+    create_origin_destination_features, od_pair_keys, scale_features
 )
 
 
@@ -32,6 +34,27 @@ class TestFeatEng(unittest.TestCase):
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_result['Trip Start Time']))
         mock_logging_info.assert_called_once()
 
+    def test_parse_datetime_column(self):
+        values = pd.Series(['2021-07-01 07:28:04', None, '2021-07-01 07:28:04'], name='Trip Start Time')
+        result = parse_datetime_column(values)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result))
+        self.assertEqual(result[0], pd.Timestamp('2021-07-01 07:28:04'))
+        self.assertTrue(pd.isna(result[1]))
+        self.assertIs(parse_datetime_column(result), result)
+
+    def test_parse_datetime_column_mixed_formats(self):
+        values = pd.Series(['2021-07-01 07:28:04', '7/2/2021 08:00'], name='Trip Start Time')
+        result = parse_datetime_column(values)
+        self.assertEqual(result[1], pd.Timestamp('2021-07-02 08:00:00'))
+
+    @patch('scripts.feat_eng.pd.to_datetime', wraps=pd.to_datetime)
+    def test_parse_timestamps_parses_once(self, mock_to_datetime):
+        df_result = parse_timestamps(self.df.copy())
+        self.assertEqual(mock_to_datetime.call_count, 2)
+        df_result = preprocess_trip_times(preprocess_datetime(df_result))
+        self.assertEqual(mock_to_datetime.call_count, 2)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_result['Trip End Time']))
+
     @patch('scripts.feat_eng.logging.info')
     def test_extract_day_of_week(self, mock_logging_info):
         df_processed = preprocess_datetime(self.df.copy())
@@ -56,6 +79,24 @@ class TestFeatEng(unittest.TestCase):
         self.assertEqual(df_result['Time of Day'][0], 'Morning')
         mock_logging_info.assert_called_once()
 
+    def test_time_of_day_is_categorical(self):
+        df = pd.DataFrame({'Trip Start Time': pd.to_datetime(['2021-01-01 04:59:00', '2021-01-01 05:00:00', None, '2021-01-01 21:00:00'])})
+        df_result = extract_hour_and_time_of_day(extract_day_of_week(df))
+        self.assertIsInstance(df_result['Time of Day'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(df_result['Day of Week'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df_result['Time of Day'].tolist()[:2], ['Night', 'Morning'])
+        self.assertTrue(pd.isna(df_result['Time of Day'][2]))
+        self.assertEqual(df_result['Hour'].dtype, 'Int8')
+        self.assertEqual(df_result['Day of Week'][0], 'Friday')
+
+    def test_time_of_day_edges_from_config(self):
+        df = pd.DataFrame({'Trip Start Time': pd.to_datetime(['2021-01-01 06:00:00', '2021-01-01 19:00:00'])})
+        with patch('scripts.feat_eng.Config.TIME_OF_DAY_EDGES', [7, 18]), patch('scripts.feat_eng.Config.TIME_OF_DAY_LABELS', ['Day', 'Night']):
+            df_result = extract_hour_and_time_of_day(df)
+            self.assertEqual(df_result['Time of Day'].tolist(), ['Night', 'Night'])
+            self.assertEqual(categorize_time_of_day(12), 'Day')
+        self.assertEqual(df_result['Hour'].dtype, 'int8')
+
     @patch('scripts.feat_eng.logging.info')
     def test_create_is_holiday_feature(self, mock_logging_info):
         with patch('scripts.feat_eng.Config.HOLIDAYS_2021', ['2021-01-01']), patch('scripts.feat_eng.Config.HOLIDAYS_2022', []):
@@ -83,6 +124,26 @@ class TestFeatEng(unittest.TestCase):
         self.assertEqual(df_result['Destination Lat'][0], 2.0)
         mock_logging_info.assert_called_once()
 
+    def test_split_origin_destination_categories(self):
+        df = pd.DataFrame({
+            'Trip Origin': pd.Series(['6.5,3.25', None, '6.5,3.25'], dtype='category'),
+            'Trip Destination': pd.Series(['6.75,3.5', '6.5,3.25', None], dtype='category')
+        })
+        df_result = split_origin_destination(df)
+        np.testing.assert_array_equal(df_result['Origin Lat'], [6.5, np.nan, 6.5])
+        np.testing.assert_array_equal(df_result['Destination Lng'], [3.5, 3.25, np.nan])
+        self.assertEqual(df_result['Origin Lng'].dtype, np.float32)
+
+    def test_assign_grid_cells(self):
+        df_processed = split_origin_destination(self.df.copy())
+        df_result = assign_grid_cells(df_processed, cell_size=0.5)
+        self.assertIn('Ping Cell', df_result.columns)
+        self.assertIn('Origin Cell', df_result.columns)
+        self.assertIn('Destination Cell', df_result.columns)
+        self.assertEqual(df_result['Ping Cell'][0], df_result['Origin Cell'][0])
+        self.assertNotEqual(df_result['Origin Cell'][0], df_result['Destination Cell'][0])
+        self.assertTrue(pd.api.types.is_integer_dtype(df_result['Origin Cell']))
+
     @patch('scripts.feat_eng.logging.info')
     def test_extract_additional_time_features(self, mock_logging_info):
         df_processed = preprocess_trip_times(self.df.copy())
@@ -112,6 +173,98 @@ class TestFeatEng(unittest.TestCase):
         self.assertAlmostEqual(df_result['Trip Distance'][0], 314.40, places=2)  # Geodesic distance from (0,0) to (2,2)
         mock_logging_info.assert_called_once()
 
+    def test_merge_does_not_rename_callers_frame(self):
+        df1 = pd.DataFrame({'order_id': [1, 2], 'lat': [0, 1], 'lng': [0, 1]})
+        df2 = pd.DataFrame({'Trip ID': [2, 1], 'Origin Lat': [0.0, 0.0], 'Origin Lng': [0.0, 0.0],
+                            'Destination Lat': [1.0, 1.0], 'Destination Lng': [1.0, 1.0]})
+        df_result = merge_and_calculate_distances(df1, df2)
+        self.assertEqual(df_result['Trip ID'].tolist(), [1, 2])
+        self.assertIn('order_id', df1.columns)
+
+    def test_join_on_trip_id_matches_merge(self):
+        rng = np.random.default_rng(0)
+        df1 = pd.DataFrame({'Trip ID': rng.integers(-5, 60, 500), 'value': rng.uniform(size=500)})
+        cases = [
+            pd.DataFrame({'Trip ID': rng.permutation(50), 'other': np.arange(50)}),                 # unique, dense index
+            pd.DataFrame({'Trip ID': rng.integers(0, 50, 80), 'other': np.arange(80)}),             # duplicate keys
+            pd.DataFrame({'Trip ID': rng.permutation(50) * 1000, 'other': np.arange(50)}),          # sparse keys
+            pd.DataFrame({'Trip ID': np.r_[rng.permutation(50), np.nan], 'other': np.arange(51)}),  # float keys
+            pd.DataFrame({'Trip ID': rng.permutation(50), 'value': np.arange(50)}),                 # overlapping columns
+        ]
+        for df2 in cases:
+            pd.testing.assert_frame_equal(join_on_trip_id(df1, df2), pd.merge(df1, df2, on='Trip ID'))
+        df1.loc[0, 'Trip ID'] = 3
+        df1['Trip ID'] = df1['Trip ID'].astype(float)
+        df1.loc[1, 'Trip ID'] = np.nan
+        pd.testing.assert_frame_equal(join_on_trip_id(df1, cases[3]), pd.merge(df1, cases[3], on='Trip ID'))
+
+    def test_merge_partitioned_matches_single_merge(self):
+        rng = np.random.default_rng(0)
+        df1 = pd.DataFrame({'Trip ID': rng.integers(0, 40, 300), 'lat': rng.uniform(6, 7, 300), 'lng': rng.uniform(3, 4, 300)})
+        df2 = pd.DataFrame({
+            'Trip ID': np.r_[np.arange(30), [5, 7]].astype(float),
+            'Origin Lat': rng.uniform(6, 7, 32), 'Origin Lng': rng.uniform(3, 4, 32),
+            'Destination Lat': rng.uniform(6, 7, 32), 'Destination Lng': rng.uniform(3, 4, 32)
+        })
+        expected = merge_and_calculate_distances(df1.copy(), df2.copy())
+        df_result = merge_partitioned(df1, df2, workers=2, partition_rows=50)
+        pd.testing.assert_frame_equal(df_result, expected)
+
+    def test_create_driver_history_features_matches_groupby_apply(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        start = pd.Timestamp('2021-07-01') + pd.to_timedelta(rng.integers(0, 30 * 86400, n), unit='s')
+        df = pd.DataFrame({
+            'driver_id': rng.integers(0, 15, n),
+            'driver_action': rng.choice(['accepted', 'rejected'], n),
+            'Trip Start Time': start,
+            'Trip End Time': start + pd.to_timedelta(rng.integers(600, 3600, n), unit='s'),
+            'Trip Distance': rng.uniform(1, 20, n),
+            'Trip Duration': rng.uniform(10, 60, n),
+        }, index=rng.permutation(n))
+        df_result = create_driver_history_features(df.copy())
+
+        # Reference in the style of the notebook: per-group callbacks merged back onto the table
+        expected = df.sort_values(['driver_id', 'Trip Start Time'], kind='stable')
+        previous_end = expected.groupby('driver_id')['Trip End Time'].shift(1)
+        expected['Time_Since_Last_Trip'] = (expected['Trip Start Time'] - previous_end).dt.total_seconds() / 3600
+        expected['Previous_Trip_End_Month'] = previous_end.dt.month
+        expected = expected.reindex(df.index)
+        acceptance = df.groupby('driver_id')['driver_action'].apply(lambda x: (x == 'accepted').mean())
+        experience = df.groupby('driver_id').size()
+        avg_speed = df.groupby('driver_id').apply(lambda x: (x['Trip Distance'] / (x['Trip Duration'] / 60)).mean())
+
+        self.assertEqual(df_result.index.tolist(), df.index.tolist())
+        np.testing.assert_allclose(df_result['Time_Since_Last_Trip'], expected['Time_Since_Last_Trip'])
+        np.testing.assert_allclose(df_result['Acceptance_Rate'], df['driver_id'].map(acceptance))
+        np.testing.assert_array_equal(df_result['Driver_Experience'], df['driver_id'].map(experience))
+        np.testing.assert_allclose(df_result['Avg_Trip_Duration'], df.groupby('driver_id')['Trip Duration'].transform('mean'))
+        np.testing.assert_allclose(df_result['Avg_Speed'], df['driver_id'].map(avg_speed))
+        np.testing.assert_array_equal(df_result['Previous_Trip_End_Month'].astype('Float64').fillna(0),
+                                      expected['Previous_Trip_End_Month'].fillna(0))
+
+    def test_create_origin_destination_features_matches_string_pairs(self):
+        rng = np.random.default_rng(0)
+        points = ['6.4512,3.3912', '6.6012,3.3512', '6.4312,3.4212', '6.5112,3.3712']
+        df = pd.DataFrame({'Trip Origin': rng.choice(points, 300), 'Trip Destination': rng.choice(points, 300)})
+        df = split_origin_destination(df)
+        df.loc[0, 'Origin Lat'] = np.nan
+        df_result = create_origin_destination_features(df.copy())
+
+        # Reference in the style of the notebook: string concatenation, value_counts and LabelEncoder order
+        pairs = (df['Trip Origin'] + ' to ' + df['Trip Destination'])[1:]
+        np.testing.assert_array_equal(df_result['Origin-Destination_Count'][1:], pairs.map(pairs.value_counts()))
+        self.assertEqual(df_result['Origin-Destination_Encoded'][1:].nunique(), pairs.nunique())
+        np.testing.assert_array_equal(df_result['Origin-Destination_Encoded'][1:],
+                                      df_result['Origin-Destination Key'][1:].rank(method='dense').astype(int) - 1)
+        self.assertEqual(df_result.loc[0, ['Origin-Destination Key', 'Origin-Destination_Count', 'Origin-Destination_Encoded']].tolist(),
+                         [-1, 0, -1])
+
+    def test_od_pair_keys_rejects_fine_grid(self):
+        self.assertEqual(od_pair_keys([1, -1], [2, 3], cell_size=1.0).tolist(), [1 * 180 * 360 + 2, -1])
+        with self.assertRaises(ValueError):
+            od_pair_keys([1], [2], cell_size=0.001)
+
     @patch('scripts.feat_eng.logging.info')
     @patch('scripts.feat_eng.StandardScaler')
     def test_scale_features(self, mock_standard_scaler, mock_logging_info):
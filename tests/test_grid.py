@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+
+# Import the functions to be tested
+from scripts.grid import lat_lng_to_cell, lat_lng_to_cell_scalar, cell_to_lat_lng, rings_for_radius, neighbor_cells, MISSING_CELL
+from scripts.distance import haversine_distance
+
+
+class TestGrid(unittest.TestCase):
+
+    def test_cell_round_trip(self):
+        cells = lat_lng_to_cell([6.5234, -33.9], [3.3791, 151.2], cell_size=0.01)
+        lat, lng = cell_to_lat_lng(cells, cell_size=0.01)
+        np.testing.assert_allclose(lat, [6.525, -33.895], atol=1e-9)
+        np.testing.assert_allclose(lng, [3.375, 151.205], atol=1e-9)
+
+    def test_missing_coordinates(self):
+        cells = lat_lng_to_cell([np.nan, 6.5], [3.3, 3.3], cell_size=0.01)
+        self.assertEqual(cells[0], MISSING_CELL)
+        self.assertGreaterEqual(cells[1], 0)
+
+    def test_scalar_matches_batched(self):
+        lat, lng = [6.5234, -33.9, 90.0, -90.0, 6.5], [3.3791, 151.2, 180.0, -180.0, np.nan]
+        expected = lat_lng_to_cell(lat, lng, cell_size=0.01)
+        self.assertEqual([lat_lng_to_cell_scalar(a, b, cell_size=0.01) for a, b in zip(lat, lng)], expected.tolist())
+
+    def test_neighbor_cells(self):
+        cell = lat_lng_to_cell(6.5, 3.3, cell_size=0.01)
+        neighbors = neighbor_cells(cell, rings=1, cell_size=0.01)
+        self.assertEqual(neighbors.shape, (1, 9))
+        self.assertIn(cell, neighbors[0])
+        self.assertIn(lat_lng_to_cell(6.51, 3.29, cell_size=0.01), neighbors[0])
+
+        # Columns wrap around the antimeridian
+        east = lat_lng_to_cell(0.0, 179.995, cell_size=0.01)
+        self.assertIn(lat_lng_to_cell(0.0, -179.995, cell_size=0.01), neighbor_cells(east, cell_size=0.01)[0])
+
+    def test_radius_covered_by_rings(self):
+        rng = np.random.default_rng(3)
+        lat, lng = rng.uniform(6.4, 6.7, 2000), rng.uniform(3.2, 3.6, 2000)
+        cells = lat_lng_to_cell(lat, lng, cell_size=0.005)
+        rings = rings_for_radius(1.0, cell_size=0.005, max_abs_lat=6.7)
+        candidates = set(neighbor_cells(cells[0], rings=rings, cell_size=0.005)[0])
+        within = haversine_distance(lat[0], lng[0], lat, lng) <= 1.0
+        self.assertTrue(set(cells[within]) <= candidates)
+
+
+if __name__ == "__main__":
+    unittest.main()
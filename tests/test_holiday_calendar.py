@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# Import the module to be tested
+from scripts.holiday_calendar import HolidayCalendar, load_holiday_files, get_holiday_calendar
+
+class TestHolidayCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = HolidayCalendar(['2021-01-01', '2021-01-10', '2021-01-01'])
+        self.times = pd.Series(pd.to_datetime(['2020-12-30 08:00', '2021-01-01 23:59', '2021-01-05 12:00', '2021-01-11 00:00', None]))
+
+    def test_is_holiday(self):
+        np.testing.assert_array_equal(self.calendar.is_holiday(self.times), [False, True, False, False, False])
+        self.assertEqual(len(self.calendar), 2)
+
+    def test_holiday_distances(self):
+        np.testing.assert_array_equal(self.calendar.days_to_next_holiday(self.times), [2, 0, 5, np.nan, np.nan])
+        np.testing.assert_array_equal(self.calendar.days_since_previous_holiday(self.times), [np.nan, 0, 4, 1, np.nan])
+
+    def test_empty_calendar(self):
+        calendar = HolidayCalendar([])
+        self.assertFalse(calendar.is_holiday(self.times).any())
+        self.assertTrue(np.isnan(calendar.days_to_next_holiday(self.times)).all())
+
+    def test_load_holiday_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'holidays.csv')
+            pd.DataFrame({'date': ['2023-01-01', '2023-07-04'], 'country': ['NG', 'US']}).to_csv(path, index=False)
+            self.assertEqual(load_holiday_files([path], ['NG']), ['2023-01-01'])
+            self.assertEqual(load_holiday_files([path]), ['2023-01-01', '2023-07-04'])
+
+    @patch('scripts.holiday_calendar.Config')
+    def test_get_holiday_calendar_is_cached_per_config(self, mock_config):
+        mock_config.HOLIDAYS_2021 = ['2021-01-01']
+        mock_config.HOLIDAYS_2022 = []
+        mock_config.HOLIDAY_FILES = []
+        mock_config.HOLIDAY_COUNTRIES = None
+        calendar = get_holiday_calendar()
+        self.assertIs(get_holiday_calendar(), calendar)
+        mock_config.HOLIDAYS_2022 = ['2022-01-01']
+        self.assertEqual(len(get_holiday_calendar()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# Import the functions to be tested
+from scripts.models.incremental import hash_split, iter_split_chunks, train_incremental
+from scripts.models.persistence import load_model
+from scripts.models.preprocessing import FEATURE_COLUMNS
+from scripts.config import Config
+
+
+class TestIncrementalTraining(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 3000
+        self.df = pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+        self.df['Trip_ID'] = rng.integers(0, 600, n)
+        self.df.loc[::17, 'Avg_Speed'] = np.nan
+        self.df['driver_action'] = np.where(self.df['Hour'] + self.df['Driver_Experience'] > 0, 'accepted', 'rejected')
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'df_merged.csv')
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hash_split_is_deterministic_by_key(self):
+        keys = pd.Series([1, 2, 3, 4, 1, 2] * 500)
+        test = hash_split(keys)
+        np.testing.assert_array_equal(test, hash_split(keys.astype('Int64').astype(float)))
+        np.testing.assert_array_equal(test[:6], test[6:12])
+        self.assertAlmostEqual(hash_split(pd.Series(np.arange(100_000))).mean(), 0.2, delta=0.01)
+
+    def test_split_does_not_depend_on_chunks(self):
+        masks = [np.concatenate([test for _, _, test in iter_split_chunks(self.path, chunk_size)]) for chunk_size in (250, 5000)]
+        np.testing.assert_array_equal(masks[0], masks[1])
+        test_trips = set(self.df['Trip_ID'][masks[0]])
+        self.assertFalse(test_trips & set(self.df['Trip_ID'][~masks[0]]))
+
+    def test_train_incremental(self):
+        model_path = os.path.join(self.tmp_dir.name, 'model')
+        with patch.object(Config, 'MODEL_PATH', model_path):
+            model = train_incremental(self.path, chunk_size=400, epochs=3)
+        test = hash_split(self.df['Trip_ID'])
+        expected = (self.df['driver_action'] == 'rejected').astype(int)[test]
+        self.assertGreater((model.predict(self.df[FEATURE_COLUMNS][test]) == expected).mean(), 0.9)
+        np.testing.assert_array_equal(model.classes_, [0, 1])
+        self.assertTrue(np.isfinite(model.predict_proba(self.df[FEATURE_COLUMNS])).all())
+        # The scaler only saw training rows
+        self.assertEqual(model['scale'].n_samples_seen_[0], (~test).sum())
+        np.testing.assert_allclose(load_model(model_path).predict_proba(self.df[FEATURE_COLUMNS]),
+                                   model.predict_proba(self.df[FEATURE_COLUMNS]))
+
+
+if __name__ == '__main__':
+    unittest.main()
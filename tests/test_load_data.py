@@ -1,38 +1,60 @@
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
+import os
+import tempfile
 import pandas as pd
 from io import StringIO
 
 # Import the functions to be tested
-from scripts.sql_intergration.load_data import load_csv_to_db, main
+from scripts.sql_intergration.load_data import load_csv_to_db, load_tables, read_csv_columns, main
+from scripts.sql_intergration.connection import close_pool
 
 
 class TestLoadData(unittest.TestCase):
 
-    @patch("scripts.sql_intergration.load_data.pd.read_csv")
-    @patch("scripts.sql_intergration.load_data.psycopg2.connect")
-    def test_load_csv_to_db(self, mock_connect, mock_read_csv):
-        # Mock the DataFrame returned by pd.read_csv
-        mock_df = pd.DataFrame({
-            "column1": [1, 2],
-            "column2": ["a", "b"]
-        })
-        mock_read_csv.return_value = mock_df
-
-        # Mock the connection and cursor
+    def tearDown(self):
+        close_pool()
+
+    @patch("psycopg2.connect")
+    def test_load_csv_to_db(self, mock_connect):
+        # Write a small CSV file to copy
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("Trip ID,Trip Origin\n1,\"6.5,3.3\"\n2,\"6.6,3.4\"\n")
+        self.addCleanup(os.remove, f.name)
+
+        # Mock the connection and cursor, reading what COPY would receive
         mock_conn = mock_connect.return_value
-        mock_cursor = mock_conn.cursor.return_value
+        mock_conn.closed = 0
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        copied = []
+        mock_cursor.copy_expert.side_effect = lambda query, reader, size: copied.append(reader.read())
+        mock_cursor.rowcount = 2
 
         # Call the function
-        load_csv_to_db("dummy_conn", "dummy.csv", "dummy_table")
+        rows = load_csv_to_db(f.name, "dummy_table")
 
         # Assertions
-        mock_read_csv.assert_called_once_with("dummy.csv")
+        self.assertEqual(rows, 2)
         mock_connect.assert_called_once()
-        mock_conn.cursor.assert_called_once()
-        mock_cursor.executemany.assert_called_once()
+        mock_cursor.copy_expert.assert_called_once()
+        mock_cursor.executemany.assert_not_called()
+        self.assertEqual(copied, [b"Trip ID,Trip Origin\n1,\"6.5,3.3\"\n2,\"6.6,3.4\"\n"])
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        # The connection goes back to the pool instead of being closed
+        mock_conn.close.assert_not_called()
+
+    def test_read_csv_columns(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("Trip ID,Trip Start Time,lat\n")
+        self.addCleanup(os.remove, f.name)
+        self.assertEqual(read_csv_columns(f.name), ["trip_id", "trip_start_time", "lat"])
+
+    @patch("scripts.sql_intergration.load_data.load_csv_to_db")
+    def test_load_tables_concurrently(self, mock_load_csv_to_db):
+        mock_load_csv_to_db.side_effect = lambda csv_file, table_name: len(table_name)
+        rows = load_tables([("a.csv", "t1"), ("b.csv", "table_2")], concurrent=True)
+        self.assertEqual(rows, [2, 7])
+        self.assertEqual(mock_load_csv_to_db.call_count, 2)
 
     @patch("scripts.sql_intergration.load_data.load_csv_to_db")
     def test_main(self, mock_load_csv_to_db):
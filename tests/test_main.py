@@ -3,7 +3,7 @@ import logging
 import os
 from unittest.mock import patch, MagicMock
 import pandas as pd
-from scripts.main import execute_sql_script, load_csv_to_db, process_dataset, main, setup_logging
+from scripts.main import execute_sql_script, load_tables, process_dataset, main, setup_logging
 
 class TestMainFunctions(unittest.TestCase):
 
@@ -29,20 +29,16 @@ class TestMainFunctions(unittest.TestCase):
             mock_cursor.execute.assert_called_once()
             mock_conn.commit.assert_called_once()
 
-    def test_load_csv_to_db(self):
-        # Mocking the CSV loading into database
-        csv_file = 'test.csv'
-        table_name = 'test_table'
-        test_data = pd.DataFrame({'col1': [1, 2], 'col2': ['a', 'b']})
+    def test_load_tables(self):
+        # Mocking the COPY of each CSV file into its table
+        tables = [('df1.csv', 'df1'), ('df2.csv', 'df2')]
 
-        with patch('psycopg2.connect') as mock_connect:
-            mock_conn = mock_connect.return_value
-            mock_cursor = mock_conn.cursor.return_value
+        with patch('scripts.sql_intergration.load_data.load_csv_to_db', side_effect=[3, 5]) as mock_load_csv_to_db:
+            row_counts = load_tables(tables, concurrent=False)
 
-            load_csv_to_db(mock_conn, csv_file, table_name)
-            
-            mock_cursor.executemany.assert_called_once()
-            mock_conn.commit.assert_called_once()
+            self.assertEqual(row_counts, [3, 5])
+            mock_load_csv_to_db.assert_any_call('df1.csv', 'df1')
+            mock_load_csv_to_db.assert_any_call('df2.csv', 'df2')
 
     def test_process_dataset(self):
         # Test the dataset processing function
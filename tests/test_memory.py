@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Import the functions to be tested
+from memory import (
+    MemoryBudgetExceeded, check_memory_budget, downcast_ids, estimate_csv_memory, fits_memory_budget,
+    memory_usage, read_csv_planned
+)
+from dag import Pipeline, Stage
+
+
+class TestMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'pings.csv')
+        rng = np.random.default_rng(0)
+        pd.DataFrame({
+            'id': np.arange(5000),
+            'order_id': rng.integers(0, 300, 5000),
+            'driver_action': rng.choice(['accepted', 'rejected'], 5000),
+            'lat': rng.uniform(6, 7, 5000),
+            'lng': rng.uniform(3, 4, 5000)
+        }).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_read_csv_planned(self):
+        df = read_csv_planned(self.path)
+        self.assertEqual(df['driver_action'].dtype, 'category')
+        self.assertEqual(df['lat'].dtype, np.float32)
+        self.assertEqual(df['id'].dtype, np.int16)
+        self.assertEqual(df['order_id'].dtype, np.int16)
+        self.assertLess(memory_usage(df), memory_usage(pd.read_csv(self.path)) / 3)
+
+    def test_downcast_ids_keeps_missing_ids(self):
+        df = downcast_ids(pd.DataFrame({'order_id': [1.0, None], 'value': [1, 2]}))
+        self.assertEqual(df['order_id'].dtype, np.float64)
+        self.assertEqual(df['value'].dtype, np.int64)
+
+    def test_estimate_csv_memory(self):
+        estimate = estimate_csv_memory(self.path, sample_rows=500)
+        actual = memory_usage(read_csv_planned(self.path))
+        self.assertLess(abs(estimate - actual) / actual, 0.2)
+
+    def test_fits_memory_budget(self):
+        with patch('config.config.Config.MEMORY_BUDGET_MB', None):
+            self.assertTrue(fits_memory_budget([self.path]))
+        with patch('config.config.Config.MEMORY_BUDGET_MB', 0.01):
+            with patch('config.config.Config.MEMORY_BUDGET_ACTION', 'stream'):
+                self.assertFalse(fits_memory_budget([self.path]))
+            with patch('config.config.Config.MEMORY_BUDGET_ACTION', 'raise'):
+                with self.assertRaises(MemoryBudgetExceeded):
+                    fits_memory_budget([self.path])
+
+    def test_pipeline_reports_and_enforces_budget(self):
+        pipeline = Pipeline([Stage('pings', lambda: read_csv_planned(self.path), cache=False)])
+        pipeline.run()
+        self.assertGreater(pipeline.memory['pings'], 0)
+        with patch('config.config.Config.MEMORY_BUDGET_MB', 0.01):
+            with self.assertRaises(MemoryBudgetExceeded):
+                pipeline.run()
+            check_memory_budget('small', 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Import the functions to be tested
+from scripts.synthetic_data import generate_dataset
+from scripts.feat_eng import engineer_features, create_driver_history_features, create_origin_destination_features
+from scripts.online_features import ONLINE_FEATURE_COLUMNS, OnlineFeatures, TripRequest
+
+
+class TestOnlineFeatures(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pings, trips = generate_dataset(3000, seed=3)
+        # The float32 coordinates the dtype plan loads
+        pings[['lat', 'lng']] = pings[['lat', 'lng']].astype('float32')
+        batch = engineer_features(pings, trips)
+        batch = create_origin_destination_features(create_driver_history_features(batch))
+        cls.batch = batch
+        cls.online = OnlineFeatures.from_frame(batch)
+
+    def test_matches_batch_features(self):
+        # A driver's previous trip is ambiguous between rows with the same start time
+        rows = self.batch[~self.batch.duplicated(['driver_id', 'Trip Start Time'], keep=False)].head(300)
+        for _, row in rows.iterrows():
+            features = self.online.compute(TripRequest(
+                row['driver_id'], row['lat'], row['lng'], row['Origin Lat'], row['Origin Lng'],
+                row['Destination Lat'], row['Destination Lng'], row['Trip Start Time'], row['Trip End Time']))
+            self.assertEqual(list(features), ONLINE_FEATURE_COLUMNS)
+            for column in ONLINE_FEATURE_COLUMNS:
+                expected, value = row[column], features[column]
+                if pd.isna(expected):
+                    self.assertTrue(value is None or np.isnan(value), column)
+                elif isinstance(expected, str):
+                    self.assertEqual(value, expected, column)
+                else:
+                    self.assertAlmostEqual(value, expected, delta=1e-7 * max(1, abs(expected)), msg=column)
+
+    def test_scalars_and_unknown_driver(self):
+        row = self.batch.iloc[0]
+        start = row['Trip Start Time'].to_pydatetime()
+        from_datetime = self.online.features(-1, row['lat'], row['lng'], row['Origin Lat'], row['Origin Lng'],
+                                             row['Destination Lat'], row['Destination Lng'], start)
+        from_seconds = self.online.features(-1, row['lat'], row['lng'], row['Origin Lat'], row['Origin Lng'],
+                                            row['Destination Lat'], row['Destination Lng'],
+                                            (start - datetime(1970, 1, 1)).total_seconds())
+        self.assertEqual(from_datetime['Hour'], from_seconds['Hour'])
+        self.assertEqual(from_datetime['Driver_Experience'], 0)
+        self.assertTrue(np.isnan(from_datetime['Acceptance_Rate']))
+        self.assertTrue(np.isnan(from_datetime['Trip Duration']))
+        self.assertIsNone(from_datetime['Previous_Trip_End_Hour'])
+
+
+if __name__ == "__main__":
+    unittest.main()
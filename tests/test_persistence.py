@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Import the functions to be tested
+from scripts.models.persistence import MappedForest, save_model, load_model
+
+
+class TestPersistence(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = pd.DataFrame(rng.normal(size=(600, 6)), columns=[f"f{i}" for i in range(6)])
+        self.X.iloc[::11, 2] = np.nan
+        self.y = np.where(self.X['f0'] + rng.normal(scale=0.5, size=600) > 0, 'accepted', 'rejected')
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'models', 'acceptance_model')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_forest_round_trip_matches_sklearn(self):
+        for model in [RandomForestClassifier(n_estimators=20, random_state=0), ExtraTreesClassifier(n_estimators=5, max_depth=4, random_state=0)]:
+            model.fit(self.X, self.y)
+            loaded = load_model(save_model(model, self.path))
+            self.assertIsInstance(loaded, MappedForest)
+            self.assertIsInstance(loaded.children, np.memmap)
+            np.testing.assert_allclose(loaded.predict_proba(self.X), model.predict_proba(self.X), atol=1e-12)
+            np.testing.assert_array_equal(loaded.predict(self.X), model.predict(self.X))
+            np.testing.assert_array_equal(loaded.classes_, model.classes_)
+
+    def test_load_without_mmap(self):
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(self.X, self.y)
+        loaded = load_model(save_model(model, self.path), mmap=False)
+        self.assertNotIsInstance(loaded.children, np.memmap)
+        np.testing.assert_allclose(loaded.predict_proba(self.X.to_numpy()), model.predict_proba(self.X), atol=1e-12)
+
+    def test_other_estimators_fall_back_to_joblib(self):
+        model = LogisticRegression().fit(self.X.fillna(0), self.y)
+        loaded = load_model(save_model(model, self.path))
+        self.assertIsInstance(loaded, LogisticRegression)
+        np.testing.assert_allclose(loaded.predict_proba(self.X.fillna(0)), model.predict_proba(self.X.fillna(0)))
+
+    def test_save_replaces_previous_model(self):
+        # A model file in the pre-directory layout is replaced too
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as f:
+            f.write(b'old model')
+        save_model(RandomForestClassifier(n_estimators=2, random_state=0).fit(self.X, self.y), self.path)
+        loaded = load_model(save_model(RandomForestClassifier(n_estimators=3, random_state=1).fit(self.X, self.y), self.path))
+        self.assertEqual(len(loaded.roots), 3)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['acceptance_model'])
+
+    def test_wrong_feature_count(self):
+        model = RandomForestClassifier(n_estimators=2, random_state=0).fit(self.X, self.y)
+        with self.assertRaises(ValueError):
+            load_model(save_model(model, self.path)).predict_proba(np.zeros((1, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
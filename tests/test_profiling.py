@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pandas as pd
+
+# Import the functions to be tested
+from profiling import current_trace, profile_stage, start_trace, stop_trace, stage_timer, trace_metrics, write_trace
+
+
+@profile_stage
+def add_column(df):
+    df['b'] = df['a'] * 2
+    return df
+
+@profile_stage(name='pipeline')
+def pipeline(df):
+    return add_column(df).head(2)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        start_trace()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_profile_stage_records_rows_and_nesting(self):
+        pipeline(pd.DataFrame({'a': range(5)}))
+        stages = {record['stage']: record for record in current_trace()['stages']}
+        self.assertEqual((stages['add_column']['rows_in'], stages['add_column']['rows_out']), (5, 5))
+        self.assertEqual((stages['pipeline']['rows_in'], stages['pipeline']['rows_out']), (5, 2))
+        self.assertEqual((stages['pipeline']['depth'], stages['add_column']['depth']), (0, 1))
+        for field in ['wall_s', 'cpu_s', 'peak_rss_mb', 'rss_growth_mb', 'start_s']:
+            self.assertGreaterEqual(stages['pipeline'][field], 0)
+
+    def test_tracemalloc_peak_includes_nested_stages(self):
+        with patch('config.config.Config.PROFILE_TRACEMALLOC', True):
+            start_trace()
+            with stage_timer('outer'):
+                with stage_timer('inner'):
+                    block = np.ones(2_000_000)
+                    del block
+            tracemalloc.stop()
+        stages = {record['stage']: record for record in current_trace()['stages']}
+        self.assertGreater(stages['inner']['tracemalloc_peak_mb'], 15)
+        self.assertGreater(stages['outer']['tracemalloc_peak_mb'], 15)
+
+    def test_disabled(self):
+        with patch('config.config.Config.PROFILING_ENABLED', False):
+            add_column(pd.DataFrame({'a': [1]}))
+        self.assertEqual(current_trace()['stages'], [])
+
+    def test_nothing_recorded_without_trace(self):
+        add_column(pd.DataFrame({'a': [1]}))
+        trace = stop_trace()
+        self.assertEqual(len(trace['stages']), 1)
+        for _ in range(3):
+            add_column(pd.DataFrame({'a': [1]}))
+        self.assertEqual(current_trace(), {})
+        self.assertEqual(len(trace['stages']), 1)
+        with self.assertRaises(RuntimeError):
+            write_trace(os.path.join(self.tmp_dir, 'trace.json'))
+
+    def test_write_trace_and_mlflow(self):
+        add_column(pd.DataFrame({'a': [1]}))
+        add_column(pd.DataFrame({'a': [1, 2]}))
+        mlflow = MagicMock()
+        with patch('config.config.Config.PROFILE_MLFLOW', True), patch.dict(sys.modules, {'mlflow': mlflow}):
+            path = write_trace(os.path.join(self.tmp_dir, 'trace.json'))
+        with open(path) as f:
+            trace = json.load(f)
+        self.assertEqual([record['rows_out'] for record in trace['stages']], [1, 2])
+        self.assertNotIn('_start', trace)
+        mlflow.log_metric.assert_any_call('add_column.rows_out', 2, step=1)
+        self.assertEqual(mlflow.log_metric.call_count, len(trace_metrics(trace)))
+        # Writing ends the trace
+        self.assertEqual(current_trace(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+# Import the functions to be tested
+from scripts.feat_eng import FEATURES_TO_SCALE
+from scripts.scaling import (
+    merge_scalers, fit_scaler, scaler_to_frame, scaler_from_frame, save_scaler, load_scaler, transform_batch
+)
+
+
+class TestScaling(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(rng.normal(5, 3, (1000, len(FEATURES_TO_SCALE))), columns=FEATURES_TO_SCALE)
+        self.df['Trip Duration'] = 12.0  # constant column
+        self.df.loc[::7, 'Trip Distance'] = np.nan
+
+    def assert_same_scaler(self, scaler, expected):
+        np.testing.assert_allclose(scaler.mean_, expected.mean_)
+        np.testing.assert_allclose(scaler.var_, expected.var_)
+        np.testing.assert_allclose(scaler.scale_, expected.scale_)
+        np.testing.assert_array_equal(scaler.n_samples_seen_, expected.n_samples_seen_)
+
+    def test_merge_scalers_matches_single_fit(self):
+        expected = StandardScaler().fit(self.df)
+        parts = [StandardScaler().partial_fit(self.df.iloc[start:start + 300]) for start in range(0, 1000, 300)]
+        self.assert_same_scaler(merge_scalers(parts), expected)
+
+    def test_fit_scaler_in_parallel_matches_single_fit(self):
+        self.assert_same_scaler(fit_scaler(self.df, workers=4), fit_scaler(self.df, workers=1))
+
+    def test_frame_and_file_round_trip(self):
+        scaler = fit_scaler(self.df)
+        self.assert_same_scaler(scaler_from_frame(scaler_to_frame(scaler)), scaler)
+        with tempfile.TemporaryDirectory() as directory:
+            path = save_scaler(scaler, os.path.join(directory, 'models', 'scaler.json'))
+            loaded = load_scaler(path)
+            self.assert_same_scaler(loaded, scaler)
+            self.assertIs(load_scaler(path), loaded)
+
+    def test_transform_batch_uses_fitted_statistics(self):
+        scaler = fit_scaler(self.df)
+        batch = self.df.iloc[:10].copy()
+        expected = scaler.transform(batch[FEATURES_TO_SCALE])
+        np.testing.assert_allclose(transform_batch(batch, scaler)[FEATURES_TO_SCALE].to_numpy(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
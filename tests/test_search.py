@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Import the class to be tested
+from scripts.models.search import SuccessiveHalvingSearch
+
+
+class TestSuccessiveHalvingSearch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = pd.DataFrame(rng.normal(size=(900, 5)), columns=[f"f{i}" for i in range(5)])
+        self.y = pd.Series((self.X['f0'] + rng.normal(scale=0.5, size=900) > 0).astype(int))
+        self.params = {'max_depth': [1, 3, None], 'min_samples_leaf': [1, 5, 20], 'max_features': ['sqrt', 0.5]}
+
+    def test_halving_over_estimators(self):
+        search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=0), self.params, n_candidates=9,
+                                         resource='n_estimators', factor=3, max_resources=90, random_state=0).fit(self.X, self.y)
+        results = search.results_
+        self.assertEqual(results.groupby('rung')['candidate'].count().tolist(), [9, 3, 1])
+        self.assertEqual(sorted(results['n_estimators'].unique()), [10, 30, 90])
+        # Survivors of each rung are its best candidates
+        first = results[results['rung'] == 0].sort_values('mean_test_score', ascending=False, kind='stable')
+        self.assertEqual(set(results[results['rung'] == 1]['candidate']), set(first['candidate'][:3]))
+        self.assertEqual(search.best_estimator_.n_estimators, 90)
+        self.assertEqual(search.best_params_, results.iloc[-1]['params'])
+        self.assertGreater(search.best_score_, 0.7)
+        self.assertEqual(len(search.predict(self.X)), len(self.X))
+
+    def test_halving_over_samples(self):
+        search = SuccessiveHalvingSearch(LogisticRegression(), {'C': [0.001, 0.01, 0.1, 1, 10]}, n_candidates=5,
+                                         resource='n_samples', factor=2, random_state=0).fit(self.X, self.y)
+        self.assertEqual(search.results_['n_samples'].max(), len(self.X))
+        self.assertTrue((search.results_.groupby('rung')['n_samples'].nunique() == 1).all())
+        self.assertEqual(search.results_.iloc[-1]['n_samples'], len(self.X))
+
+    def test_time_budget_stops_search(self):
+        clock = iter(np.arange(0, 1000, 1.0))
+        with patch('scripts.models.search.time.perf_counter', side_effect=lambda: next(clock)):
+            search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=0), self.params, n_candidates=9,
+                                             resource='n_estimators', max_resources=90, time_budget_s=6, random_state=0).fit(self.X, self.y)
+        self.assertLess(len(search.results_), 9)
+        self.assertEqual(search.results_['rung'].max(), 0)
+        self.assertTrue(hasattr(search, 'best_estimator_'))
+
+    def test_invalid_resource(self):
+        with self.assertRaises(ValueError):
+            SuccessiveHalvingSearch(RandomForestClassifier(), self.params, resource='depth')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import time
+import threading
+import unittest
+import urllib.request
+import urllib.error
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+# Import the functions to be tested
+from scripts.models.preprocessing import FEATURE_COLUMNS
+from scripts.models.serving import MicroBatcher, create_server
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_coalesces_concurrent_requests(self):
+        started, release, batch_rows = threading.Event(), threading.Event(), []
+
+        def predict_fn(features):
+            batch_rows.append(len(features))
+            started.set()
+            release.wait(5)
+            return features[:, 0] * 2
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=4, max_wait_ms=50)
+        first = batcher.submit(np.array([[0.0]]))
+        started.wait(5)
+        # Queued while the first batch is being scored, so they are batched together
+        futures = [batcher.submit(np.array([[float(i)]])) for i in range(1, 7)]
+        release.set()
+        self.assertEqual(first.result(5).tolist(), [0.0])
+        self.assertEqual([future.result(5).tolist() for future in futures], [[2.0 * i] for i in range(1, 7)])
+        batcher.close()
+        self.assertEqual(batch_rows, [1, 4, 2])
+        stats = batcher.stats()
+        self.assertEqual((stats['requests'], stats['batches']), (7, 3))
+        self.assertIn('p99', stats['latency_ms'])
+
+    def test_close_resolves_every_request(self):
+        started, release = threading.Event(), threading.Event()
+
+        def predict_fn(features):
+            started.set()
+            release.wait(5)
+            return features[:, 0]
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=2, max_wait_ms=0)
+        first = batcher.submit(np.array([[1.0]]))
+        started.wait(5)
+        queued = batcher.submit(np.array([[2.0]]))
+        closing = threading.Thread(target=batcher.close)
+        closing.start()
+        while not batcher._closed:
+            time.sleep(0.001)
+        with batcher._lock:  # the stop signal is queued once close releases the lock
+            pass
+        # Work that slipped in behind the stop signal is failed rather than left pending
+        batcher._queue.put((np.array([[3.0]]), late := Future(), 0.0))
+        release.set()
+        closing.join(5)
+        self.assertEqual(first.result(5).tolist(), [1.0])
+        self.assertEqual(queued.result(5).tolist(), [2.0])
+        with self.assertRaises(RuntimeError):
+            late.result(5)
+        with self.assertRaises(RuntimeError):
+            batcher.submit(np.array([[4.0]]))
+        batcher.close()
+
+    def test_errors_reach_every_request_of_the_batch(self):
+        def predict_fn(features):
+            raise ValueError('bad batch')
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=20)
+        futures = [batcher.submit(np.zeros((1, 2))) for _ in range(3)]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result(5)
+        batcher.close()
+
+
+class TestPredictionServer(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(200, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+        y = (X['Time_Since_Last_Trip'] > 0).astype(int)
+        self.model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+        self.X = X
+        self.server = create_server(self.model, port=0, max_batch_size=16, max_wait_ms=1)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.service.close()
+
+    def post(self, body):
+        request = urllib.request.Request(f"{self.url}/predict", data=json.dumps(body).encode())
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def test_predict_matches_predict_proba(self):
+        records = self.X.iloc[:5].to_dict('records')
+        expected = self.model.predict_proba(self.X.iloc[:5])[:, 0]
+        np.testing.assert_allclose(self.post({'instances': records})['probabilities'], expected)
+        np.testing.assert_allclose(self.post(records[0])['probabilities'], expected[:1])
+        stats = json.loads(urllib.request.urlopen(f"{self.url}/stats").read())
+        self.assertEqual(stats['requests'], 2)
+
+    def test_missing_feature_is_a_bad_request(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.post({'driver_id': 1})
+        self.assertEqual(context.exception.code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
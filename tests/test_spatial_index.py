@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+# Import the class to be tested
+from scripts.spatial_index import SpatialIndex
+from scripts.distance import haversine_distance
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.lat = rng.uniform(6.4, 6.7, 500)
+        self.lng = rng.uniform(3.2, 3.6, 500)
+        self.lat[7] = np.nan
+        self.index = SpatialIndex(self.lat, self.lng)
+
+    def test_count_within_matches_brute_force(self):
+        q_lat, q_lng = self.lat[:50], self.lng[:50]
+        counts = self.index.count_within(q_lat, q_lng, 1.0)
+        expected = [
+            np.sum(haversine_distance(a, b, self.lat, self.lng) <= 1.0) if not np.isnan(a) else 0
+            for a, b in zip(q_lat, q_lng)
+        ]
+        np.testing.assert_array_equal(counts, expected)
+        self.assertEqual(counts[7], 0)
+
+    def test_query_within_returns_original_positions(self):
+        neighbors = self.index.query_within(self.lat[10], self.lng[10], 0.5)
+        self.assertIn(10, neighbors[0])
+        self.assertNotIn(7, neighbors[0])
+        distances = haversine_distance(self.lat[10], self.lng[10], self.lat[neighbors[0]], self.lng[neighbors[0]])
+        self.assertTrue((distances <= 0.5).all())
+
+    def test_empty_and_missing_points(self):
+        for lat, lng in [(np.array([]), np.array([])), (np.array([np.nan, 6.5]), np.array([3.4, np.nan]))]:
+            index = SpatialIndex(lat, lng)
+            self.assertIsNone(index.tree)
+            np.testing.assert_array_equal(index.count_within(self.lat[:3], self.lng[:3], 1.0), [0, 0, 0])
+            self.assertEqual([len(n) for n in index.query_within(self.lat[:3], self.lng[:3], 1.0)], [0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+# Import the function to be tested
+from scripts.spatiotemporal_join import spatiotemporal_join
+from scripts.distance import haversine_distance
+
+
+class TestSpatiotemporalJoin(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        start = pd.Timestamp('2021-07-01')
+        self.pings = pd.DataFrame({
+            'driver_id': rng.integers(0, 50, 400),
+            'lat': rng.uniform(6.45, 6.55, 400),
+            'lng': rng.uniform(3.30, 3.40, 400),
+            'created_at': start + pd.to_timedelta(rng.uniform(0, 24 * 60, 400), unit='min'),
+        })
+        self.pings.loc[5, 'created_at'] = pd.NaT
+        self.orders = pd.DataFrame({
+            'lat': rng.uniform(6.45, 6.55, 60),
+            'lng': rng.uniform(3.30, 3.40, 60),
+            'created_at': start + pd.to_timedelta(rng.uniform(0, 24 * 60, 60), unit='min'),
+        }, index=np.arange(100, 160))
+
+    def test_matches_brute_force(self):
+        result = spatiotemporal_join(self.pings, self.orders, radius=1.0, window_minutes=30)
+
+        expected = set()
+        for o_idx, order in self.orders.iterrows():
+            distances = haversine_distance(order['lat'], order['lng'], self.pings['lat'], self.pings['lng'])
+            delta = (self.pings['created_at'] - order['created_at']).abs()
+            hits = self.pings.index[(distances <= 1.0) & (delta <= pd.Timedelta(minutes=30))]
+            expected.update((o_idx, p_idx) for p_idx in hits)
+
+        self.assertEqual(set(zip(result['order_index'], result['ping_index'])), expected)
+        self.assertTrue((result['distance_km'] <= 1.0).all())
+        self.assertTrue((result['time_delta_s'].abs() <= 30 * 60).all())
+        self.assertNotIn(5, result['ping_index'].tolist())
+        self.assertIn('driver_id', result.columns)
+
+    def test_empty_result(self):
+        result = spatiotemporal_join(self.pings, self.orders.iloc[:0], radius=1.0, window_minutes=30)
+        self.assertTrue(result.empty)
+        self.assertEqual(list(result.columns), ['order_index', 'ping_index', 'distance_km', 'time_delta_s', 'driver_id'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Import the functions to be tested
+from scripts.streaming import compute_impute_values, run_streaming_pipeline
+from data_preprocessing import handle_missing_values, load_data
+from feat_eng import engineer_features, scale_features
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.tmp_dir = tempfile.mkdtemp()
+        n_trips, n_pings = 40, 300
+        starts = pd.Timestamp('2021-07-01') + pd.to_timedelta(rng.integers(0, 60 * 24 * 30, n_trips), unit='min')
+        self.df2 = pd.DataFrame({
+            'Trip ID': np.arange(n_trips),
+            'Trip Origin': [f"{a},{b}" for a, b in zip(rng.uniform(6.4, 6.7, n_trips), rng.uniform(3.2, 3.6, n_trips))],
+            'Trip Destination': [f"{a},{b}" for a, b in zip(rng.uniform(6.4, 6.7, n_trips), rng.uniform(3.2, 3.6, n_trips))],
+            'Trip Start Time': starts.strftime('%Y-%m-%d %H:%M:%S'),
+            'Trip End Time': (starts + pd.Timedelta(minutes=30)).strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        self.df2.loc[3, 'Trip End Time'] = np.nan
+        self.df1 = pd.DataFrame({
+            'id': np.arange(n_pings),
+            'order_id': rng.integers(0, n_trips + 5, n_pings),
+            'driver_id': rng.integers(0, 30, n_pings),
+            'driver_action': rng.choice(['accepted', 'rejected'], n_pings),
+            'lat': rng.uniform(6.4, 6.7, n_pings),
+            'lng': rng.uniform(3.2, 3.6, n_pings),
+            'created_at': np.nan,
+            'updated_at': np.nan,
+        })
+        self.df1_path = os.path.join(self.tmp_dir, 'df1.csv')
+        self.df2_path = os.path.join(self.tmp_dir, 'df2.csv')
+        self.df1.to_csv(self.df1_path, index=False)
+        self.df2.to_csv(self.df2_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_compute_impute_values(self):
+        chunks = [pd.DataFrame({'Trip Start Time': ['b', 'a']}), pd.DataFrame({'Trip Start Time': ['b', None]})]
+        with patch('scripts.streaming.Config.DF2_IMPUTE_COLUMNS', {'Trip Start Time': 'mode'}):
+            self.assertEqual(compute_impute_values(chunks), {'Trip Start Time': 'b'})
+
+    def test_streaming_matches_in_memory(self):
+        output_path = os.path.join(self.tmp_dir, 'out', 'df_merged.csv')
+        scaler_path = os.path.join(self.tmp_dir, 'models', 'scaler.json')
+        with patch('config.config.Config.DF1_PATH', self.df1_path), patch('config.config.Config.DF2_PATH', self.df2_path), \
+                patch('config.config.Config.SCALER_PATH', scaler_path):
+            run_streaming_pipeline(output_path, chunksize=37)
+            df1, df2 = handle_missing_values(*load_data())
+        streamed = pd.read_csv(output_path)
+
+        expected = scale_features(engineer_features(df1, df2))
+
+        self.assertEqual(list(streamed.columns), list(expected.columns))
+        self.assertEqual(len(streamed), len(expected))
+        for column in ['lat', 'Trip Distance', 'Trip Duration', 'Driver Distance to Origin', 'Origin Cell']:
+            np.testing.assert_allclose(streamed[column], expected[column], rtol=1e-9, atol=1e-9)
+        self.assertFalse(os.path.exists(output_path + '.unscaled.tmp'))
+        self.assertTrue(os.path.exists(scaler_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
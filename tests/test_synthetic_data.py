@@ -0,0 +1,44 @@
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+# Import the functions to be tested
+from scripts.synthetic_data import LAGOS_BOUNDS, generate_dataset, write_dataset
+from feat_eng import engineer_features
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    def test_schema_and_determinism(self):
+        pings, trips = generate_dataset(2000, seed=3)
+        self.assertEqual(list(pings.columns), ['id', 'order_id', 'driver_id', 'driver_action', 'lat', 'lng', 'created_at', 'updated_at'])
+        self.assertEqual(list(trips.columns), ['Trip ID', 'Trip Origin', 'Trip Destination', 'Trip Start Time', 'Trip End Time'])
+        self.assertTrue(pings['order_id'].isin(trips['Trip ID']).all())
+        self.assertTrue(set(pings['driver_action']) <= {'accepted', 'rejected'})
+        pd.testing.assert_frame_equal(generate_dataset(2000, seed=3)[1], trips)
+
+        origin = trips['Trip Origin'].str.split(',', expand=True).astype(float)
+        lat0, lat1, lng0, lng1 = LAGOS_BOUNDS
+        self.assertTrue(origin[0].between(lat0, lat1).all() and origin[1].between(lng0, lng1).all())
+        self.assertTrue((pd.to_datetime(trips['Trip End Time']).dropna() > pd.to_datetime(trips['Trip Start Time'])[trips['Trip End Time'].notna()]).all())
+
+    def test_write_dataset_in_chunks(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            pings_path, trips_path = write_dataset(tmp_dir, 3000, chunk_pings=1000)
+            pings, trips = pd.read_csv(pings_path), pd.read_csv(trips_path)
+            self.assertEqual(trips['Trip ID'].tolist(), list(range(1, 601)))
+            self.assertTrue(pings['id'].is_unique)
+            self.assertTrue(pings['order_id'].isin(trips['Trip ID']).all())
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_runs_through_feature_engineering(self):
+        pings, trips = generate_dataset(1000)
+        merged = engineer_features(pings.drop(columns=['updated_at']), trips.dropna())
+        self.assertEqual(len(merged), len(pings[pings['order_id'].isin(trips.dropna()['Trip ID'])]))
+
+
+if __name__ == "__main__":
+    unittest.main()